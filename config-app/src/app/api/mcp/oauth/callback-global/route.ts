@@ -127,6 +127,21 @@ export async function GET(req: NextRequest) {
         onConflict: 'clerk_id'
       });
 
+    // Bump the user's config_version so agents drop cached MCP tokens/config (best effort)
+    const CONFIG_API_URL = process.env.NEXT_PUBLIC_CONFIG_API_URL || 'http://localhost:8000';
+    try {
+      await fetch(`${CONFIG_API_URL}/api/webhooks/mcp-connected`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-Webhook-Secret': process.env.CONFIG_API_WEBHOOK_SECRET || ''
+        },
+        body: JSON.stringify({ user_id: clerk_id, agent_id: 'global' })
+      });
+    } catch (notifyError) {
+      console.warn('[OAuth] Could not notify config API of new MCP tokens:', notifyError);
+    }
+
     // 8. Clean up state from Redis (SAME as multi-tool)
     await deleteOAuthState(state);
 
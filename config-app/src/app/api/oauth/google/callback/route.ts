@@ -116,8 +116,12 @@ export async function GET(request: NextRequest) {
       .from('user_secrets')
       .update({
         google_refresh_token: tokens.refresh_token,
-        // Optionally store access_token and expiry for immediate use
-        // (will be refreshed automatically by agents)
+        // Store access_token and expiry for immediate use by agents
+        // (refreshed automatically and written back once expired)
+        google_access_token: tokens.access_token ?? null,
+        google_token_expires_at: tokens.expires_in
+          ? new Date(Date.now() + tokens.expires_in * 1000).toISOString()
+          : null,
       })
       .eq('clerk_id', clerk_id);
 
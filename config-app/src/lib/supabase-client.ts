@@ -78,6 +78,8 @@ export interface UserSecrets {
   google_client_id: string | null;
   google_client_secret: string | null;
   google_refresh_token: string | null; // Hidden from UI but used by agents
+  google_access_token: string | null; // Last access token, reused by agents until expiry
+  google_token_expires_at: string | null;
 
   // MCP Integration Tokens
   rube_token: string | null;
@@ -15,7 +15,7 @@ from dotenv import load_dotenv
 
 # Import centralized config - handle both module import and direct execution
 try:
-    from .config import AGENT_NAME, MCP_SERVICE
+    from .config import AGENT_NAME, MCP_SERVICE, MCP_SERVER_URL
 except ImportError:
     # Direct execution fallback
     import sys
@@ -100,11 +100,11 @@ class AgentMCPConnection:
             self.mcp_servers = {}
 
     async def get_mcp_tools(self) -> List[BaseTool]:
-        """Get MCP tools with 5-minute cache"""
+        """Get MCP tools with 5-minute cache (schemas from the shared MCP tool catalog)"""
 
         # Use cached tools if fresh
         if (self._mcp_tools and self._tools_cache_time and
-            (datetime.now() - self._tools_cache_time).seconds < 300):
+            (datetime.now() - self._tools_cache_time).total_seconds() < 300):
             return self._mcp_tools
 
         # No MCP server configured
@@ -121,7 +121,7 @@ class AgentMCPConnection:
         try:
             # 30-second timeout
             tools = await asyncio.wait_for(
-                self._mcp_client.get_tools(),
+                self._get_catalog_tools(f"mcp_{AGENT_NAME}"),
                 timeout=30.0
             )
 
@@ -157,6 +157,19 @@ class AgentMCPConnection:
             self.logger.error(f"Failed to load {AGENT_NAME} MCP tools: {e}")
             return []
 
+    async def _get_catalog_tools(self, server_name: str) -> List[BaseTool]:
+        """Build tools from the process-wide schema catalog (list_tools only on a miss)"""
+        from utils.mcp_tool_catalog import build_tools, get_mcp_tool_catalog, list_all_tools
+
+        async def fetch():
+            self.logger.info(f"Listing tools from {self.mcp_url}")
+            async with self._mcp_client.session(server_name) as session:
+                return await list_all_tools(session)
+
+        _, schemas = await get_mcp_tool_catalog().get(self.mcp_url, fetch)
+        # Bound to the connection: each call opens its own session, as with get_tools()
+        return build_tools(schemas, connection=self.mcp_servers[server_name])
+
     async def discover_all_tools(self) -> List[Dict[str, str]]:
         """
         Discover ALL available tools from MCP server for development/debugging
@@ -7,6 +7,10 @@ It enables multi-tenant isolation by automatically filtering threads by user_id.
 
 Architecture:
 - Validates Clerk JWT tokens using JWKS (proper 2025 method)
+- Caches verified tokens (by SHA-256 digest) until their exp claim, so repeat
+  requests (Agent Inbox polling) skip signature verification entirely
+- Fetches the JWKS asynchronously, refreshes it ahead of time and re-fetches
+  on an unknown kid (key rotation)
 - Adds owner metadata to all resources automatically
 - Filters queries by owner to ensure user isolation
 - Ensures complete isolation between users
@@ -20,10 +24,13 @@ References:
 from langgraph_sdk import Auth
 import os
 import sys
+import time
 import asyncio
+import hashlib
+import httpx
 import jwt
-from jwt import PyJWKClient
 import logging
+from collections import OrderedDict
 
 # Ensure UTF-8 encoding for stdout/stderr before any logging
 # This prevents UnicodeEncodeError in Docker containers
@@ -73,8 +80,99 @@ else:
         logger.error(f" Failed to parse CLERK_PUBLISHABLE_KEY: {e}")
         CLERK_JWKS_URL = None
 
-# Initialize JWT verifier client (only if JWKS URL is available)
-jwks_client = PyJWKClient(CLERK_JWKS_URL) if CLERK_JWKS_URL else None
+# Verified-token cache bounds
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+# Verified tokens are cached until exp, but for at most this long
+AUTH_TOKEN_CACHE_MAX_TTL = float(os.getenv("AUTH_TOKEN_CACHE_MAX_TTL_SECONDS", "300"))
+# JWKS is re-fetched in the background after this long...
+JWKS_REFRESH_SECONDS = float(os.getenv("CLERK_JWKS_REFRESH_SECONDS", "3600"))
+# ...and at most this often when a token carries an unknown kid (rotation)
+JWKS_MIN_REFETCH_SECONDS = 30.0
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified tokens: SHA-256 digest -> (expires_at, user_id)."""
+
+    def __init__(self, max_entries: int = AUTH_TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, tuple[float, str]]" = OrderedDict()
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, digest: bytes) -> str | None:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[digest]
+            return None
+        self._entries.move_to_end(digest)
+        return entry[1]
+
+    def put(self, digest: bytes, user_id: str, exp: float | None) -> None:
+        expires_at = time.time() + AUTH_TOKEN_CACHE_MAX_TTL
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        self._entries[digest] = (expires_at, user_id)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class ClerkJWKS:
+    """Clerk signing keys, fetched with httpx and kept fresh without blocking requests."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.keys: dict[str, object] = {}
+        self.fetched_at = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _fetch(self) -> None:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+        jwk_set = jwt.PyJWKSet.from_dict(response.json())
+        self.keys = {key.key_id: key.key for key in jwk_set.keys}
+        self.fetched_at = time.monotonic()
+        logger.info(f" Loaded {len(self.keys)} Clerk signing keys")
+
+    def refresh(self) -> asyncio.Task:
+        """Start a JWKS fetch, or join the one already running (single-flight)."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._fetch())
+            # Background refreshes are awaited by no one - don't warn about lost exceptions
+            self._task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self._task
+
+    async def get_signing_key(self, kid: str | None):
+        age = time.monotonic() - self.fetched_at
+        if not self.keys:
+            await asyncio.shield(self.refresh())
+        elif age > JWKS_REFRESH_SECONDS:
+            # Keys still usable - refresh ahead of time in the background
+            self.refresh()
+
+        key = self.keys.get(kid)
+        if key is None and time.monotonic() - self.fetched_at > JWKS_MIN_REFETCH_SECONDS:
+            # Unknown kid: Clerk may have rotated its keys
+            logger.info(f" Unknown signing key id {kid!r} - re-fetching JWKS")
+            await asyncio.shield(self.refresh())
+            key = self.keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key id: {kid}")
+        return key
+
+
+# Initialize JWT verifier (only if JWKS URL is available)
+clerk_jwks = ClerkJWKS(CLERK_JWKS_URL) if CLERK_JWKS_URL else None
+verified_tokens = VerifiedTokenCache()
 
 @auth.authenticate
 async def get_current_user(authorization: str | None) -> Auth.types.MinimalUserDict:
@@ -104,6 +202,7 @@ async def get_current_user(authorization: str | None) -> Auth.types.MinimalUserD
         - API users (Clerk JWT): Authenticated + owner-filtered resources (multi-tenant)
 
     Note: Uses JWKS for cryptographic verification (no API calls needed).
+    Tokens verified before are accepted from the cache until they expire.
     """
     # STUDIO BYPASS: Studio sends no authorization header
     # This allows developers to use LangGraph Studio for debugging without JWT
@@ -126,7 +225,7 @@ async def get_current_user(authorization: str | None) -> Auth.types.MinimalUserD
         )
 
     # Check if JWKS client is available
-    if not jwks_client:
+    if not clerk_jwks:
         logger.error(" JWKS client not initialized - check NEXT_PUBLIC_CLERK_PUBLISHABLE_KEY")
         raise Auth.exceptions.HTTPException(
             status_code=500,
@@ -136,14 +235,24 @@ async def get_current_user(authorization: str | None) -> Auth.types.MinimalUserD
     # Extract token
     token = authorization.replace("Bearer ", "").strip()
 
+    # Already verified and not yet expired - no crypto, no JWKS lookup
+    digest = VerifiedTokenCache.digest(token)
+    user_id = verified_tokens.get(digest)
+    if user_id:
+        return {
+            "identity": user_id,
+            "is_authenticated": True,
+        }
+
     try:
-        # Get signing key from Clerk's JWKS (async-safe for local dev, backward compatible for production)
-        signing_key = await asyncio.to_thread(jwks_client.get_signing_key_from_jwt, token)
+        # Get signing key from Clerk's JWKS (cached, fetched asynchronously)
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = await clerk_jwks.get_signing_key(kid)
 
         # Verify JWT signature and decode payload
         payload = jwt.decode(
             token,
-            signing_key.key,
+            signing_key,
             algorithms=["RS256"],
             options={"verify_exp": True}
         )
@@ -153,6 +262,7 @@ async def get_current_user(authorization: str | None) -> Auth.types.MinimalUserD
         if not user_id:
             raise ValueError("Token missing 'sub' claim")
 
+        verified_tokens.put(digest, user_id, payload.get("exp"))
         logger.info(f" Authenticated user: {user_id}")
 
         return {
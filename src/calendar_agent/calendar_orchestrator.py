@@ -11,7 +11,7 @@ Following LangGraph 2025 best practices:
 """
 import os
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
@@ -19,14 +19,16 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, SystemMessage
 from langchain_core.tools import BaseTool
 from langchain_anthropic import ChatAnthropic
 from langgraph.prebuilt import create_react_agent
 from langgraph.graph import StateGraph, MessagesState, START, END
 
 from shared_utils import DEFAULT_LLM_MODEL
-from .prompt import get_formatted_prompt_with_context, get_no_tools_prompt
+from utils.llm_utils import cached_prompt_content
+from utils.tool_output_budget import budget_tools
+from .prompt import AGENT_SYSTEM_PROMPT, get_formatted_prompt_parts, get_no_tools_prompt
 from .executor_factory import ExecutorFactory
 from .booking_node import BookingNode
 
@@ -48,7 +50,8 @@ class CalendarAgent:
     def __init__(
         self,
         model: Optional[ChatAnthropic] = None,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        agent_config: Optional[Dict[str, Any]] = None
     ):
         """
         Initialize calendar agent with Google Workspace integration.
@@ -56,12 +59,14 @@ class CalendarAgent:
         Args:
             model: LLM model for agent reasoning
             user_id: Clerk user ID for loading user-specific config
+            agent_config: Already loaded calendar_agent config (skips the Supabase lookup)
         """
         from .config import LLM_CONFIG, USER_TIMEZONE
 
         # Setup logging
         self.logger = logging.getLogger(__name__)
         self.user_id = user_id
+        self.agent_config = agent_config
         self.timezone = USER_TIMEZONE
 
         # Use centralized get_llm for cross-provider support
@@ -72,6 +77,8 @@ class CalendarAgent:
             model_name = LLM_CONFIG.get("model", DEFAULT_LLM_MODEL)
             temperature = LLM_CONFIG.get("temperature", 0.1)
             self.model = get_llm(model_name, temperature=temperature)
+        # ChatAnthropic names the field "model", ChatOpenAI "model_name"
+        self.model_name = getattr(self.model, "model", None) or getattr(self.model, "model_name", "")
 
         # Agent components (initialized async)
         self.executor = None
@@ -139,6 +146,13 @@ class CalendarAgent:
         Get agent system prompt with dynamic context.
         Loads user-edited prompt from Supabase if available.
         """
+        return "".join(self._get_agent_prompt_parts())
+
+    def _get_agent_prompt_parts(self) -> Tuple[str, str]:
+        """
+        Get agent system prompt as (stable prefix, volatile context).
+        Loads user-edited prompt from Supabase if available.
+        """
         # Get current time context
         try:
             timezone_zone = ZoneInfo(self.timezone)
@@ -160,8 +174,10 @@ class CalendarAgent:
         # Try loading user-edited prompt from Supabase
         if self.user_id:
             try:
-                from utils.config_utils import get_agent_config_from_supabase
-                agent_config = get_agent_config_from_supabase(self.user_id, "calendar_agent")
+                agent_config = self.agent_config
+                if agent_config is None:
+                    from utils.config_utils import get_agent_config_from_supabase
+                    agent_config = get_agent_config_from_supabase(self.user_id, "calendar_agent")
 
                 # Get user-edited system prompt
                 prompt_templates = agent_config.get("prompt_templates", {})
@@ -170,11 +186,12 @@ class CalendarAgent:
                 if user_prompt:
                     self.logger.info("[CalendarAgent] ✅ Using user-edited prompt from Supabase")
                     # Format with dynamic context
-                    return user_prompt.format(
-                        current_time=current_time_iso,
+                    return get_formatted_prompt_parts(
+                        user_prompt,
                         timezone_name=self.timezone,
-                        today=today_str,
-                        tomorrow=tomorrow_str
+                        current_time_iso=current_time_iso,
+                        today_str=today_str,
+                        tomorrow_str=tomorrow_str
                     )
                 else:
                     self.logger.info("[CalendarAgent] No user-edited prompt found, using default")
@@ -182,13 +199,26 @@ class CalendarAgent:
                 self.logger.warning(f"[CalendarAgent] Could not load user prompt from Supabase: {e}")
 
         # Fallback to default prompt from prompt.py
-        return get_formatted_prompt_with_context(
+        return get_formatted_prompt_parts(
+            AGENT_SYSTEM_PROMPT,
             timezone_name=self.timezone,
             current_time_iso=current_time_iso,
             today_str=today_str,
             tomorrow_str=tomorrow_str
         )
 
+    def _prompt_with_context(self, state) -> List[BaseMessage]:
+        """
+        Prompt callable for create_react_agent.
+
+        Renders the system prompt on every model call, so the current time is
+        right even when the compiled graph is reused across turns. The stable
+        part of the prompt is marked for provider prompt caching.
+        """
+        stable, volatile = self._get_agent_prompt_parts()
+        content = cached_prompt_content(self.model_name, [stable], volatile)
+        return [SystemMessage(content=content)] + list(state["messages"])
+
     async def get_agent(self):
         """
         Get the compiled calendar agent graph.
@@ -202,9 +232,6 @@ class CalendarAgent:
         if self.agent_graph:
             return self.agent_graph
 
-        # Get agent prompt (with user edits if available)
-        agent_prompt = self._get_agent_prompt()
-
         # Create agent based on tool availability
         if not self.tools:
             self.logger.warning("[CalendarAgent] ⚠️  No tools available - creating no-tools agent")
@@ -220,8 +247,9 @@ class CalendarAgent:
             self.logger.info(f"[CalendarAgent] Creating agent with {len(self.tools)} tools")
             agent = create_react_agent(
                 model=self.model,
-                tools=self.tools,
-                prompt=agent_prompt
+                # Large READ results (e.g. 250-event listings) are truncated with a reference
+                tools=budget_tools(self.tools),
+                prompt=self._prompt_with_context
             )
 
         # Build graph with booking node for write operations
@@ -315,7 +343,7 @@ async def create_calendar_agent(
     logger.info(f"[create_calendar_agent] Creating agent for user_id={user_id}")
 
     # Create agent instance
-    calendar_agent = CalendarAgent(model=model, user_id=user_id)
+    calendar_agent = CalendarAgent(model=model, user_id=user_id, agent_config=agent_config)
 
     # Initialize (loads Google credentials and tools)
     await calendar_agent.initialize()
@@ -325,3 +353,45 @@ async def create_calendar_agent(
 
     logger.info(f"[create_calendar_agent] ✅ Agent ready for user_id={user_id}")
     return agent_graph
+
+
+async def get_cached_calendar_agent(
+    model_factory,
+    user_id: str,
+    agent_config: Optional[Dict[str, Any]],
+    model_name: str,
+    temperature: float,
+    api_key: Optional[str] = None
+) -> Any:
+    """
+    Compiled calendar agent for a user, reused across supervisor turns.
+
+    The cache key covers everything the build depends on: user, model,
+    temperature, config version and API key. Agents built without Google
+    credentials (no-tools mode) are not cached, so connecting Google Calendar
+    takes effect on the next turn.
+
+    Args:
+        model_factory: Zero-argument callable creating the LLM (only called on a miss)
+        user_id: Clerk user ID
+        agent_config: calendar_agent config from Supabase
+        model_name: Model name (cache key)
+        temperature: Model temperature (cache key)
+        api_key: Provider API key used by the model (cache key, hashed)
+    """
+    from utils.agent_cache import config_version, get_agent_cache, secret_fingerprint
+
+    key = (user_id, model_name, temperature, config_version(agent_config), secret_fingerprint(api_key))
+    has_tools = False
+
+    async def build():
+        nonlocal has_tools
+        calendar_agent = CalendarAgent(model=model_factory(), user_id=user_id, agent_config=agent_config)
+        agent_graph = await calendar_agent.get_agent()
+        has_tools = bool(calendar_agent.tools)
+        return agent_graph
+
+    cache = get_agent_cache("calendar")
+    agent_graph = await cache.get_or_build(key, build, cacheable=lambda graph: has_tools)
+    logger.info(f"[create_calendar_agent] Agent cache stats: {cache.stats()}")
+    return agent_graph
@@ -46,7 +46,7 @@ logging.info(f"ExecutorFactory initialized: GOOGLE_WORKSPACE_TOOLS_AVAILABLE={GO
 
 # Import OAuth utilities
 try:
-    from utils.google_oauth_utils import load_google_credentials, check_google_credentials_available
+    from utils.google_oauth_utils import load_google_token_record, check_google_credentials_available
     GOOGLE_OAUTH_AVAILABLE = True
 except ImportError:
     logging.warning("google_oauth_utils not available - Google Workspace executor disabled")
@@ -133,7 +133,8 @@ class ExecutorFactory:
             print(f"[EXECUTOR_FACTORY] ===== GOOGLE OAUTH DEBUG =====")
             print(f"[EXECUTOR_FACTORY] user_id being queried: {user_id}")
             print(f"[EXECUTOR_FACTORY] Fetching Google refresh_token from Supabase...")
-            refresh_token = await load_google_credentials(user_id)
+            token_record = await load_google_token_record(user_id)
+            refresh_token = token_record["refresh_token"] if token_record else None
             print(f"[EXECUTOR_FACTORY] Query result: {'FOUND ✅' if refresh_token else 'NOT FOUND ❌'}")
 
             if not refresh_token:
@@ -170,12 +171,14 @@ class ExecutorFactory:
             # Build credentials dict for GoogleWorkspaceExecutor
             google_creds = {
                 'google_refresh_token': refresh_token,
+                'google_access_token': token_record['access_token'],
+                'google_token_expires_at': token_record['expires_at'],
                 'google_client_id': client_id,
                 'google_client_secret': client_secret
             }
 
             print(f"[EXECUTOR_FACTORY] Creating GoogleWorkspaceExecutor...")
-            executor = GoogleWorkspaceExecutor(google_creds)
+            executor = GoogleWorkspaceExecutor(google_creds, user_id=user_id)
             print(f"[EXECUTOR_FACTORY] ✅ GoogleWorkspaceExecutor created successfully")
             return executor
 
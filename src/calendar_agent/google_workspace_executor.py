@@ -9,10 +9,12 @@ import time
 import asyncio
 from typing import Dict, Any, Optional, List
 from datetime import datetime
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from utils.google_api_scheduler import CALENDAR_QUOTA_UNITS, get_calendar_scheduler
+from utils.google_async_client import get_google_async_client
+from utils.google_token_cache import get_token_cache
+
 from .execution_result import GoogleCalendarToolResult, ExecutionStatus, BookingExecutionResult
 from .state import BookingRequest
 
@@ -20,21 +22,23 @@ from .state import BookingRequest
 class GoogleWorkspaceExecutor:
     """Execute calendar operations using Google Workspace API directly"""
 
-    def __init__(self, google_credentials: Dict[str, str]):
+    def __init__(self, google_credentials: Dict[str, str], user_id: Optional[str] = None):
         """
         Initialize with Google OAuth credentials from Supabase.
 
         Args:
             google_credentials: Dict containing:
                 - google_access_token (optional - can be None, will auto-refresh from refresh_token)
+                - google_token_expires_at (optional - naive UTC expiry of google_access_token)
                 - google_refresh_token (required)
                 - google_client_id (required)
                 - google_client_secret (required)
+            user_id: Clerk user ID, used as the per-user quota bucket for API calls
 
         Note:
             Per OAuth 2.0 best practices, access_token can be None.
-            The google.oauth2.credentials.Credentials library will automatically
-            use the refresh_token to obtain a fresh access_token on first use.
+            Credentials are shared per user through the process-wide token cache,
+            so the access_token is refreshed once and reused across executors.
         """
         # Required scopes for Google Calendar API
         # https://developers.google.com/calendar/api/guides/auth
@@ -44,19 +48,31 @@ class GoogleWorkspaceExecutor:
             'https://www.googleapis.com/auth/calendar'  # Full calendar access (read/write events, settings)
         ]
 
-        self.credentials = Credentials(
+        self.calendar_id = 'primary'  # Use primary calendar
+        self.user_id = user_id or 'default'
+
+        self.credentials = get_token_cache().get_or_create(
+            self.user_id,
+            google_credentials.get('google_refresh_token'),
+            google_credentials.get('google_client_id'),
+            google_credentials.get('google_client_secret'),
+            scopes=calendar_scopes,  # CRITICAL: Required for token refresh
             token=google_credentials.get('google_access_token'),  # Can be None
-            refresh_token=google_credentials.get('google_refresh_token'),
-            client_id=google_credentials.get('google_client_id'),
-            client_secret=google_credentials.get('google_client_secret'),
-            token_uri='https://oauth2.googleapis.com/token',
-            scopes=calendar_scopes  # CRITICAL: Required for token refresh
+            expiry=google_credentials.get('google_token_expires_at'),
         )
 
-        # Build Google Calendar service
-        # If token is None, the library will auto-refresh on first API call
-        self.service = build('calendar', 'v3', credentials=self.credentials)
-        self.calendar_id = 'primary'  # Use primary calendar
+        # Shared asyncio-native Calendar client (pooled keep-alive HTTP connection)
+        # If token is None, the client refreshes it from the refresh_token on first API call
+        self.client = get_google_async_client(self.credentials, user_key=self.user_id)
+
+    async def _run(self, method: str, call, retry_server_errors: bool = True):
+        """Await a Calendar API call through the shared quota-aware scheduler"""
+        return await get_calendar_scheduler().run_async(
+            self.user_id,
+            CALENDAR_QUOTA_UNITS[method],
+            call,
+            retry_server_errors=retry_server_errors
+        )
 
     async def execute_booking_request(
         self,
@@ -221,14 +237,11 @@ class GoogleWorkspaceExecutor:
         if event_data.get('guestsCanModify') is not None:
             event_body['guestsCanModify'] = event_data['guestsCanModify']
 
-        # Execute API call in thread pool to avoid blocking
-        def _sync_create():
-            return self.service.events().insert(
-                calendarId=self.calendar_id,
-                body=event_body
-            ).execute()
-
-        event = await asyncio.to_thread(_sync_create)
+        event = await self._run(
+            'events.insert',
+            lambda: self.client.calendar_events_insert(event_body, self.calendar_id),
+            retry_server_errors=False
+        )
 
         # Return user-friendly message
         event_link = event.get('htmlLink', '')
@@ -241,13 +254,10 @@ class GoogleWorkspaceExecutor:
             raise ValueError("event_id required for update operation")
 
         # Get existing event first
-        def _sync_get():
-            return self.service.events().get(
-                calendarId=self.calendar_id,
-                eventId=event_id
-            ).execute()
-
-        existing_event = await asyncio.to_thread(_sync_get)
+        existing_event = await self._run(
+            'events.get',
+            lambda: self.client.calendar_events_get(event_id, self.calendar_id)
+        )
 
         # Update fields
         if event_data.get('summary'):
@@ -274,14 +284,10 @@ class GoogleWorkspaceExecutor:
             existing_event['visibility'] = event_data['visibility']
 
         # Execute update
-        def _sync_update():
-            return self.service.events().update(
-                calendarId=self.calendar_id,
-                eventId=event_id,
-                body=existing_event
-            ).execute()
-
-        updated_event = await asyncio.to_thread(_sync_update)
+        updated_event = await self._run(
+            'events.update',
+            lambda: self.client.calendar_events_update(event_id, existing_event, self.calendar_id)
+        )
 
         event_link = updated_event.get('htmlLink', '')
         return f"Successfully updated event with ID: {event_id}. The calendar event '{updated_event['summary']}' has been successfully updated. View event: {event_link}"
@@ -297,13 +303,10 @@ class GoogleWorkspaceExecutor:
             return "No attendees provided to add"
 
         # Get existing event
-        def _sync_get():
-            return self.service.events().get(
-                calendarId=self.calendar_id,
-                eventId=event_id
-            ).execute()
-
-        existing_event = await asyncio.to_thread(_sync_get)
+        existing_event = await self._run(
+            'events.get',
+            lambda: self.client.calendar_events_get(event_id, self.calendar_id)
+        )
 
         # Get existing attendees
         existing_attendees = existing_event.get('attendees', [])
@@ -322,15 +325,15 @@ class GoogleWorkspaceExecutor:
         existing_event['attendees'] = existing_attendees + new_attendees
 
         # Execute update
-        def _sync_update():
-            return self.service.events().patch(
-                calendarId=self.calendar_id,
-                eventId=event_id,
-                body={'attendees': existing_event['attendees']},
+        updated_event = await self._run(
+            'events.update',
+            lambda: self.client.calendar_events_patch(
+                event_id,
+                {'attendees': existing_event['attendees']},
+                self.calendar_id,
                 sendUpdates='all'  # Send email notifications
-            ).execute()
-
-        updated_event = await asyncio.to_thread(_sync_update)
+            )
+        )
 
         event_link = updated_event.get('htmlLink', '')
         added_emails = [att['email'] for att in new_attendees]
@@ -343,13 +346,11 @@ class GoogleWorkspaceExecutor:
             raise ValueError("event_id required for delete operation")
 
         # Execute delete
-        def _sync_delete():
-            return self.service.events().delete(
-                calendarId=self.calendar_id,
-                eventId=event_id
-            ).execute()
-
-        await asyncio.to_thread(_sync_delete)
+        await self._run(
+            'events.delete',
+            lambda: self.client.calendar_events_delete(event_id, self.calendar_id),
+            retry_server_errors=False
+        )
 
         return f"Successfully deleted event with ID: {event_id}"
 
@@ -360,13 +361,11 @@ class GoogleWorkspaceExecutor:
             raise ValueError("text or summary required for quick add")
 
         # Execute quick add
-        def _sync_quick_add():
-            return self.service.events().quickAdd(
-                calendarId=self.calendar_id,
-                text=text
-            ).execute()
-
-        event = await asyncio.to_thread(_sync_quick_add)
+        event = await self._run(
+            'events.quickAdd',
+            lambda: self.client.calendar_events_quick_add(text, self.calendar_id),
+            retry_server_errors=False
+        )
 
         event_link = event.get('htmlLink', '')
         return f"Successfully created event via quick add: '{event['summary']}' with ID: {event['id']}. View event: {event_link}"
@@ -468,7 +467,6 @@ class GoogleWorkspaceExecutor:
         try:
             # Build query parameters
             params = {
-                'calendarId': self.calendar_id,
                 'maxResults': max_results,
                 'singleEvents': single_events,
                 'orderBy': order_by if order_by == "startTime" else None
@@ -479,11 +477,10 @@ class GoogleWorkspaceExecutor:
             if time_max:
                 params['timeMax'] = time_max
 
-            # Execute API call in thread pool
-            def _sync_list():
-                return self.service.events().list(**params).execute()
-
-            events_result = await asyncio.to_thread(_sync_list)
+            events_result = await self._run(
+                'events.list',
+                lambda: self.client.calendar_events_list(self.calendar_id, **params)
+            )
             events = events_result.get('items', [])
 
             if not events:
@@ -529,14 +526,10 @@ class GoogleWorkspaceExecutor:
             Formatted string with event details for LLM consumption
         """
         try:
-            # Execute API call in thread pool
-            def _sync_get():
-                return self.service.events().get(
-                    calendarId=self.calendar_id,
-                    eventId=event_id
-                ).execute()
-
-            event = await asyncio.to_thread(_sync_get)
+            event = await self._run(
+                'events.get',
+                lambda: self.client.calendar_events_get(event_id, self.calendar_id)
+            )
 
             # Format event details
             start = event['start'].get('dateTime', event['start'].get('date'))
@@ -584,11 +577,7 @@ Link: {html_link}"""
             Formatted string with calendar list for LLM consumption
         """
         try:
-            # Execute API call in thread pool
-            def _sync_list_calendars():
-                return self.service.calendarList().list().execute()
-
-            calendar_list = await asyncio.to_thread(_sync_list_calendars)
+            calendar_list = await self._run('calendarList.list', self.client.calendar_list_list)
             calendars = calendar_list.get('items', [])
 
             if not calendars:
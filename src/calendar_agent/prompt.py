@@ -8,6 +8,8 @@ EXTRACTED FROM ALL calendar agent files TO PRESERVE EXISTING WORKING FUNCTIONALI
 - booking_node.py: Booking extraction prompts
 """
 
+from typing import Tuple
+
 # =============================================================================
 # MAIN AGENT PROMPTS (from calendar_orchestrator.py)
 # =============================================================================
@@ -44,15 +46,9 @@ CRITICAL RULES:
 
 # Main system prompt for calendar agent with tools - extracted from calendar_orchestrator.py
 # This is the core working prompt that should be editable through config UI
+# CONTEXT comes last: everything above it is a stable prefix the LLM provider can cache
 AGENT_SYSTEM_PROMPT = """You are a helpful Calendar Agent with READ-ONLY access to Google Calendar via Google Workspace API.
 
-CONTEXT (use for all relative references):
-- Now: {current_time}
-- Timezone: {timezone_name}
-- Today: {today}
-- Tomorrow: {tomorrow}
-
-
 PRINCIPLES
 - Assume ALL user times are in the user's LOCAL timezone.
 - Never ask for timezone; never convert to UTC in tool calls.
@@ -73,7 +69,7 @@ TOOL USAGE
 
 
 BOOKING REQUESTS (requires approval workflow)
-1) IMPORTANT: First, CHECK AVAILABILITY with read-only tools using the context above and the AVAILABILITY SEARCH STRATEGY below with list-event.
+1) IMPORTANT: First, CHECK AVAILABILITY with read-only tools using the CONTEXT at the end and the AVAILABILITY SEARCH STRATEGY below with list-event.
 2) If the requested slot is free, respond exactly with:
    "Time slot is available. This requires booking approval -- I'll transfer you to the booking approval workflow."
 3) If there is a conflict:
@@ -112,7 +108,14 @@ USER FEEDBACK AND INPUT
 - Always follow your instruction, even if you did it in prior workflow.
 - The goal is to always help the user with the latest request.
 
-"""
+CONTEXT (use for all relative references):
+- Now: {current_time}
+- Timezone: {timezone_name}
+- Today: {today}
+- Tomorrow: {tomorrow}"""
+
+# Placeholders filled per call - prompt text after the first of them is not cacheable
+CONTEXT_PLACEHOLDERS = ("{current_time}", "{timezone_name}", "{today}", "{tomorrow}")
 
 # =============================================================================
 # ROUTING PROMPTS (from calendar_orchestrator.py)
@@ -283,12 +286,30 @@ def get_formatted_prompt_with_context(timezone_name: str, current_time_iso: str,
     Get the formatted system prompt with dynamic context
     Used by the calendar_orchestrator at runtime
     """
-    return AGENT_SYSTEM_PROMPT.format(
-        current_time=current_time_iso,
-        timezone_name=timezone_name,
-        today=today_str,
-        tomorrow=tomorrow_str
-    )
+    return "".join(get_formatted_prompt_parts(AGENT_SYSTEM_PROMPT, timezone_name, current_time_iso, today_str, tomorrow_str))
+
+def get_formatted_prompt_parts(template: str, timezone_name: str, current_time_iso: str, today_str: str, tomorrow_str: str) -> Tuple[str, str]:
+    """
+    Format a system prompt template as (stable prefix, volatile rest)
+
+    The split is at the paragraph holding the first context placeholder, so the
+    prefix stays identical across calls and can be cached by the LLM provider.
+    User-edited prompts with CONTEXT at the top simply get a short prefix.
+    """
+    positions = [template.find(placeholder) for placeholder in CONTEXT_PLACEHOLDERS]
+    positions = [position for position in positions if position >= 0]
+    cut = len(template)
+    if positions:
+        paragraph_start = template.rfind("\n\n", 0, min(positions))
+        cut = paragraph_start if paragraph_start >= 0 else 0
+
+    context = {
+        "current_time": current_time_iso,
+        "timezone_name": timezone_name,
+        "today": today_str,
+        "tomorrow": tomorrow_str,
+    }
+    return template[:cut].format(**context), template[cut:].format(**context)
 
 def get_no_tools_prompt() -> str:
     """
@@ -5,9 +5,13 @@ Exposes Python agent configs to Next.js config-app
 from fastapi import FastAPI, HTTPException, Header, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 import os
 import sys
+import json
+import base64
+import hmac
+import asyncio
 from pathlib import Path
 from importlib import import_module
 from dotenv import load_dotenv
@@ -72,6 +76,24 @@ LANGGRAPH_DEPLOYMENT_URL = os.getenv(
     "https://multi-agent-app-1d1e061875eb5640a47e3bb201edb076.us.langgraph.app"
 )
 
+# Push-based Gmail ingestion (Gmail watch -> Pub/Sub push -> /api/webhooks/gmail-push)
+# When a topic is configured, per-user crons only act as a slow fallback.
+GMAIL_PUSH_TOPIC = os.getenv("GMAIL_PUSH_TOPIC")
+# Required: the webhook rejects every notification when it is unset
+GMAIL_PUSH_VERIFICATION_TOKEN = os.getenv("GMAIL_PUSH_VERIFICATION_TOKEN")
+GMAIL_PUSH_DEBOUNCE_SECONDS = float(os.getenv("GMAIL_PUSH_DEBOUNCE_SECONDS", "5"))
+DEFAULT_CRON_SCHEDULE = os.getenv(
+    "EXECUTIVE_CRON_SCHEDULE",
+    "*/15 * * * *" if GMAIL_PUSH_TOPIC and GMAIL_PUSH_VERIFICATION_TOKEN else "* * * * *"
+)
+
+# Shared secret the config app sends (X-Webhook-Secret) to internal webhooks
+# such as /api/webhooks/mcp-connected; they reject every call when it is unset
+CONFIG_API_WEBHOOK_SECRET = os.getenv("CONFIG_API_WEBHOOK_SECRET")
+
+# Central ingestion service (scripts/run_ingestion_service.py) instead of per-user crons
+INGESTION_SERVICE_ENABLED = os.getenv("INGESTION_SERVICE_ENABLED", "false").lower() == "true"
+
 # Agent directories to scan
 AGENT_PATHS = [
     "calendar_agent",
@@ -506,6 +528,19 @@ async def get_config_values(agent_id: Optional[str] = None, user_id: Optional[st
         raise HTTPException(status_code=500, detail=f"Error fetching config: {str(e)}")
 
 
+def _bump_config_version(user_id: str) -> None:
+    """
+    Bump user_secrets.config_version (migration 015) after a config write.
+    Agents cache config in their own processes and compare this version.
+    """
+    if not supabase:
+        return
+    try:
+        supabase.rpc("bump_user_config_version", {"p_clerk_id": user_id}).execute()
+    except Exception as e:
+        print(f"[CONFIG] Could not bump config_version for {user_id}: {e}")
+
+
 @app.post("/api/config/update")
 async def update_config(request: UpdateConfigRequest):
     """
@@ -562,12 +597,18 @@ async def update_config(request: UpdateConfigRequest):
             if not column_name:
                 raise HTTPException(status_code=400, detail=f"Unknown field: {request.field_key}")
 
+            row = {
+                "clerk_id": request.user_id,
+                column_name: request.value
+            }
+            if column_name == "google_refresh_token":
+                # The stored access token belongs to the previous grant
+                row["google_access_token"] = None
+                row["google_token_expires_at"] = None
+
             # Upsert into user_secrets
             result = supabase.table("user_secrets") \
-                .upsert({
-                    "clerk_id": request.user_id,
-                    column_name: request.value
-                }, on_conflict="clerk_id") \
+                .upsert(row, on_conflict="clerk_id") \
                 .execute()
 
             return {"success": True, "updated": column_name}
@@ -655,6 +696,9 @@ async def update_config(request: UpdateConfigRequest):
     except Exception as e:
         print(f"Error updating config: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Agents run in other processes - they drop cached config older than this version
+        _bump_config_version(request.user_id)
 
 
 @app.post("/api/config/bulk-update")
@@ -689,6 +733,8 @@ async def bulk_update_config(request: BulkUpdateRequest):
     except Exception as e:
         print(f"Error bulk updating config: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        _bump_config_version(request.user_id)
 
 
 class ResetConfigRequest(BaseModel):
@@ -791,6 +837,8 @@ async def reset_config(request: ResetConfigRequest):
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        _bump_config_version(request.user_id)
 
 
 # ============================================================================
@@ -801,7 +849,13 @@ class GmailConnectedWebhook(BaseModel):
     """Webhook payload when user completes Gmail OAuth"""
     user_id: str
     email: str
-    schedule: str = "* * * * *"  # Default: every 1 minute
+    schedule: str = DEFAULT_CRON_SCHEDULE  # Every minute, or every 15 minutes as push fallback
+
+
+class MCPConnectedWebhook(BaseModel):
+    """Webhook payload when user completes MCP OAuth (global or per-agent)"""
+    user_id: str
+    agent_id: Optional[str] = None  # None or "global" for user_secrets.mcp_universal
 
 
 class CronManagementRequest(BaseModel):
@@ -810,7 +864,7 @@ class CronManagementRequest(BaseModel):
     action: str  # "pause", "resume", "delete"
 
 
-async def create_user_cron(user_id: str, email: str, schedule: str = "* * * * *") -> Dict[str, Any]:
+async def create_user_cron(user_id: str, email: str, schedule: str = DEFAULT_CRON_SCHEDULE) -> Dict[str, Any]:
     """
     Create a per-user cron job for Executive AI Assistant email processing
 
@@ -822,6 +876,27 @@ async def create_user_cron(user_id: str, email: str, schedule: str = "* * * * *"
     if not supabase:
         raise HTTPException(status_code=500, detail="Supabase not configured")
 
+    if INGESTION_SERVICE_ENABLED:
+        # The central ingestion service picks up every active user_crons row -
+        # no per-user assistant or LangGraph cron needed
+        supabase.table("user_crons").upsert({
+            "user_id": user_id,
+            "cron_id": None,
+            "email": email.lower(),  # Push lookups compare lowercase addresses
+            "status": "active",
+            "schedule": None,
+        }, on_conflict="user_id").execute()
+
+        print(f"[CRON] Registered user {user_id} ({email}) with the central ingestion service")
+
+        return {
+            "success": True,
+            "cron_id": None,
+            "ingestion": "service",
+            "user_id": user_id,
+            "email": email
+        }
+
     try:
         # Initialize LangGraph SDK client
         langgraph_client = get_langgraph_client(url=LANGGRAPH_DEPLOYMENT_URL)
@@ -859,7 +934,8 @@ async def create_user_cron(user_id: str, email: str, schedule: str = "* * * * *"
         supabase.table("user_crons").upsert({
             "user_id": user_id,
             "cron_id": cron["cron_id"],
-            "email": email,
+            "assistant_id": assistant["assistant_id"],  # Target of push-triggered runs
+            "email": email.lower(),  # Push lookups compare lowercase addresses
             "status": "active",
             "schedule": schedule,
         }, on_conflict="user_id").execute()
@@ -925,6 +1001,30 @@ async def webhook_gmail_connected(payload: GmailConnectedWebhook):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/webhooks/mcp-connected")
+async def webhook_mcp_connected(
+    payload: MCPConnectedWebhook,
+    x_webhook_secret: Optional[str] = Header(None),
+):
+    """
+    Webhook called by the config app's MCP OAuth callbacks after new tokens
+    were stored. Bumps the user's config_version, so agents (other processes)
+    stop serving their cached MCP tokens and config.
+
+    Fails closed: without CONFIG_API_WEBHOOK_SECRET the endpoint is disabled.
+    """
+    if not CONFIG_API_WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="Webhook secret is not configured")
+    if not x_webhook_secret or not hmac.compare_digest(
+        x_webhook_secret.encode("utf-8"), CONFIG_API_WEBHOOK_SECRET.encode("utf-8")
+    ):
+        raise HTTPException(status_code=403, detail="Invalid webhook secret")
+
+    print(f"[WEBHOOK] MCP connected for user {payload.user_id} (agent={payload.agent_id or 'global'})")
+    _bump_config_version(payload.user_id)
+    return {"success": True}
+
+
 @app.post("/api/cron/manage")
 async def manage_user_cron(request: CronManagementRequest):
     """
@@ -956,8 +1056,9 @@ async def manage_user_cron(request: CronManagementRequest):
         langgraph_client = get_langgraph_client(url=LANGGRAPH_DEPLOYMENT_URL)
 
         if request.action == "delete":
-            # Delete cron from LangGraph
-            await langgraph_client.crons.delete(cron_id)
+            # Delete cron from LangGraph (service-managed users have none)
+            if cron_id:
+                await langgraph_client.crons.delete(cron_id)
 
             # Update Supabase
             supabase.table("user_crons") \
@@ -1019,6 +1120,141 @@ async def get_user_cron_status(user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ============================================================================
+# PUSH-BASED GMAIL INGESTION
+# ============================================================================
+
+class PubSubMessage(BaseModel):
+    """Pub/Sub message as delivered by a push subscription"""
+    data: str  # base64-encoded JSON: {"emailAddress": ..., "historyId": ...}
+    messageId: Optional[str] = None
+    publishTime: Optional[str] = None
+    attributes: Optional[Dict[str, str]] = None
+
+
+class PubSubPushEnvelope(BaseModel):
+    """Body of a Pub/Sub push request"""
+    message: PubSubMessage
+    subscription: Optional[str] = None
+
+
+# Debounce marker per mailbox while a push-triggered run waits - coalesces notification bursts
+_pending_push_runs: Dict[str, object] = {}
+# Strong references to the push tasks (the event loop only keeps weak ones)
+_push_tasks: Set[asyncio.Task] = set()
+
+
+def _decode_gmail_notification(message: PubSubMessage) -> Dict[str, Any]:
+    """Decode the Gmail notification carried in a Pub/Sub message"""
+    try:
+        return json.loads(base64.b64decode(message.data).decode("utf-8"))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid Pub/Sub message data: {e}")
+
+
+async def _trigger_push_ingestion(email_address: str, marker: object, assistant_id: str, user_id: str):
+    """Run executive_cron for one user after the debounce window
+
+    The run uses the same assistant as the user's cron. executive_cron holds the
+    user's ingestion lease while it runs, so a push run and a cron tick that
+    overlap never sync the same Gmail history range twice.
+    """
+    try:
+        await asyncio.sleep(GMAIL_PUSH_DEBOUNCE_SECONDS)
+    finally:
+        # Drop the pending marker first so notifications arriving during the run
+        # schedule a follow-up run instead of being swallowed
+        if _pending_push_runs.get(email_address) is marker:
+            _pending_push_runs.pop(email_address, None)
+
+    try:
+        langgraph_client = get_langgraph_client(url=LANGGRAPH_DEPLOYMENT_URL)
+        await langgraph_client.runs.create(
+            None,  # Stateless run, same as a cron tick
+            assistant_id,
+            input={"minutes_since": 30},
+            metadata={"owner": user_id, "trigger": "gmail_push"},
+        )
+        print(f"[PUSH] Triggered ingestion for user {user_id} ({email_address})")
+    except Exception as e:
+        print(f"[PUSH] Failed to trigger ingestion for {email_address}: {e}")
+
+
+@app.post("/api/webhooks/gmail-push")
+async def webhook_gmail_push(envelope: PubSubPushEnvelope, token: Optional[str] = None):
+    """
+    Pub/Sub push endpoint for Gmail watch notifications
+    Triggers email ingestion only for the mailbox that changed
+
+    Configure the Pub/Sub push subscription to call:
+        {CONFIG_API_URL}/api/webhooks/gmail-push?token={GMAIL_PUSH_VERIFICATION_TOKEN}
+
+    With INGESTION_SERVICE_ENABLED, the user is marked due for the central
+    ingestion service instead of triggering a run directly.
+
+    Always acknowledges (2xx) notifications we cannot act on, otherwise
+    Pub/Sub keeps redelivering them. The per-user cron remains the fallback.
+
+    Fails closed: without GMAIL_PUSH_VERIFICATION_TOKEN the endpoint is disabled,
+    since anyone could otherwise trigger ingestion runs for any mailbox.
+    """
+    if not GMAIL_PUSH_VERIFICATION_TOKEN:
+        raise HTTPException(status_code=503, detail="Gmail push is not configured")
+    if not token or not hmac.compare_digest(token.encode("utf-8"), GMAIL_PUSH_VERIFICATION_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid push verification token")
+
+    notification = _decode_gmail_notification(envelope.message)
+    email_address = (notification.get("emailAddress") or "").lower()
+    if not email_address:
+        raise HTTPException(status_code=400, detail="Notification missing emailAddress")
+
+    if email_address in _pending_push_runs:
+        return {"success": True, "status": "debounced", "email": email_address}
+
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Supabase not configured")
+
+    try:
+        result = supabase.table("user_crons") \
+            .select("user_id, assistant_id, status") \
+            .eq("email", email_address) \
+            .limit(1) \
+            .execute()
+    except Exception as e:
+        print(f"[PUSH] Failed to look up mailbox {email_address}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    row = result.data[0] if result and result.data else None
+    if row and row.get("status") == "active" and INGESTION_SERVICE_ENABLED:
+        # Make the user due immediately - the next service claim ingests it
+        try:
+            supabase.table("ingestion_leases") \
+                .upsert({"user_id": row["user_id"], "last_ingested_at": None}, on_conflict="user_id") \
+                .execute()
+        except Exception as e:
+            print(f"[PUSH] Failed to mark {email_address} due: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+        return {"success": True, "status": "queued", "email": email_address}
+
+    if not row or row.get("status") != "active" or not row.get("assistant_id"):
+        print(f"[PUSH] Ignoring notification for {email_address} (no active push-enabled user)")
+        return {"success": True, "status": "ignored", "email": email_address}
+
+    marker = object()
+    _pending_push_runs[email_address] = marker
+    task = asyncio.create_task(
+        _trigger_push_ingestion(email_address, marker, row["assistant_id"], row["user_id"])
+    )
+    _push_tasks.add(task)
+    task.add_done_callback(_push_tasks.discard)
+    return {
+        "success": True,
+        "status": "scheduled",
+        "email": email_address,
+        "history_id": notification.get("historyId"),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
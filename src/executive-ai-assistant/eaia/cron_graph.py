@@ -1,17 +1,24 @@
-from typing import TypedDict
-from eaia.gmail import fetch_group_emails
-from langgraph_sdk import get_client
-import httpx
+import os
 import uuid
-import hashlib
+from typing import NotRequired, TypedDict
+from eaia.ingestion import ingest_user_emails
+from langgraph_sdk import get_client
 from langgraph.graph import StateGraph, START, END
 from eaia.main.config import get_config
+from utils.supabase_db import claim_ingestion_lease, is_supabase_configured, release_ingestion_lease
 
 client = get_client()
 
+# Cron ticks and push-triggered runs both land here; the user's ingestion lease
+# keeps them (and the central ingestion service) from syncing a mailbox twice at once
+CRON_LEASE_SECONDS = int(os.getenv("EXECUTIVE_CRON_LEASE_SECONDS", "600"))
+
 
 class JobKickoff(TypedDict):
     minutes_since: int
+    # Opt-in: list threads instead of messages so each thread is fetched once per tick
+    # (defaults to False, same as fetch_group_emails and scripts/run_ingest.py)
+    by_thread: NotRequired[bool]
 
 
 async def main(state: JobKickoff, config):
@@ -39,64 +46,42 @@ async def main(state: JobKickoff, config):
         return  # Exit gracefully
 
     print(f"[CRON] Processing emails for user {user_id} ({email_address})")
-    print(f"[CRON] Fetching emails from last {minutes_since} minutes")
-
-    # Ensure user_id is in config for OAuth credential fetching
-    if "configurable" not in config:
-        config["configurable"] = {}
-    config["configurable"]["user_id"] = user_id
-    config["metadata"] = {"user_id": user_id, "clerk_user_id": user_id}
-
-    email_count = 0
-    processed_count = 0
-
-    async for email in fetch_group_emails(email_address, minutes_since=minutes_since, config=config):
-        email_count += 1
-        print(f"[CRON] Email {email_count}: {email.get('subject', 'No Subject')[:50]}")
-        thread_id = str(
-            uuid.UUID(hex=hashlib.md5(email["thread_id"].encode("UTF-8")).hexdigest())
-        )
+    print(f"[CRON] Fetching emails from last {minutes_since} minutes (or since last Gmail historyId)")
+
+    lease_id = None
+    if is_supabase_configured():
+        lease_id = str(config.get("configurable", {}).get("run_id") or uuid.uuid4())
         try:
-            thread_info = await client.threads.get(thread_id)
-        except httpx.HTTPStatusError as e:
-            if "user_respond" in email:
-                continue
-            if e.response.status_code == 404:
-                # Create thread with graph_id and owner metadata for Agent Inbox filtering
-                thread_info = await client.threads.create(
-                    thread_id=thread_id,
-                    metadata={
-                        "graph_id": "executive_main",
-                        "owner": user_id  # Required for auth.py multi-tenant filtering
-                    }
-                )
-            else:
-                raise e
-        if "user_respond" in email:
-            await client.threads.update_state(thread_id, None, as_node="__end__")
-            continue
-        recent_email = thread_info["metadata"].get("email_id")
-        if recent_email == email["id"]:
-            break
-        await client.threads.update(thread_id, metadata={
-            "graph_id": "executive_main",  # Preserve graph_id for inbox filtering
-            "owner": user_id,  # Preserve owner for auth.py multi-tenant filtering
-            "email_id": email["id"]
-        })
-
-        await client.runs.create(
-            thread_id,
-            "executive_main",
-            input={"email": email},
-            config={
-                "configurable": {
-                    "user_id": user_id
-                }
-            },
-            multitask_strategy="rollback",
+            if not await claim_ingestion_lease(user_id, lease_id, CRON_LEASE_SECONDS):
+                print(f"[CRON] Another ingestion run holds the lease for user {user_id}, skipping")
+                return
+        except Exception as e:
+            # e.g. create_ingestion_leases.sql not applied - ingest without a lease
+            print(f"[CRON] Could not claim ingestion lease: {e}")
+            lease_id = None
+
+    ingested = False
+    try:
+        result = await ingest_user_emails(
+            client,
+            user_id,
+            email_address,
+            minutes_since=minutes_since,
+            config=config,
+            by_thread=state.get("by_thread", False),
+            log_prefix="[CRON]",
         )
-        processed_count += 1
-        print(f"[CRON] Created workflow run for thread {thread_id}")
+        ingested = True
+    finally:
+        if lease_id:
+            try:
+                await release_ingestion_lease(user_id, lease_id, ingested)
+            except Exception as e:
+                # The lease expires on its own after CRON_LEASE_SECONDS
+                print(f"[CRON] Could not release ingestion lease: {e}")
+
+    email_count = result["email_count"]
+    processed_count = result["processed_count"]
 
     # Final summary
     print(f"[CRON] Completed for user {user_id}: {processed_count}/{email_count} emails processed")
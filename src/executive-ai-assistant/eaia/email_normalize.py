@@ -0,0 +1,276 @@
+"""Normalize raw email bodies before they are pasted into LLM prompts.
+
+Gmail bodies are often HTML, carry the whole quoted reply chain, a signature
+and long tracking URLs. ``normalize_email_body`` turns them into compact plain
+text: HTML -> text, quoted reply history and signature stripped, tracking
+pixels dropped, tracking redirects unwrapped or shortened and the result
+capped at a token budget.
+
+Forwarded messages are content, not history, and are always kept. Other URLs
+(meeting links, calendar invites, documents) are never shortened.
+
+The original body is never modified in Gmail - ``eaia.gmail.fetch_original_body``
+gets it back; the drafting node uses it (see eaia.main.draft_response).
+"""
+import html
+import os
+import re
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import html2text
+
+    HTML2TEXT_AVAILABLE = True
+except ImportError:
+    HTML2TEXT_AVAILABLE = False
+
+# Rough chars-per-token ratio for English email text (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+DEFAULT_MAX_BODY_TOKENS = int(os.getenv("EMAIL_BODY_MAX_TOKENS", "2000"))
+# The drafter reads the whole thread (quotes kept), so it gets a larger cap
+DRAFT_MAX_BODY_TOKENS = int(os.getenv("EMAIL_DRAFT_BODY_MAX_TOKENS", "8000"))
+# Click-tracking URLs longer than this are shortened to scheme://host/…
+MAX_URL_LENGTH = 60
+
+_BLOCK_TAGS = {
+    "p", "div", "br", "tr", "li", "ul", "ol", "table", "section", "article",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "hr",
+}
+_SKIP_TAGS = {"script", "style", "head", "title", "noscript"}
+
+# Lines that start the quoted history of a reply (English and French clients)
+_QUOTE_HEADER_PATTERNS = [
+    re.compile(r"^\s*On .{0,200}wrote:\s*$", re.IGNORECASE),
+    re.compile(r"^\s*Le .{0,200}a écrit\s*:\s*$", re.IGNORECASE),
+    re.compile(r"^\s*-{2,}\s*Original Message\s*-{2,}\s*$", re.IGNORECASE),
+    re.compile(r"^\s*-{2,}\s*Message d'origine\s*-{2,}\s*$", re.IGNORECASE),
+    re.compile(r"^\s*_{10,}\s*$"),  # Outlook separator line
+]
+# Lines that start a forwarded message - kept, never treated as quoted history
+_FORWARD_HEADER_PATTERNS = [
+    re.compile(r"^\s*-{2,}\s*Forwarded message\s*-{2,}\s*$", re.IGNORECASE),
+    re.compile(r"^\s*-{2,}\s*Message transféré\s*-{2,}\s*$", re.IGNORECASE),
+    re.compile(r"^\s*Begin forwarded message\s*:\s*$", re.IGNORECASE),
+    re.compile(r"^\s*Début du message réexpédié\s*:\s*$", re.IGNORECASE),
+]
+# Outlook quotes with a bare header block: "From: ..." followed by "Sent: ..."
+_OUTLOOK_FROM = re.compile(r"^\s*\*?(From|De)\s*:", re.IGNORECASE)
+_OUTLOOK_NEXT = re.compile(r"^\s*\*?(Sent|Date|Envoyé|To|À|Cc)\s*:", re.IGNORECASE)
+_SIGNATURE_PATTERNS = [
+    re.compile(r"^--\s*$"),
+    re.compile(r"^\s*(Sent from my|Envoyé de mon|Get Outlook for)\b.*$", re.IGNORECASE),
+]
+_URL_RE = re.compile(r"https?://[^\s<>\"')\]]+")
+
+# Redirect wrappers whose target is in a query parameter: (host suffix, path prefix, parameter)
+_REDIRECT_WRAPPERS = [
+    ("google.com", "/url", "q"),
+    ("safelinks.protection.outlook.com", "/", "url"),
+    ("urldefense.proofpoint.com", "/v2/url", "u"),
+]
+# Opaque click-tracking hosts of known ESPs (newsletters, marketing tools); the target is not recoverable
+_TRACKING_HOST_RE = re.compile(
+    r"(^|\.)(list-manage\.com|ct\.sendgrid\.net|mandrillapp\.com|hubspotlinks\.com|"
+    r"hs-analytics\.net|mailchimpapp\.net|exacttarget\.com|mkt\d+\.com|rs6\.net|"
+    r"constantcontact\.com|klclick\d*\.com|convertkit-mail\d*\.com|cmail\d+\.com|"
+    r"awstrack\.me|mjt\.lu|sparkpostmail\.com|mlsend\.com)$",
+    re.IGNORECASE,
+)
+# Branded tracking subdomains (click.example.com) are also used for transactional
+# links (password resets, receipts), so they only count with campaign parameters
+_TRACKING_SUBDOMAIN_RE = re.compile(r"^(click|clicks|track|tracking|links|email|e)\.[^/]+$", re.IGNORECASE)
+_TRACKING_PARAM_RE = re.compile(r"(^|&)(utm_[a-z]+|mc_cid|mc_eid|_hsenc|_hsmi|mkt_tok)=", re.IGNORECASE)
+
+
+def _is_tracking_url(parts) -> bool:
+    if _TRACKING_HOST_RE.search(parts.netloc):
+        return True
+    return bool(_TRACKING_SUBDOMAIN_RE.search(parts.netloc) and _TRACKING_PARAM_RE.search(parts.query))
+
+
+class _HTMLToText(HTMLParser):
+    """Minimal stdlib HTML -> text converter (used when html2text is missing)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip_depth = 0
+        self._href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            if href and href.startswith("http"):
+                self._href = href
+        elif tag == "img":
+            attributes = dict(attrs)
+            if not _is_tracking_pixel(attributes) and attributes.get("alt"):
+                self.parts.append(f"[image: {attributes['alt']}]")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+        elif tag == "a" and self._href:
+            self.parts.append(f" ({self._href})")
+            self._href = None
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def _is_tracking_pixel(attributes: dict) -> bool:
+    """1x1 / hidden images are open-tracking beacons, not content."""
+    width = (attributes.get("width") or "").strip().rstrip("px")
+    height = (attributes.get("height") or "").strip().rstrip("px")
+    style = (attributes.get("style") or "").replace(" ", "").lower()
+    return (
+        width in {"0", "1"}
+        or height in {"0", "1"}
+        or "display:none" in style
+        or "width:1px" in style
+        or "height:1px" in style
+    )
+
+
+def looks_like_html(body: str) -> bool:
+    return bool(re.search(r"<(html|body|div|p|br|table|span|a)\b", body[:2000], re.IGNORECASE))
+
+
+def html_to_text(body: str) -> str:
+    """Convert an HTML body to readable plain text."""
+    if HTML2TEXT_AVAILABLE:
+        converter = html2text.HTML2Text()
+        converter.ignore_images = True
+        converter.ignore_emphasis = True
+        converter.body_width = 0
+        return converter.handle(body)
+    parser = _HTMLToText()
+    try:
+        parser.feed(body)
+        parser.close()
+    except Exception:
+        # Malformed HTML - fall back to stripping tags
+        return html.unescape(re.sub(r"<[^>]+>", " ", body))
+    return parser.text()
+
+
+def strip_quoted_history(text: str) -> str:
+    """Drop the quoted reply chain: everything from the first quote header on,
+    plus any remaining ``>``-prefixed lines. A forwarded message (and all that
+    follows it) is kept as is."""
+    lines = text.splitlines()
+    forwarded = []
+    for index, line in enumerate(lines):
+        if any(pattern.match(line) for pattern in _FORWARD_HEADER_PATTERNS):
+            lines, forwarded = lines[:index], lines[index:]
+            break
+    # Never cut at the first line (e.g. a reply with no text of its own)
+    for index, line in enumerate(lines):
+        if index == 0:
+            continue
+        outlook_header = (
+            _OUTLOOK_FROM.match(line)
+            and index + 1 < len(lines)
+            and _OUTLOOK_NEXT.match(lines[index + 1])
+        )
+        if outlook_header or any(pattern.match(line) for pattern in _QUOTE_HEADER_PATTERNS):
+            lines = lines[:index]
+            break
+    kept = [line for line in lines if not line.lstrip().startswith(">")]
+    return "\n".join(kept + forwarded)
+
+
+def strip_signature(text: str) -> str:
+    """Cut a trailing signature block (``-- `` delimiter or mobile footers)."""
+    lines = text.splitlines()
+    # Only look in the tail so a "--" in the middle of the message is kept
+    start = max(1, len(lines) - 15)
+    for index in range(start, len(lines)):
+        if any(pattern.match(lines[index]) for pattern in _SIGNATURE_PATTERNS):
+            return "\n".join(lines[:index])
+    return text
+
+
+def _unwrap_redirect(url: str) -> str:
+    """Target of a known redirect wrapper (Google, Outlook Safe Links, ...), else ``url``."""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    for suffix, path, param in _REDIRECT_WRAPPERS:
+        if (host == suffix or host.endswith("." + suffix)) and parts.path.startswith(path):
+            target = parse_qs(parts.query).get(param, [None])[0]
+            if target and target.startswith("http"):
+                return target
+    return url
+
+
+def compact_urls(text: str, max_length: int = MAX_URL_LENGTH) -> str:
+    """Unwrap redirect wrappers and shorten long click-tracking URLs.
+
+    Every other URL is kept whole: meeting links carry their password and
+    document links their ID in the path or query string.
+    """
+
+    def _compact(match):
+        url = _unwrap_redirect(match.group(0))
+        parts = urlsplit(url)
+        if len(url) <= max_length or not _is_tracking_url(parts):
+            return url
+        return f"{parts.scheme}://{parts.netloc}/…"
+
+    return _URL_RE.sub(_compact, text)
+
+
+def truncate_to_tokens(text: str, max_tokens: int | None) -> str:
+    """Cap ``text`` at roughly ``max_tokens`` tokens, noting what was cut."""
+    if not max_tokens:
+        return text
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    cut = cut if cut > max_chars // 2 else max_chars
+    return text[:cut].rstrip() + f"\n\n[... truncated {len(text) - cut} characters]"
+
+
+def _collapse_whitespace(text: str) -> str:
+    text = re.sub(r"[ \t ]+", " ", text)
+    text = "\n".join(line.strip() for line in text.splitlines())
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def normalize_email_body(
+    body: str,
+    mime_type: str | None = None,
+    max_tokens: int | None = DEFAULT_MAX_BODY_TOKENS,
+    strip_quotes: bool = True,
+) -> str:
+    """Run the full normalization pipeline on one email body.
+
+    Args:
+        body: Raw decoded body
+        mime_type: ``text/html`` or ``text/plain``; sniffed when None
+        max_tokens: Approximate token cap (None/0 disables the cap)
+        strip_quotes: Drop quoted reply history and the signature
+    """
+    if not body:
+        return body
+    if mime_type == "text/html" or (mime_type is None and looks_like_html(body)):
+        body = html_to_text(body)
+    body = body.replace("\r\n", "\n")
+    normalized = strip_signature(strip_quoted_history(body)) if strip_quotes else body
+    normalized = _collapse_whitespace(compact_urls(normalized))
+    # A reply that is only quoted text would normalize to nothing - keep it
+    if not normalized:
+        normalized = _collapse_whitespace(compact_urls(body))
+    return truncate_to_tokens(normalized, max_tokens)
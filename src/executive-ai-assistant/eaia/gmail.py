@@ -1,5 +1,6 @@
 import logging
 import asyncio
+import functools
 from datetime import datetime, timedelta, time
 from pathlib import Path
 from typing import Iterable
@@ -9,7 +10,7 @@ import json
 
 from dateutil import parser
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 import base64
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -19,6 +20,16 @@ from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 
 from eaia.schemas import EmailData
+from eaia.email_normalize import DEFAULT_MAX_BODY_TOKENS, normalize_email_body
+from eaia.message_cache import MessageCache, get_message_cache, message_key, thread_key
+from utils.google_async_client import get_google_async_client
+from utils.google_token_cache import get_token_cache
+from utils.google_api_scheduler import (
+    CALENDAR_QUOTA_UNITS,
+    GMAIL_QUOTA_UNITS,
+    get_calendar_scheduler,
+    get_gmail_scheduler,
+)
 
 # Load executive AI assistant's local .env file for Gmail credentials
 from dotenv import load_dotenv
@@ -31,6 +42,24 @@ _SCOPES = [
     "https://www.googleapis.com/auth/calendar",
 ]
 
+# Messages/threads fetched per chunk. A chunk is issued as concurrent
+# messages.get/threads.get requests through the Gmail scheduler, which caps
+# in-flight calls (GMAIL_MAX_CONCURRENCY) and quota units per second, so this
+# only bounds how much is fetched (and held in memory) before yielding.
+MAX_BATCH_SIZE = 100
+DEFAULT_BATCH_SIZE = 50
+
+# Incremental sync only ingests messages Gmail filed in the inbox or sent
+# folder, mirroring what the `to:me OR from:me` window query returns
+# (search never matches drafts, spam, trash or chats).
+_HISTORY_LABELS = {"INBOX", "SENT"}
+# Headers ingestion reads before deciding whether a message needs its body
+_METADATA_HEADERS = ["From", "To", "Subject", "Date", "Reply-To", "Message-ID"]
+
+
+class HistoryExpiredError(Exception):
+    """Raised when a stored Gmail historyId is too old for users.history.list."""
+
 
 async def get_credentials(
     user_email: str,
@@ -42,7 +71,8 @@ async def get_credentials(
     Following the proven calendar_agent pattern:
     - Fetches refresh_token from Supabase via utils/google_oauth_utils.py
     - Gets OAuth app credentials (client_id/secret) from .env
-    - Creates Google Credentials object with auto-refresh
+    - Returns the user's shared Credentials from utils/google_token_cache.py,
+      so the access token is refreshed once per process rather than per call
 
     Args:
         user_email: User's Gmail email address
@@ -55,7 +85,7 @@ async def get_credentials(
     logger.info(f"[get_credentials] Starting credential fetch for {user_email}")
 
     # Import centralized OAuth utility (same as calendar_agent)
-    from utils.google_oauth_utils import load_google_credentials
+    from utils.google_oauth_utils import load_google_token_record
 
     # Extract user_id from LangGraph config
     user_id = None
@@ -74,11 +104,13 @@ async def get_credentials(
     client_id = None
     client_secret = None
     refresh_token = None
+    token_record = None
 
     if user_id:
         try:
             logger.info(f"[get_credentials] Fetching refresh_token from Supabase for user_id: {user_id}")
-            refresh_token = await load_google_credentials(user_id)
+            token_record = await load_google_token_record(user_id)
+            refresh_token = token_record["refresh_token"] if token_record else None
 
             if refresh_token:
                 logger.info("✓ [get_credentials] Loaded Google refresh_token from Supabase user_secrets")
@@ -126,40 +158,52 @@ async def get_credentials(
         logger.error(f"✗ [get_credentials] {error_msg}")
         raise ValueError(error_msg)
 
-    # Create credentials with refresh token (OAuth 2.0 best practice)
-    logger.info("[get_credentials] Creating Google OAuth2 Credentials object")
-    logger.debug(f"[get_credentials] Token URI: https://oauth2.googleapis.com/token")
+    # Shared per-user credentials: the access token is refreshed once and
+    # reused by every Gmail/Calendar call until shortly before it expires
     logger.debug(f"[get_credentials] Scopes: {', '.join(_SCOPES)}")
 
-    creds = Credentials(
-        token=None,  # Will be refreshed automatically on first API call
-        refresh_token=refresh_token,
-        token_uri="https://oauth2.googleapis.com/token",
-        client_id=client_id,
-        client_secret=client_secret,
-        scopes=_SCOPES
+    # A still-valid access token stored by another process is reused as-is
+    creds = await get_token_cache().get_credentials(
+        user_id or user_email,
+        refresh_token,
+        client_id,
+        client_secret,
+        scopes=_SCOPES,
+        token=token_record["access_token"] if token_record else None,
+        expiry=token_record["expires_at"] if token_record else None,
     )
 
-    logger.info("✓ [get_credentials] Successfully created credentials object")
+    logger.info("✓ [get_credentials] Successfully loaded credentials")
     return creds
 
 
-def extract_message_part(msg):
-    """Recursively walk through the email parts to find message body."""
-    if msg["mimeType"] == "text/plain":
-        body_data = msg.get("body", {}).get("data")
-        if body_data:
-            return base64.urlsafe_b64decode(body_data).decode("utf-8")
-    elif msg["mimeType"] == "text/html":
+def _find_body_part(msg):
+    """Recursively find the first text/plain or text/html part: (mime_type, body)."""
+    if msg["mimeType"] in ("text/plain", "text/html"):
         body_data = msg.get("body", {}).get("data")
         if body_data:
-            return base64.urlsafe_b64decode(body_data).decode("utf-8")
+            return msg["mimeType"], base64.urlsafe_b64decode(body_data).decode("utf-8")
     if "parts" in msg:
         for part in msg["parts"]:
-            body = extract_message_part(part)
-            if body:
-                return body
-    return "No message body available."
+            found = _find_body_part(part)
+            if found:
+                return found
+    return None
+
+
+def extract_message_part(msg):
+    """Recursively walk through the email parts to find message body."""
+    found = _find_body_part(msg)
+    return found[1] if found else "No message body available."
+
+
+def extract_normalized_body(msg, max_tokens: int | None = DEFAULT_MAX_BODY_TOKENS):
+    """Message body normalized for LLM prompts (see eaia.email_normalize)."""
+    found = _find_body_part(msg)
+    if not found:
+        return "No message body available."
+    mime_type, body = found
+    return normalize_email_body(body, mime_type=mime_type, max_tokens=max_tokens)
 
 
 def parse_time(send_time: str):
@@ -205,11 +249,15 @@ def get_recipients(
     return list(recipients)
 
 
-async def send_message(service, user_id, message):
-    message = await asyncio.to_thread(
-        lambda: service.users().messages().send(userId=user_id, body=message).execute()
+async def send_message(client, user_id, message, user_key: str | None = None):
+    # Sends are not idempotent - only retry when Gmail rate limited the call
+    sent = await get_gmail_scheduler().run_async(
+        user_key or user_id,
+        GMAIL_QUOTA_UNITS["messages.send"],
+        lambda: client.gmail_messages_send(message),
+        retry_server_errors=False,
     )
-    return message
+    return sent
 
 
 async def send_email(
@@ -223,9 +271,16 @@ async def send_email(
 ):
     creds = await get_credentials(email_address, config=config)
 
-    service = await asyncio.to_thread(build, "gmail", "v1", credentials=creds)
-    message = await asyncio.to_thread(
-        lambda: service.users().messages().get(userId="me", id=email_id).execute()
+    client = get_google_async_client(creds, email_address)
+    # Only headers are needed to address the reply
+    message = await get_gmail_scheduler().run_async(
+        email_address,
+        GMAIL_QUOTA_UNITS["messages.get"],
+        lambda: client.gmail_messages_get(
+            email_id,
+            format="metadata",
+            metadata_headers=["From", "To", "Cc", "Subject", "Message-ID"],
+        ),
     )
 
     headers = message["payload"]["headers"]
@@ -246,7 +301,328 @@ async def send_email(
         "me", recipients, response_subject, response_text, thread_id, message_id
     )
     # Send the response
-    await send_message(service, "me", response_message)
+    await send_message(client, "me", response_message, user_key=email_address)
+
+
+def _header(headers, name, default=None):
+    """Return the first header value matching ``name`` (case-sensitive, like Gmail returns)."""
+    return next((header["value"] for header in headers if header["name"] == name), default)
+
+
+def _email_record(msg, thread_id) -> dict:
+    """Build the ``EmailData`` record for a Gmail message.
+
+    Only headers are read here (``msg`` may be in ``metadata`` format);
+    ``page_content`` is left as None for ``_attach_bodies`` to fill.
+    """
+    payload = msg["payload"]
+    headers = payload.get("headers")
+    subject = next(
+        header["value"] for header in headers if header["name"] == "Subject"
+    )
+    from_email = _header(headers, "From", "").strip()
+    _to_email = _header(headers, "To", "").strip()
+    if reply_to := _header(headers, "Reply-To", "").strip():
+        from_email = reply_to
+    send_time = next(
+        header["value"] for header in headers if header["name"] == "Date"
+    )
+    parsed_time = parse_time(send_time)
+    return {
+        "from_email": from_email,
+        "to_email": _to_email,
+        "subject": subject,
+        "page_content": None,
+        "id": msg["id"],
+        "thread_id": thread_id,
+        "send_time": parsed_time.isoformat(),
+    }
+
+
+def _emails_for_message(message, msg, thread, to_email) -> list[dict]:
+    """Build the ingestion records for one listed message and its thread.
+
+    Returns a ``user_respond`` marker when the user sent the latest message in
+    the thread, or a full ``EmailData`` record when the listed message is the
+    latest one in the thread and was not sent by the user.
+    """
+    emails = []
+    # Check the last message in the thread
+    last_message = thread["messages"][-1]
+    last_from_header = next(
+        header["value"]
+        for header in last_message["payload"].get("headers")
+        if header["name"] == "From"
+    )
+    if to_email in last_from_header:
+        emails.append(
+            {
+                "id": message["id"],
+                "thread_id": message["threadId"],
+                "user_respond": True,
+            }
+        )
+    # Check if the last message was from you and if the current message is the last in the thread
+    if to_email not in last_from_header and message["id"] == last_message["id"]:
+        emails.append(_email_record(msg, message["threadId"]))
+    return emails
+
+
+def _emails_for_thread(thread, to_email, include_latest: bool) -> list[dict]:
+    """Build the ingestion records for a thread from its single payload.
+
+    Same rules as ``_emails_for_message`` applied once per thread: a
+    ``user_respond`` marker when the user sent the latest message, otherwise
+    the latest message itself when ``include_latest`` says it is new to this run.
+    """
+    last_message = thread["messages"][-1]
+    last_from_header = _header(last_message["payload"].get("headers"), "From", "")
+    if to_email in last_from_header:
+        return [
+            {
+                "id": last_message["id"],
+                "thread_id": thread["id"],
+                "user_respond": True,
+            }
+        ]
+    if include_latest:
+        return [_email_record(last_message, thread["id"])]
+    return []
+
+
+async def _execute_many(user_key: str, calls: list, unit_cost: int) -> list:
+    """Run Gmail API calls concurrently on the shared scheduler.
+
+    ``calls[i]`` is a zero-argument callable returning the request coroutine.
+    Each call is charged ``unit_cost`` quota units against ``user_key``; the
+    scheduler bounds how many are in flight over the pooled connection and
+    retries rate-limited calls after backing off.
+
+    Results are returned in the same order as ``calls``. A call that failed is
+    returned as its exception so callers can handle items one by one.
+    """
+    scheduler = get_gmail_scheduler()
+    return await asyncio.gather(
+        *(scheduler.run_async(user_key, unit_cost, call) for call in calls),
+        return_exceptions=True,
+    )
+
+
+async def _cached_batch(
+    user_key: str, cache: MessageCache | None, keys: list, make_call, unit_cost: int
+) -> list:
+    """``_execute_many`` behind the message cache.
+
+    ``keys[i]`` is the cache key of item ``i`` (None = not cacheable) and
+    ``make_call(i)`` returns its Gmail request coroutine. Cached items cost no
+    Gmail call; successful fetches are written back.
+    """
+    cached = await cache.aget_many(k for k in keys if k) if cache else {}
+    results = [cached.get(key) if key else None for key in keys]
+    missing = [index for index, key in enumerate(keys) if not key or key not in cached]
+    fetched = await _execute_many(
+        user_key, [functools.partial(make_call, index) for index in missing], unit_cost
+    )
+    to_store = {}
+    for index, value in zip(missing, fetched):
+        results[index] = value
+        if keys[index] and not isinstance(value, Exception):
+            to_store[keys[index]] = value
+    if cache:
+        await cache.aput_many(to_store)
+    return results
+
+
+async def _attach_bodies(
+    client, user_key: str, emails: list[dict], read_body, cache: MessageCache | None = None
+) -> list[dict]:
+    """Fetch and decode bodies only for the records that are about to be yielded.
+
+    ``read_body`` turns a message payload into ``page_content``. Records whose
+    body could not be fetched are dropped (and logged).
+    """
+    pending = [
+        email
+        for email in emails
+        if "user_respond" not in email and email["page_content"] is None
+    ]
+    bodies = await _cached_batch(
+        user_key,
+        cache,
+        [message_key(user_key, email["id"], "full") for email in pending],
+        lambda i: client.gmail_messages_get(pending[i]["id"], format="full"),
+        GMAIL_QUOTA_UNITS["messages.get"],
+    )
+    failed = set()
+    for email, msg in zip(pending, bodies):
+        if isinstance(msg, Exception):
+            logger.info(f"Failed to fetch body for {email['id']}: {msg}")
+            failed.add(email["id"])
+            continue
+        email["page_content"] = read_body(msg["payload"])
+    return [email for email in emails if email["id"] not in failed or "user_respond" in email]
+
+
+async def _iter_list_pages(client, user_key: str, resource: str, query: str):
+    """Stream result pages of ``messages.list`` or ``threads.list`` (newest first)."""
+    list_page = getattr(client, f"gmail_{resource}_list")
+    page_token = None
+    while True:
+        results = await get_gmail_scheduler().run_async(
+            user_key,
+            GMAIL_QUOTA_UNITS[f"{resource}.list"],
+            lambda: list_page(q=query, page_token=page_token),
+        )
+        if results.get(resource):
+            yield results[resource]
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+
+
+async def _single_page(items: list):
+    """Wrap an already-listed result set as a one-page stream."""
+    if items:
+        yield items
+
+
+async def _list_history_messages(
+    client, user_key: str, start_history_id: str
+) -> tuple[list[dict], str]:
+    """List messages added to the inbox or sent folder since ``start_history_id``.
+
+    Returns:
+        Tuple of (messages newest first, latest mailbox historyId)
+
+    Raises:
+        HistoryExpiredError: If Gmail no longer has history for the watermark
+    """
+    messages = {}
+    latest_history_id = start_history_id
+    page_token = None
+    while True:
+        try:
+            results = await get_gmail_scheduler().run_async(
+                user_key,
+                GMAIL_QUOTA_UNITS["history.list"],
+                lambda: client.gmail_history_list(
+                    start_history_id,
+                    history_types=["messageAdded"],
+                    page_token=page_token,
+                ),
+            )
+        except HttpError as e:
+            if e.resp.status == 404:
+                raise HistoryExpiredError(start_history_id) from e
+            raise
+        for record in results.get("history", []):
+            for added in record.get("messagesAdded", []):
+                message = added["message"]
+                if _HISTORY_LABELS.isdisjoint(message.get("labelIds", [])):
+                    continue
+                messages[message["id"]] = {
+                    "id": message["id"],
+                    "threadId": message["threadId"],
+                }
+        latest_history_id = results.get("historyId", latest_history_id)
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+    # History is returned oldest first; match the window scan's ordering
+    return list(reversed(messages.values())), latest_history_id
+
+
+async def _ingest_message_page(client, page, to_email, batch_size, read_body, cache=None):
+    """Fetch one page of listed messages (and their threads), ``batch_size`` at a time.
+
+    Messages and threads are fetched in ``metadata`` format; bodies are only
+    fetched for the records that qualify.
+    """
+    for start in range(0, len(page), batch_size):
+        chunk = page[start:start + batch_size]
+        # Message content never changes - re-seen messages come from the cache
+        fetched = await _cached_batch(
+            to_email,
+            cache,
+            [message_key(to_email, m["id"], "metadata") for m in chunk],
+            lambda i: client.gmail_messages_get(
+                chunk[i]["id"], format="metadata", metadata_headers=_METADATA_HEADERS
+            ),
+            GMAIL_QUOTA_UNITS["messages.get"],
+        )
+        # Several listed messages often share a thread - fetch each thread once
+        thread_ids = list(
+            dict.fromkeys(
+                msg["threadId"] for msg in fetched if not isinstance(msg, Exception)
+            )
+        )
+        threads = await _execute_many(
+            to_email,
+            [
+                functools.partial(
+                    client.gmail_threads_get, t, format="metadata", metadata_headers=_METADATA_HEADERS
+                )
+                for t in thread_ids
+            ],
+            GMAIL_QUOTA_UNITS["threads.get"],
+        )
+        threads_by_id = dict(zip(thread_ids, threads))
+
+        candidates = []
+        for message, msg in zip(chunk, fetched):
+            try:
+                if isinstance(msg, Exception):
+                    raise msg
+                thread = threads_by_id[msg["threadId"]]
+                if isinstance(thread, Exception):
+                    raise thread
+                candidates.extend(_emails_for_message(message, msg, thread, to_email))
+            except Exception:
+                logger.info(f"Failed on {message}")
+                continue
+        for email_data in await _attach_bodies(client, to_email, candidates, read_body, cache):
+            yield email_data
+
+
+async def _ingest_thread_page(
+    client, page, to_email, batch_size, read_body, seen_threads, after, added_ids=None, cache=None
+):
+    """Fetch one page of threads ``batch_size`` at a time, skipping threads seen earlier in the run.
+
+    The latest message is ingested when it was added since the history
+    watermark (``added_ids``) or, for window scans, falls inside the window.
+    """
+    # threads.list returns each thread's current historyId, which makes it cacheable
+    history_ids = {ref["id"]: ref.get("historyId") for ref in page}
+    thread_ids = [t for t in history_ids if t not in seen_threads]
+    seen_threads.update(thread_ids)
+    for start in range(0, len(thread_ids), batch_size):
+        chunk = thread_ids[start:start + batch_size]
+        threads = await _cached_batch(
+            to_email,
+            cache,
+            [thread_key(to_email, t, history_ids[t], "metadata") for t in chunk],
+            lambda i: client.gmail_threads_get(
+                chunk[i], format="metadata", metadata_headers=_METADATA_HEADERS
+            ),
+            GMAIL_QUOTA_UNITS["threads.get"],
+        )
+        candidates = []
+        for thread_id, thread in zip(chunk, threads):
+            try:
+                if isinstance(thread, Exception):
+                    raise thread
+                last_message = thread["messages"][-1]
+                if added_ids is not None:
+                    include_latest = last_message["id"] in added_ids
+                else:
+                    include_latest = int(last_message["internalDate"]) >= after * 1000
+                candidates.extend(_emails_for_thread(thread, to_email, include_latest))
+            except Exception:
+                logger.info(f"Failed on thread {thread_id}")
+                continue
+        for email_data in await _attach_bodies(client, to_email, candidates, read_body, cache):
+            yield email_data
 
 
 async def fetch_group_emails(
@@ -255,102 +631,155 @@ async def fetch_group_emails(
     config: dict | None = None,
     gmail_token: str | None = None,
     gmail_secret: str | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sync_state: dict | None = None,
+    by_thread: bool = False,
+    normalize: bool = True,
+    max_body_tokens: int | None = DEFAULT_MAX_BODY_TOKENS,
+    use_cache: bool = True,
 ) -> Iterable[EmailData]:
+    """Yield recent emails for ``to_email`` that may need a response.
+
+    Results are streamed page by page. IDs are fetched ``batch_size`` at a
+    time as concurrent requests over one pooled keep-alive connection, so a
+    page costs a couple of round-trip latencies instead of two per message.
+
+    Args:
+        sync_state: Optional mutable dict enabling incremental sync. When it
+            holds a ``history_id`` watermark, only messages added since then
+            are fetched via the History API; otherwise (or when the watermark
+            has expired) the ``minutes_since`` window is scanned. Before the
+            first email is yielded, ``history_id`` is set to the new watermark
+            and ``mode`` to ``"incremental"`` or ``"full"``. Callers persist
+            the watermark once they have handled the yielded emails.
+        by_thread: List threads instead of messages and fetch each thread
+            exactly once per run, deriving the latest-message and
+            ``user_respond`` records from that single payload. Yields at most
+            one record per thread.
+        normalize: Convert HTML, strip quoted history/signatures and compact
+            URLs in ``page_content`` (see eaia.email_normalize). The original
+            body stays available through ``fetch_original_body``.
+        max_body_tokens: Approximate token cap for normalized bodies
+            (None disables the cap).
+        use_cache: Serve re-seen messages (and threads whose historyId has
+            not changed) from the persistent message cache instead of Gmail.
+    """
     creds = await get_credentials(to_email, config=config)
 
-    service = await asyncio.to_thread(build, "gmail", "v1", credentials=creds)
+    client = get_google_async_client(creds, to_email)
     after = int((datetime.now() - timedelta(minutes=minutes_since)).timestamp())
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    if normalize:
+        read_body = lambda payload: extract_normalized_body(payload, max_body_tokens)
+    else:
+        read_body = extract_message_part
+    cache = get_message_cache() if use_cache else None
 
-    query = f"(to:{to_email} OR from:{to_email}) after:{after}"
-    messages = []
-    nextPageToken = None
-    # Fetch messages matching the query
-    while True:
-        results = await asyncio.to_thread(
-            lambda: service.users()
-            .messages()
-            .list(userId="me", q=query, pageToken=nextPageToken)
-            .execute()
-        )
-        if "messages" in results:
-            messages.extend(results["messages"])
-        nextPageToken = results.get("nextPageToken")
-        if not nextPageToken:
-            break
-
-    count = 0
-    for message in messages:
+    history_messages = None
+    if sync_state is not None and sync_state.get("history_id"):
         try:
-            msg = await asyncio.to_thread(
-                lambda: service.users().messages().get(userId="me", id=message["id"]).execute()
+            history_messages, latest_history_id = await _list_history_messages(
+                client, to_email, sync_state["history_id"]
             )
-            thread_id = msg["threadId"]
-            payload = msg["payload"]
-            headers = payload.get("headers")
-            # Get the thread details
-            thread = await asyncio.to_thread(
-                lambda: service.users().threads().get(userId="me", id=thread_id).execute()
+            sync_state["mode"] = "incremental"
+            sync_state["history_id"] = latest_history_id
+            logger.info(
+                f"Incremental sync found {len(history_messages)} new messages "
+                f"(historyId {latest_history_id})"
             )
-            messages_in_thread = thread["messages"]
-            # Check the last message in the thread
-            last_message = messages_in_thread[-1]
-            last_headers = last_message["payload"]["headers"]
-            from_header = next(
-                header["value"] for header in last_headers if header["name"] == "From"
+        except HistoryExpiredError:
+            logger.warning(
+                f"Gmail historyId {sync_state['history_id']} expired for {to_email} - "
+                f"falling back to a {minutes_since} minute window scan"
             )
-            last_from_header = next(
-                header["value"]
-                for header in last_message["payload"].get("headers")
-                if header["name"] == "From"
+
+    added_ids = None
+    if history_messages is not None:
+        if by_thread:
+            added_ids = {m["id"] for m in history_messages}
+            pages = _single_page([{"id": m["threadId"]} for m in history_messages])
+        else:
+            pages = _single_page(history_messages)
+    else:
+        if sync_state is not None:
+            # Capture the watermark BEFORE listing so nothing that arrives
+            # during the scan is missed by the next incremental sync
+            profile = await get_gmail_scheduler().run_async(
+                to_email,
+                GMAIL_QUOTA_UNITS["getProfile"],
+                client.gmail_get_profile,
             )
-            if to_email in last_from_header:
-                yield {
-                    "id": message["id"],
-                    "thread_id": message["threadId"],
-                    "user_respond": True,
-                }
-            # Check if the last message was from you and if the current message is the last in the thread
-            if to_email not in from_header and message["id"] == last_message["id"]:
-                subject = next(
-                    header["value"] for header in headers if header["name"] == "Subject"
-                )
-                from_email = next(
-                    (header["value"] for header in headers if header["name"] == "From"),
-                    "",
-                ).strip()
-                _to_email = next(
-                    (header["value"] for header in headers if header["name"] == "To"),
-                    "",
-                ).strip()
-                if reply_to := next(
-                    (
-                        header["value"]
-                        for header in headers
-                        if header["name"] == "Reply-To"
-                    ),
-                    "",
-                ).strip():
-                    from_email = reply_to
-                send_time = next(
-                    header["value"] for header in headers if header["name"] == "Date"
-                )
-                # Only process emails that are less than an hour old
-                parsed_time = parse_time(send_time)
-                body = extract_message_part(payload)
-                yield {
-                    "from_email": from_email,
-                    "to_email": _to_email,
-                    "subject": subject,
-                    "page_content": body,
-                    "id": message["id"],
-                    "thread_id": message["threadId"],
-                    "send_time": parsed_time.isoformat(),
-                }
+            sync_state["mode"] = "full"
+            sync_state["history_id"] = profile["historyId"]
+        query = f"(to:{to_email} OR from:{to_email}) after:{after}"
+        pages = _iter_list_pages(
+            client, to_email, "threads" if by_thread else "messages", query)
+
+    count = 0
+    seen_threads = set()
+    async for page in pages:
+        if by_thread:
+            emails = _ingest_thread_page(
+                client, page, to_email, batch_size, read_body, seen_threads, after, added_ids, cache
+            )
+        else:
+            emails = _ingest_message_page(client, page, to_email, batch_size, read_body, cache)
+        async for email_data in emails:
+            if "user_respond" not in email_data:
                 count += 1
-        except Exception:
-            logger.info(f"Failed on {message}")
+            yield email_data
 
     logger.info(f"Found {count} emails.")
+    if cache:
+        logger.info(f"Message cache: {await asyncio.to_thread(cache.stats)}")
+
+
+async def fetch_original_body(
+    email_id: str,
+    email_address: str,
+    config: dict | None = None,
+) -> str:
+    """Fetch the raw, un-normalized body of one email on demand."""
+    creds = await get_credentials(email_address, config=config)
+
+    client = get_google_async_client(creds, email_address)
+    message = await get_gmail_scheduler().run_async(
+        email_address,
+        GMAIL_QUOTA_UNITS["messages.get"],
+        lambda: client.gmail_messages_get(email_id, format="full"),
+    )
+    return extract_message_part(message["payload"])
+
+
+async def start_gmail_watch(
+    email_address: str,
+    topic_name: str,
+    config: dict | None = None,
+    label_ids: list[str] | None = None,
+) -> dict:
+    """Register (or renew) a Gmail push watch publishing to a Pub/Sub topic.
+
+    Gmail then publishes ``{"emailAddress", "historyId"}`` to ``topic_name``
+    whenever the mailbox changes; the Pub/Sub push subscription delivers it
+    to the config API's ``/api/webhooks/gmail-push`` endpoint.
+
+    Returns:
+        The watch response: ``{"historyId": ..., "expiration": <epoch ms>}``
+    """
+    creds = await get_credentials(email_address, config=config)
+
+    client = get_google_async_client(creds, email_address)
+    return await get_gmail_scheduler().run_async(
+        email_address,
+        GMAIL_QUOTA_UNITS["watch"],
+        lambda: client.gmail_watch(
+            {
+                "topicName": topic_name,
+                "labelIds": label_ids or ["INBOX"],
+                "labelFilterBehavior": "INCLUDE",
+            }
+        ),
+    )
 
 
 async def mark_as_read(
@@ -362,11 +791,11 @@ async def mark_as_read(
 ):
     creds = await get_credentials(user_email, config=config)
 
-    service = await asyncio.to_thread(build, "gmail", "v1", credentials=creds)
-    await asyncio.to_thread(
-        lambda: service.users().messages().modify(
-            userId="me", id=message_id, body={"removeLabelIds": ["UNREAD"]}
-        ).execute()
+    client = get_google_async_client(creds, user_email)
+    await get_gmail_scheduler().run_async(
+        user_email,
+        GMAIL_QUOTA_UNITS["messages.modify"],
+        lambda: client.gmail_messages_modify(message_id, {"removeLabelIds": ["UNREAD"]}),
     )
 
 
@@ -398,7 +827,7 @@ async def get_events_for_days(date_strs: list[str]):
     user_email = user_config["email"]
 
     creds = await get_credentials(user_email, config=config)
-    service = await asyncio.to_thread(build, "calendar", "v3", credentials=creds)
+    client = get_google_async_client(creds, user_email)
     results = ""
     for date_str in date_strs:
         # Convert the date string to a datetime.date object
@@ -407,16 +836,16 @@ async def get_events_for_days(date_strs: list[str]):
         start_of_day = datetime.combine(day, time.min).isoformat() + "Z"
         end_of_day = datetime.combine(day, time.max).isoformat() + "Z"
 
-        events_result = await asyncio.to_thread(
-            lambda: service.events()
-            .list(
-                calendarId="primary",
+        events_result = await get_calendar_scheduler().run_async(
+            user_email,
+            CALENDAR_QUOTA_UNITS["events.list"],
+            lambda: client.calendar_events_list(
+                "primary",
                 timeMin=start_of_day,
                 timeMax=end_of_day,
                 singleEvents=True,
                 orderBy="startTime",
-            )
-            .execute()
+            ),
         )
         events = events_result.get("items", [])
 
@@ -473,7 +902,7 @@ async def send_calendar_invite(
     emails, title, start_time, end_time, email_address, config: dict | None = None, timezone="America/Toronto"
 ):
     creds = await get_credentials(email_address, config=config)
-    service = await asyncio.to_thread(build, "calendar", "v3", credentials=creds)
+    client = get_google_async_client(creds, email_address)
 
     # Parse the start and end times
     start_datetime = datetime.fromisoformat(start_time)
@@ -506,13 +935,16 @@ async def send_calendar_invite(
     }
 
     try:
-        await asyncio.to_thread(
-            lambda: service.events().insert(
-                calendarId="primary",
-                body=event,
+        await get_calendar_scheduler().run_async(
+            email_address,
+            CALENDAR_QUOTA_UNITS["events.insert"],
+            lambda: client.calendar_events_insert(
+                event,
+                "primary",
                 sendNotifications=True,
                 conferenceDataVersion=1,
-            ).execute()
+            ),
+            retry_server_errors=False,
         )
         return True
     except Exception as e:
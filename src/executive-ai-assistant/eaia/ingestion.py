@@ -0,0 +1,166 @@
+"""
+Per-user Gmail ingestion shared by the executive_cron graph and the central
+ingestion service (scripts/run_ingestion_service.py).
+
+One call to ``ingest_user_emails`` runs the full flow for a single mailbox:
+incremental fetch since the stored Gmail historyId -> one executive_main run
+per new email -> persist the new watermark -> renew the push watch.
+"""
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from eaia.gmail import fetch_group_emails, start_gmail_watch
+from utils.supabase_db import get_user_cron, is_supabase_configured, update_user_cron
+
+
+async def _load_history_watermark(user_id: str) -> str | None:
+    """Load the Gmail historyId stored for this user's cron (None if never synced)."""
+    if not is_supabase_configured():
+        return None
+    try:
+        row = await get_user_cron(user_id, "gmail_history_id")
+    except Exception as e:
+        print(f"[INGEST] Could not load Gmail history watermark: {e}")
+        return None
+    return row.get("gmail_history_id") if row else None
+
+
+async def _save_history_watermark(user_id: str, history_id: str) -> None:
+    """Persist the Gmail historyId the next tick should sync from."""
+    if not is_supabase_configured():
+        return
+    try:
+        await update_user_cron(user_id, {"gmail_history_id": str(history_id)})
+    except Exception as e:
+        print(f"[INGEST] Could not save Gmail history watermark: {e}")
+
+
+async def _maybe_renew_gmail_watch(user_id: str, email_address: str, config) -> None:
+    """Keep the Gmail push watch alive when push ingestion is enabled.
+
+    Watches expire after 7 days; renew once less than a day is left.
+    """
+    topic_name = os.getenv("GMAIL_PUSH_TOPIC")
+    if not topic_name or not is_supabase_configured():
+        return
+    try:
+        row = await get_user_cron(user_id, "gmail_watch_expiration")
+        expiration = row.get("gmail_watch_expiration") if row else None
+        if expiration and datetime.fromisoformat(expiration) > datetime.now(timezone.utc) + timedelta(days=1):
+            return
+
+        watch = await start_gmail_watch(email_address, topic_name, config=config)
+        new_expiration = datetime.fromtimestamp(int(watch["expiration"]) / 1000, tz=timezone.utc)
+        await update_user_cron(user_id, {"gmail_watch_expiration": new_expiration.isoformat()})
+        print(f"[INGEST] Renewed Gmail push watch for {email_address} until {new_expiration.isoformat()}")
+    except Exception as e:
+        print(f"[INGEST] Could not renew Gmail push watch: {e}")
+
+
+async def ingest_user_emails(
+    client,
+    user_id: str,
+    email_address: str,
+    minutes_since: int = 30,
+    config: dict | None = None,
+    by_thread: bool = False,
+    log_prefix: str = "[INGEST]",
+) -> dict:
+    """
+    Fetch new emails for one user and start an executive_main run per email.
+
+    Args:
+        client: LangGraph SDK client used to create threads and runs
+        user_id: Clerk user ID (thread owner, OAuth credential lookup)
+        email_address: Gmail address to ingest
+        minutes_since: Window scanned when there is no usable history watermark
+        config: Runnable config; user_id is injected for credential fetching
+        by_thread: Use thread-centric fetching (see fetch_group_emails)
+        log_prefix: Prefix for progress prints ("[CRON]", "[INGEST]", ...)
+
+    Returns:
+        Dict with email_count (emails seen) and processed_count (runs created)
+    """
+    config = config if config is not None else {}
+    # Ensure user_id is in config for OAuth credential fetching
+    if "configurable" not in config:
+        config["configurable"] = {}
+    config["configurable"]["user_id"] = user_id
+    config["metadata"] = {"user_id": user_id, "clerk_user_id": user_id}
+
+    email_count = 0
+    processed_count = 0
+
+    # Incremental sync: only fetch messages added since the stored historyId.
+    # fetch_group_emails falls back to the minutes_since window when unset/expired.
+    sync_state = {"history_id": await _load_history_watermark(user_id)}
+
+    async for email in fetch_group_emails(
+        email_address,
+        minutes_since=minutes_since,
+        config=config,
+        sync_state=sync_state,
+        by_thread=by_thread,
+    ):
+        email_count += 1
+        print(f"{log_prefix} Email {email_count}: {email.get('subject', 'No Subject')[:50]}")
+        thread_id = str(
+            uuid.UUID(hex=hashlib.md5(email["thread_id"].encode("UTF-8")).hexdigest())
+        )
+        try:
+            thread_info = await client.threads.get(thread_id)
+        except httpx.HTTPStatusError as e:
+            if "user_respond" in email:
+                continue
+            if e.response.status_code == 404:
+                # Create thread with graph_id and owner metadata for Agent Inbox filtering
+                thread_info = await client.threads.create(
+                    thread_id=thread_id,
+                    metadata={
+                        "graph_id": "executive_main",
+                        "owner": user_id  # Required for auth.py multi-tenant filtering
+                    }
+                )
+            else:
+                raise e
+        if "user_respond" in email:
+            await client.threads.update_state(thread_id, None, as_node="__end__")
+            continue
+        recent_email = thread_info["metadata"].get("email_id")
+        if recent_email == email["id"]:
+            # Window scans are newest-first, so a handled email means we're caught up.
+            # History deltas are not ordered that way - skip just this one.
+            if sync_state.get("mode") == "incremental":
+                continue
+            break
+        await client.threads.update(thread_id, metadata={
+            "graph_id": "executive_main",  # Preserve graph_id for inbox filtering
+            "owner": user_id,  # Preserve owner for auth.py multi-tenant filtering
+            "email_id": email["id"]
+        })
+
+        await client.runs.create(
+            thread_id,
+            "executive_main",
+            input={"email": email},
+            config={
+                "configurable": {
+                    "user_id": user_id
+                }
+            },
+            multitask_strategy="rollback",
+        )
+        processed_count += 1
+        print(f"{log_prefix} Created workflow run for thread {thread_id}")
+
+    if sync_state.get("history_id"):
+        await _save_history_watermark(user_id, sync_state["history_id"])
+
+    # Push ingestion triggers this graph on new mail; the cron tick is the fallback
+    await _maybe_renew_gmail_watch(user_id, email_address, config)
+
+    return {"email_count": email_count, "processed_count": processed_count}
@@ -1,9 +1,44 @@
+import os
+import copy
+import time
 import asyncio
+import threading
 import yaml
+from collections import OrderedDict
 from pathlib import Path
 
 _ROOT = Path(__file__).absolute().parent
 
+# get_config() runs in almost every node - the resolved config is loaded once
+# per LangGraph run and then served from memory
+RUN_CONFIG_CACHE_SIZE = int(os.getenv("RUN_CONFIG_CACHE_SIZE", "256"))
+RUN_CONFIG_TTL_SECONDS = float(os.getenv("RUN_CONFIG_TTL_SECONDS", "3600"))
+
+_run_configs: "OrderedDict[str, tuple[float, asyncio.Task]]" = OrderedDict()
+
+_yaml_lock = threading.Lock()
+_yaml_cache: tuple[float, dict] | None = None
+
+
+def _load_base_config() -> dict:
+    """config.yaml, parsed once and re-read only when the file changes.
+
+    Blocking (stat/open/parse) - async code calls it via asyncio.to_thread.
+    """
+    global _yaml_cache
+    config_path = _ROOT.joinpath("config.yaml")
+    mtime = config_path.stat().st_mtime
+    with _yaml_lock:
+        if _yaml_cache is None or _yaml_cache[0] != mtime:
+            with open(config_path) as stream:
+                _yaml_cache = (mtime, yaml.safe_load(stream))
+        return copy.deepcopy(_yaml_cache[1])
+
+
+def _run_id(config: dict) -> str | None:
+    run_id = config.get("configurable", {}).get("run_id") or config.get("metadata", {}).get("run_id")
+    return str(run_id) if run_id else None
+
 
 def _resolve_templates(config_data: dict) -> dict:
     """
@@ -42,6 +77,10 @@ def _resolve_templates(config_data: dict) -> dict:
     return resolved_config
 
 
+class _SupabaseUnavailable(Exception):
+    """Supabase fetch failed (possibly transient) - the config.yaml fallback must not be memoized."""
+
+
 async def _fetch_from_supabase(config: dict) -> dict | None:
     """
     Fetch user configuration from Supabase agent_configs and user_secrets tables.
@@ -51,10 +90,10 @@ async def _fetch_from_supabase(config: dict) -> dict | None:
     - User secrets (API keys, credentials) from user_secrets table
     - Google OAuth credentials are fetched via gmail.py (using utils/google_oauth_utils.py)
 
-    Returns flattened config dict or None if fetch fails
+    Returns flattened config dict, or None when there is no user_id or
+    Supabase is not configured. Raises _SupabaseUnavailable if the fetch fails.
     """
-    import os
-    from supabase import create_client, Client
+    from utils.supabase_db import get_user_runtime_bundle, is_supabase_configured
 
     # Extract user_id from LangGraph config metadata
     user_id = config.get("configurable", {}).get("user_id")
@@ -67,47 +106,25 @@ async def _fetch_from_supabase(config: dict) -> dict | None:
         print("  No user_id found in config - using config.yaml")
         return None
 
-    # Initialize Supabase client
-    SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_SECRET_KEY")
-
-    if not SUPABASE_URL or not SUPABASE_KEY:
+    if not is_supabase_configured():
         print(f"  Supabase credentials not configured - falling back to config.yaml for user {user_id}")
         return None
 
     try:
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-        # 1. Fetch agent-specific config from agent_configs table
-        agent_config_result = supabase.table("agent_configs") \
-            .select("config_data, prompts") \
-            .eq("clerk_id", user_id) \
-            .eq("agent_id", "executive_ai_assistant") \
-            .maybe_single() \
-            .execute()
-
-        # 2. Fetch user secrets (API keys, timezone, etc.) from user_secrets table
-        user_secrets_result = supabase.table("user_secrets") \
-            .select("anthropic_api_key, openai_api_key, timezone") \
-            .eq("clerk_id", user_id) \
-            .maybe_single() \
-            .execute()
+        # 1. Agent-specific config from agent_configs and 2. user secrets
+        # (API keys, timezone, etc.) from user_secrets - one round trip
+        bundle = await get_user_runtime_bundle(user_id)
+        agent_config_row = bundle["agent_configs"].get("executive_ai_assistant")
+        secrets = bundle["user_secrets"]
 
         # 3. Load base config from config.yaml as foundation
-        config_path = _ROOT.joinpath("config.yaml")
-
-        def _load_yaml():
-            with open(config_path) as stream:
-                return yaml.safe_load(stream)
-
-        base_config = await asyncio.to_thread(_load_yaml)
+        base_config = await asyncio.to_thread(_load_base_config)
 
         # 4. Merge configurations (priority: agent_configs > user_secrets > config.yaml)
         merged_config = base_config.copy()
 
         # Merge user secrets (API keys, timezone)
-        if user_secrets_result and user_secrets_result.data:
-            secrets = user_secrets_result.data
+        if secrets:
             if secrets.get("anthropic_api_key"):
                 merged_config["anthropic_api_key"] = secrets["anthropic_api_key"]
             if secrets.get("openai_api_key"):
@@ -116,8 +133,8 @@ async def _fetch_from_supabase(config: dict) -> dict | None:
                 merged_config["timezone"] = secrets["timezone"]
 
         # Merge agent-specific config (models, prompts)
-        if agent_config_result and agent_config_result.data:
-            config_data = agent_config_result.data.get("config_data", {})
+        if agent_config_row:
+            config_data = agent_config_row.get("config_data", {})
 
             # Flatten nested config structure from Supabase
             # Config is stored as: {"llm_triage": {"triage_model": "...", "triage_temperature": ...}}
@@ -127,7 +144,7 @@ async def _fetch_from_supabase(config: dict) -> dict | None:
                     merged_config.update(section_values)
 
             # Merge prompts
-            prompts = agent_config_result.data.get("prompts", {})
+            prompts = agent_config_row.get("prompts", {})
             if prompts:
                 merged_config.update(prompts)
 
@@ -143,10 +160,11 @@ async def _fetch_from_supabase(config: dict) -> dict | None:
         print(f"  Error fetching from Supabase: {e}")
         import traceback
         traceback.print_exc()
-        return None
+        raise _SupabaseUnavailable(str(e)) from e
 
 
-async def get_config(config: dict):
+async def _load_config(config: dict) -> tuple[dict, bool]:
+    """Resolved config, and whether it may be reused for the rest of the run."""
     # This loads things either ALL from configurable, or
     # fetches from Supabase (production), or falls back to config.yaml (dev/local)
     # This is done intentionally to enforce an "all or nothing" configuration
@@ -154,19 +172,52 @@ async def get_config(config: dict):
         config_data = config["configurable"]
     else:
         # Try to fetch from Supabase Config API first (for LangGraph Cloud deployment)
-        config_data = await _fetch_from_supabase(config)
+        try:
+            config_data = await _fetch_from_supabase(config)
+        except _SupabaseUnavailable:
+            # Serve config.yaml for this node only; the next node retries Supabase
+            return _resolve_templates(await asyncio.to_thread(_load_base_config)), False
 
         if config_data is None:
             # Fallback to config.yaml for local development
-            # Use asyncio.to_thread to move blocking YAML loading to a separate thread
-            config_path = _ROOT.joinpath("config.yaml")
-
-            def _load_yaml():
-                with open(config_path) as stream:
-                    return yaml.safe_load(stream)
-
-            config_data = await asyncio.to_thread(_load_yaml)
+            config_data = await asyncio.to_thread(_load_base_config)
 
     # CRITICAL: Resolve template variables before returning
     # This ensures modules get "bill" instead of "{name}"
-    return _resolve_templates(config_data)
+    return _resolve_templates(config_data), True
+
+
+def _run_config_task(run_id: str, config: dict) -> asyncio.Task:
+    """The (possibly still running) config load for ``run_id``, started at most once."""
+    now = time.monotonic()
+    loop = asyncio.get_running_loop()
+    entry = _run_configs.get(run_id)
+    if entry is not None:
+        created, task = entry
+        failed = task.done() and (task.cancelled() or task.exception() is not None or not task.result()[1])
+        if now - created <= RUN_CONFIG_TTL_SECONDS and task.get_loop() is loop and not failed:
+            _run_configs.move_to_end(run_id)
+            return task
+    task = loop.create_task(_load_config(config))
+    _run_configs[run_id] = (now, task)
+    _run_configs.move_to_end(run_id)
+    while len(_run_configs) > RUN_CONFIG_CACHE_SIZE:
+        _run_configs.popitem(last=False)
+    return task
+
+
+async def get_config(config: dict):
+    """
+    Resolved assistant config for this run.
+
+    Secrets, agent config and prompts are loaded once per LangGraph run (keyed
+    by run_id); every other node in the run gets a copy without any I/O.
+    Calls without a run_id (scripts) load the config every time.
+    """
+    run_id = _run_id(config)
+    if run_id is None:
+        return (await _load_config(config))[0]
+
+    config_data, _ = await asyncio.shield(_run_config_task(run_id, config))
+    # Nodes may modify what they get - never hand out the shared dict
+    return copy.deepcopy(config_data)
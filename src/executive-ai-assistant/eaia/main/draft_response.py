@@ -17,16 +17,18 @@ from eaia.schemas import (
     email_template,
 )
 from eaia.main.config import get_config
-from eaia.llm_utils import get_llm, bind_tools_with_choice
+from eaia.llm_utils import get_llm, bind_tools_with_choice, cached_prompt_content
+from eaia.gmail import fetch_original_body
+from eaia.email_normalize import normalize_email_body, DRAFT_MAX_BODY_TOKENS
 
 logger = logging.getLogger(__name__)
 
+# Prompt layout for provider prompt caching, most stable first:
+# 1. EMAIL_WRITING_INSTRUCTIONS + tool calling rules (only the user's name varies)
+# 2. EMAIL_WRITING_PREFERENCES (changes when preferences are learned)
+# 3. DRAFT_EMAIL_CONTEXT (current time and the email - changes every call)
 EMAIL_WRITING_INSTRUCTIONS = """You are {full_name}'s executive assistant. You are a top-notch executive assistant who cares about {name} performing as well as possible.
 
-{background}
-
-Current date and time: {current_date} at {current_time} {tz}
-
 {name} gets lots of emails. This has been determined to be an email that is worth {name} responding to.
 
 Your job is to help {name} respond. You can do this in a few ways.
@@ -52,14 +54,14 @@ ALWAYS draft emails as if they are coming from {name}. Never draft them as "{nam
 
 When adding new recipients - only do that if {name} explicitly asks for it and you know their emails. If you don't know the right emails to add in, then ask {name}. You do NOT need to add in people who are already on the email! Do NOT make up emails.
 
-{response_preferences}
+Follow {name}'s response preferences (see below).
 
 # Using the `SendCalendarInvite` tool
 
 Sometimes you will want to schedule a calendar event. You can do this with the `SendCalendarInvite` tool.
 If you are sure that {name} would want to schedule a meeting, and you know that {name}'s calendar is free, you can schedule a meeting by calling the `SendCalendarInvite` tool. {name} trusts you to pick good times for meetings. You shouldn't ask {name} for what meeting times are preferred, but you should make sure he wants to meet.
 
-{schedule_preferences}
+Follow {name}'s schedule preferences (see below).
 
 # Using the `NewEmailDraft` tool
 
@@ -72,7 +74,18 @@ If {name} asks someone if it's okay to introduce them, and they respond yes, you
 If the email is from a legitimate person and is working to schedule a meeting, call the MeetingAssistant to get a response from a specialist!
 You should not ask {name} for meeting times (unless the Meeting Assistant is unable to find any).
 If they ask for times from {name}, first ask the MeetingAssistant by calling the `MeetingAssistant` tool.
-Note that you should only call this if working to schedule a meeting - if a meeting has already been scheduled, and they are referencing it, no need to call this.
+Note that you should only call this if working to schedule a meeting - if a meeting has already been scheduled, and they are referencing it, no need to call this."""
+EMAIL_WRITING_PREFERENCES = """# About {name}
+
+{background}
+
+# Response preferences
+
+{response_preferences}
+
+# Schedule preferences
+
+{schedule_preferences}
 
 # Background information: information you may find helpful when responding to emails or deciding what to do.
 
@@ -84,13 +97,36 @@ CRITICAL TOOL CALLING INSTRUCTIONS:
 - Choose the single most appropriate tool for this situation
 - Do NOT call multiple tools simultaneously
 - Use the specified tool names exactly - do not add `functions::` to the start
-- Pass all required arguments for the tool you choose
+- Pass all required arguments for the tool you choose"""
+DRAFT_EMAIL_CONTEXT = """Current date and time: {current_date} at {current_time} {tz}
 
 Here is the email thread. Note that this is the full email thread. Pay special attention to the most recent email.
 
 {email}"""
 
 
+async def _get_email_thread(state: State, prompt_config: dict, config: RunnableConfig) -> tuple[str, bool]:
+    """Full thread of the email being answered, and whether it was fetched now.
+
+    Ingestion stores a normalized body without the quoted history; the drafter
+    needs that history, so the first draft of an email fetches the original body
+    (quotes kept, HTML and tracking URLs still cleaned up). It is kept in state
+    so feedback and rewrite loops on the same email skip the Gmail call.
+    """
+    cached = state.get("email_thread")
+    if cached and cached.get("email_id") == state["email"]["id"]:
+        return cached["text"], False
+    try:
+        body = await fetch_original_body(state["email"]["id"], prompt_config["email"], config=config)
+    except Exception as e:
+        logger.warning(f"[draft_response] Could not fetch original body, using ingested text: {e}")
+        return state["email"]["page_content"], False
+    thread = normalize_email_body(body, max_tokens=DRAFT_MAX_BODY_TOKENS, strip_quotes=False)
+    if not thread:
+        return state["email"]["page_content"], False
+    return thread, True
+
+
 async def draft_response(state: State, config: RunnableConfig, store: BaseStore):
     """Write an email to a customer."""
     # Get draft-specific model configuration from config.yaml
@@ -104,7 +140,13 @@ async def draft_response(state: State, config: RunnableConfig, store: BaseStore)
     anthropic_api_key = prompt_config.get("anthropic_api_key")
     openai_api_key = prompt_config.get("openai_api_key")
 
-    llm = get_llm(model_name, temperature=temperature, anthropic_api_key=anthropic_api_key, openai_api_key=openai_api_key)
+    llm = get_llm(
+        model_name,
+        temperature=temperature,
+        anthropic_api_key=anthropic_api_key,
+        openai_api_key=openai_api_key,
+        prompt_cache_key=f"eaia_draft:{prompt_config.get('user_id') or prompt_config.get('email')}",
+    )
     tools = [
         NewEmailDraft,
         ResponseEmailDraft,
@@ -146,25 +188,31 @@ async def draft_response(state: State, config: RunnableConfig, store: BaseStore)
     current_datetime = datetime.now(tz)
 
     _prompt = EMAIL_WRITING_INSTRUCTIONS.format(
-        schedule_preferences=schedule_preferences,
-        random_preferences=random_preferences,
-        response_preferences=response_preferences,
         name=prompt_config["name"],
         full_name=prompt_config["full_name"],
+    )
+    instructions = draft_prompt.format(instructions=_prompt)
+    preferences = EMAIL_WRITING_PREFERENCES.format(
+        name=prompt_config["name"],
         background=prompt_config["background"],
+        response_preferences=response_preferences,
+        schedule_preferences=schedule_preferences,
+        random_preferences=random_preferences,
+    )
+    email_thread, fetched = await _get_email_thread(state, prompt_config, config)
+    email_context = DRAFT_EMAIL_CONTEXT.format(
         current_date=current_datetime.strftime("%A, %B %d, %Y"),
         current_time=current_datetime.strftime("%I:%M %p"),
         tz=timezone,
-    )
-    input_message = draft_prompt.format(
-        instructions=_prompt,
         email=email_template.format(
-            email_thread=state["email"]["page_content"],
+            email_thread=email_thread,
             author=state["email"]["from_email"],
             subject=state["email"]["subject"],
             to=state["email"].get("to_email", ""),
         ),
     )
+    # Stable instructions and preferences first, so they are served from the prompt cache
+    input_message = cached_prompt_content(model_name, [instructions, preferences], email_context)
 
     # Bind tools with provider-specific parameters (requires any tool to be called)
     bound_model = bind_tools_with_choice(
@@ -237,4 +285,7 @@ async def draft_response(state: State, config: RunnableConfig, store: BaseStore)
             f"This will cause ValueError in take_action()!"
         )
 
-    return {"draft": response, "messages": [response]}
+    update = {"draft": response, "messages": [response]}
+    if fetched:
+        update["email_thread"] = {"email_id": state["email"]["id"], "text": email_thread}
+    return update
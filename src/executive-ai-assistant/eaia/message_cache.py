@@ -0,0 +1,267 @@
+"""Persistent cache of Gmail API payloads for email ingestion.
+
+Consecutive cron ticks scan overlapping ``minutes_since`` windows, so the same
+messages and threads come back every tick. Gmail message content never
+changes, and a thread only changes when its ``historyId`` does, so both can be
+served from a local cache instead of Gmail:
+
+- ``msg:<user>:<format>:<message_id>`` -> message payload
+- ``thread:<user>:<format>:<thread_id>:<history_id>`` -> thread payload
+
+Two stores are provided: ``SQLiteMessageCache`` (default, survives restarts
+while the container lives) and ``InMemoryMessageCache``. Both evict by age and
+by entry count and keep hit/miss counters (``stats()``). Async callers use
+``aget_many``/``aput_many``, which run the store off the event loop.
+
+Only ``metadata`` payloads (headers, snippet, labels) are cached by default.
+Full message bodies are cached only with ``GMAIL_MESSAGE_CACHE_BODIES=true``;
+they are stored unencrypted in ``GMAIL_MESSAGE_CACHE_PATH`` (default
+``~/.cache/eaia/gmail_messages.sqlite3``), which is created with 0600
+permissions in a 0700 directory.
+"""
+import abc
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("GMAIL_MESSAGE_CACHE_MAX_ENTRIES", "20000"))
+DEFAULT_MAX_AGE_SECONDS = int(os.getenv("GMAIL_MESSAGE_CACHE_MAX_AGE_SECONDS", str(3 * 24 * 3600)))
+DEFAULT_CACHE_PATH = os.getenv(
+    "GMAIL_MESSAGE_CACHE_PATH",
+    str(Path.home() / ".cache" / "eaia" / "gmail_messages.sqlite3"),
+)
+# Message bodies are personal data - keep them out of the cache unless opted in
+CACHE_BODIES = os.getenv("GMAIL_MESSAGE_CACHE_BODIES", "false").lower() == "true"
+
+
+def message_key(user_key: str, message_id: str, fmt: str) -> str | None:
+    """``full`` (body) payloads are only cacheable with GMAIL_MESSAGE_CACHE_BODIES."""
+    if fmt == "full" and not CACHE_BODIES:
+        return None
+    return f"msg:{user_key}:{fmt}:{message_id}"
+
+
+def thread_key(user_key: str, thread_id: str, history_id: str | None, fmt: str) -> str | None:
+    """Threads are only cacheable when their current historyId is known."""
+    if not history_id:
+        return None
+    return f"thread:{user_key}:{fmt}:{thread_id}:{history_id}"
+
+
+class MessageCache(abc.ABC):
+    """Base class for pluggable stores: implement ``_get_many``/``_put_many``/``_evict``/``_size``."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Return cached values for ``keys`` (missing keys are left out)."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        with self._lock:
+            try:
+                found = self._get_many(keys)
+            except Exception as e:
+                logger.warning(f"Message cache read failed: {e}")
+                found = {}
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: dict[str, Any]) -> None:
+        if not items:
+            return
+        with self._lock:
+            try:
+                self._put_many(items)
+                self.evictions += self._evict()
+            except Exception as e:
+                logger.warning(f"Message cache write failed: {e}")
+
+    async def aget_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        return await asyncio.to_thread(self.get_many, list(keys))
+
+    async def aput_many(self, items: dict[str, Any]) -> None:
+        if items:
+            await asyncio.to_thread(self.put_many, items)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": self._size(),
+            }
+
+    @abc.abstractmethod
+    def _get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Fresh values for ``keys`` (called with the lock held)."""
+
+    @abc.abstractmethod
+    def _put_many(self, items: dict[str, Any]) -> None:
+        """Store ``items`` (called with the lock held)."""
+
+    @abc.abstractmethod
+    def _evict(self) -> int:
+        """Drop expired and overflowing entries; return how many were dropped."""
+
+    @abc.abstractmethod
+    def _size(self) -> int:
+        """Number of stored entries."""
+
+
+class InMemoryMessageCache(MessageCache):
+    """LRU dict store - per process, lost on restart."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def _get_many(self, keys):
+        cutoff = time.time() - self.max_age_seconds
+        found = {}
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry and entry[0] >= cutoff:
+                self._entries.move_to_end(key)
+                found[key] = entry[1]
+        return found
+
+    def _put_many(self, items):
+        now = time.time()
+        for key, value in items.items():
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+
+    def _evict(self):
+        evicted = 0
+        cutoff = time.time() - self.max_age_seconds
+        for key in [k for k, (created, _) in self._entries.items() if created < cutoff]:
+            del self._entries[key]
+            evicted += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def _size(self):
+        return len(self._entries)
+
+
+class SQLiteMessageCache(MessageCache):
+    """SQLite store - shared by every ingestion run of the process and kept
+    across restarts as long as the file survives."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        Path(path).parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # Create the file owner-only before SQLite opens it
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS gmail_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_gmail_cache_accessed ON gmail_cache(accessed_at)"
+        )
+        for file_path in (path, f"{path}-wal", f"{path}-shm"):
+            if os.path.exists(file_path):
+                os.chmod(file_path, 0o600)
+
+    def _get_many(self, keys):
+        cutoff = time.time() - self.max_age_seconds
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, value FROM gmail_cache WHERE key IN ({placeholders}) AND created_at >= ?",
+                (*chunk, cutoff),
+            ).fetchall()
+            found.update((key, json.loads(value)) for key, value in rows)
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE gmail_cache SET accessed_at = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+        return found
+
+    def _put_many(self, items):
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO gmail_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            [(key, json.dumps(value), now, now) for key, value in items.items()],
+        )
+
+    def _evict(self):
+        evicted = self._conn.execute(
+            "DELETE FROM gmail_cache WHERE created_at < ?",
+            (time.time() - self.max_age_seconds,),
+        ).rowcount
+        overflow = self._size() - self.max_entries
+        if overflow > 0:
+            evicted += self._conn.execute(
+                "DELETE FROM gmail_cache WHERE key IN ("
+                " SELECT key FROM gmail_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            ).rowcount
+        return evicted
+
+    def _size(self):
+        return self._conn.execute("SELECT COUNT(*) FROM gmail_cache").fetchone()[0]
+
+
+_default_cache: MessageCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_message_cache() -> MessageCache | None:
+    """Process-wide cache used by ``fetch_group_emails``.
+
+    ``GMAIL_MESSAGE_CACHE`` selects the store: ``sqlite`` (default), ``memory``
+    or ``off``. Falls back to memory if the SQLite file cannot be opened.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            backend = os.getenv("GMAIL_MESSAGE_CACHE", "sqlite").lower()
+            if backend == "off":
+                return None
+            if backend == "sqlite":
+                try:
+                    _default_cache = SQLiteMessageCache()
+                except Exception as e:
+                    logger.warning(f"SQLite message cache unavailable ({e}) - using memory")
+            if _default_cache is None:
+                _default_cache = InMemoryMessageCache()
+        return _default_cache
@@ -1,7 +1,7 @@
 from typing import Annotated, List, Literal
 from langgraph.graph.message import AnyMessage
 from pydantic import BaseModel, Field
-from typing_extensions import TypedDict
+from typing_extensions import NotRequired, TypedDict
 
 
 from langgraph.graph import add_messages
@@ -88,10 +88,17 @@ def convert_obj(o, m):
         return m
 
 
+class EmailThread(TypedDict):
+    email_id: str
+    text: str
+
+
 class State(TypedDict):
     email: EmailData
     triage: Annotated[RespondTo, convert_obj]
     messages: Annotated[List[AnyMessage], add_messages]
+    # Full thread text fetched by the first draft of an email, reused by rewrites
+    email_thread: NotRequired[EmailThread]
 
 
 email_template = """From: {author}
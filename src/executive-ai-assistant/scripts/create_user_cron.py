@@ -24,6 +24,8 @@ from pathlib import Path
 # Add parent directory to Python path
 script_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(script_dir.parent.parent))
+# src/ - shared utils (utils.supabase_db)
+sys.path.insert(0, str(script_dir.parent))
 
 from dotenv import load_dotenv
 
@@ -47,24 +49,20 @@ async def create_cron_via_api(user_id: str, email: str | None = None, schedule:
     # If email not provided, fetch from Supabase user_secrets (source of truth)
     if not email:
         print(f"\n=== Fetching email from user_secrets ===")
-        from supabase import create_client
+        from utils.supabase_db import get_user_secrets, is_supabase_configured
 
-        supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_SECRET_KEY")
-
-        if not supabase_url or not supabase_key:
+        if not is_supabase_configured():
             print("✗ Error: Missing Supabase credentials")
             print("  Cannot fetch email from user_secrets")
             return None
 
-        supabase = create_client(supabase_url, supabase_key)
-        result = supabase.table("user_secrets").select("email").eq("clerk_id", user_id).single().execute()
+        secrets = await get_user_secrets(user_id, "email")
 
-        if not result or not result.data:
+        if not secrets:
             print(f"✗ Error: No user_secrets found for {user_id}")
             return None
 
-        email = result.data["email"]
+        email = secrets["email"]
         print(f"  ✓ Found email: {email}")
 
     config_api_url = os.getenv(
@@ -115,28 +113,18 @@ async def create_crons_for_all_users():
     Query Supabase for all users with Gmail connected,
     then create cron jobs for each
     """
-    from supabase import create_client
-
-    supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SECRET_KEY")
+    from utils.supabase_db import is_supabase_configured, list_user_secrets
 
-    if not supabase_url or not supabase_key:
+    if not is_supabase_configured():
         print("✗ Error: Missing Supabase credentials")
         print("  Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SECRET_KEY in .env")
         return
 
-    supabase = create_client(supabase_url, supabase_key)
-
     print("\n=== Fetching Users with Gmail Connected ===")
 
     try:
         # Query user_secrets for users with gmail_refresh_token
-        result = supabase.table("user_secrets") \
-            .select("clerk_id, gmail_refresh_token") \
-            .not_.is_("gmail_refresh_token", "null") \
-            .execute()
-
-        users = result.data if result and result.data else []
+        users = await list_user_secrets("clerk_id, gmail_refresh_token", not_null="gmail_refresh_token")
 
         print(f"Found {len(users)} users with Gmail connected")
 
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Local Gmail Push Publisher (stand-in for Gmail watch + Pub/Sub)
+
+Posts a Pub/Sub push envelope carrying a Gmail notification to the Config API,
+exactly like a Pub/Sub push subscription would after Gmail's users.watch fires.
+Use it to test push-based ingestion without a Google Cloud topic.
+
+Usage:
+    # Notify the local Config API that info@800m.ca has new mail
+    python scripts/publish_gmail_push.py --email info@800m.ca
+
+    # Against a deployed Config API with a verification token
+    python scripts/publish_gmail_push.py --email info@800m.ca \
+        --url https://your-config-api.up.railway.app --token $GMAIL_PUSH_VERIFICATION_TOKEN
+
+    # Simulate a burst of notifications (should trigger a single run)
+    python scripts/publish_gmail_push.py --email info@800m.ca --count 5
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Load environment variables from project root
+script_dir = Path(__file__).parent.parent
+load_dotenv(script_dir.parent.parent / '.env')
+
+import httpx
+
+
+def build_envelope(email: str, history_id: str) -> dict:
+    """Build a Pub/Sub push request body for a Gmail notification"""
+    data = json.dumps({"emailAddress": email, "historyId": history_id}).encode("utf-8")
+    return {
+        "message": {
+            "data": base64.b64encode(data).decode("utf-8"),
+            "messageId": str(uuid.uuid4()),
+            "publishTime": datetime.now(timezone.utc).isoformat(),
+        },
+        "subscription": "projects/local/subscriptions/gmail-push-local",
+    }
+
+
+async def publish(url: str, email: str, history_id: str, token: str | None, count: int):
+    endpoint = f"{url.rstrip('/')}/api/webhooks/gmail-push"
+    params = {"token": token} if token else None
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        for i in range(count):
+            response = await client.post(
+                endpoint,
+                params=params,
+                json=build_envelope(email, history_id),
+            )
+            print(f"[PUSH {i + 1}/{count}] {response.status_code}: {response.text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish a fake Gmail push notification")
+    parser.add_argument(
+        "--email",
+        type=str,
+        required=True,
+        help="Mailbox address the notification is for",
+    )
+    parser.add_argument(
+        "--history-id",
+        type=str,
+        default="0",
+        help="historyId to include (ingestion syncs from its own stored watermark)",
+    )
+    parser.add_argument(
+        "--url",
+        type=str,
+        default=os.getenv("CONFIG_API_URL", "http://localhost:8000"),
+        help="Config API base URL",
+    )
+    parser.add_argument(
+        "--token",
+        type=str,
+        default=os.getenv("GMAIL_PUSH_VERIFICATION_TOKEN"),
+        help="Push verification token expected by the endpoint",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=1,
+        help="How many notifications to send back to back",
+    )
+
+    args = parser.parse_args()
+    asyncio.run(publish(args.url, args.email, args.history_id, args.token, args.count))
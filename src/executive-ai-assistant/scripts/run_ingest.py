@@ -21,7 +21,7 @@ print(f"GOOGLE_CLIENT_ID: {os.getenv('GOOGLE_CLIENT_ID')[:20] if os.getenv('GOOG
 print(f"GOOGLE_CLIENT_SECRET: {os.getenv('GOOGLE_CLIENT_SECRET')[:20] if os.getenv('GOOGLE_CLIENT_SECRET') else 'None'}...")
 print(f"GMAIL_REFRESH_TOKEN: {os.getenv('GMAIL_REFRESH_TOKEN')[:20] if os.getenv('GMAIL_REFRESH_TOKEN') else 'None'}...")
 
-from eaia.gmail import fetch_group_emails
+from eaia.gmail import fetch_group_emails, DEFAULT_BATCH_SIZE
 from eaia.main.config import get_config
 from langgraph_sdk import get_client
 import httpx
@@ -38,6 +38,8 @@ async def main(
     rerun: bool = False,
     email: Optional[str] = None,
     user_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    by_thread: bool = False,
 ):
     # Build config with user_id for OAuth credential fetching
     config = {"configurable": {}}
@@ -68,6 +70,8 @@ async def main(
         config=config,  # Pass config for OAuth credentials
         gmail_token=gmail_token,
         gmail_secret=gmail_secret,
+        batch_size=batch_size,
+        by_thread=by_thread,
     ):
         email_count += 1
         print(f"[INBOX] Email {email_count}: {email.get('subject', 'No Subject')} from {email.get('from_email', 'Unknown')}")
@@ -170,6 +174,19 @@ if __name__ == "__main__":
         default=None,
         help="Clerk user ID for OAuth credential fetching",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="How many Gmail messages/threads to fetch per chunk (max 100); each chunk runs as "
+        "concurrent requests throttled by the Gmail scheduler (GMAIL_MAX_CONCURRENCY).",
+    )
+    parser.add_argument(
+        "--by-thread",
+        type=int,
+        default=0,
+        help="whether to list threads instead of messages (fetches each thread once)",
+    )
 
     args = parser.parse_args()
     asyncio.run(
@@ -182,5 +199,7 @@ if __name__ == "__main__":
             rerun=bool(args.rerun),
             email=args.email,
             user_id=args.user_id,
+            batch_size=args.batch_size,
+            by_thread=bool(args.by_thread),
         )
     )
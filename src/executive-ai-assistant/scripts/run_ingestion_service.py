@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Central Multi-Tenant Ingestion Service for Executive AI Assistant
+
+Replaces one-LangGraph-cron-per-user with a single long-running service:
+- A dispatcher claims due users from Postgres (claim_ingestion_users RPC)
+- N async workers run the same fetch_group_emails -> runs.create flow as the
+  executive_cron graph (eaia.ingestion.ingest_user_emails) for each user
+- Ownership is a lease in the ingestion_leases table, so several service
+  processes can run at once (optionally split further with --shard-count)
+
+Requires the create_ingestion_leases.sql migration.
+
+Usage:
+    # One process, 20 concurrent mailboxes
+    python scripts/run_ingestion_service.py --workers 20
+
+    # Two processes, each owning half of the users
+    python scripts/run_ingestion_service.py --workers 20 --shard-count 2 --shard-index 0
+    python scripts/run_ingestion_service.py --workers 20 --shard-count 2 --shard-index 1
+
+    # Single pass over due users (e.g. from an external scheduler)
+    python scripts/run_ingestion_service.py --once
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+# Add executive-ai-assistant/ (eaia) and src/ (utils) to Python path
+script_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(script_dir))
+sys.path.insert(0, str(script_dir.parent))
+
+from dotenv import load_dotenv
+
+# Load environment variables from project root
+load_dotenv(script_dir.parent.parent / '.env')
+
+from langgraph_sdk import get_client
+from supabase import create_client
+
+from eaia.ingestion import ingest_user_emails
+
+# Share of the lease a user's ingestion may use; the rest is margin for the release call
+LEASE_USABLE_SHARE = 0.9
+# Users dequeued with less lease left than this are released and claimed again later
+MIN_LEASE_LEFT_SECONDS = 15
+
+
+class IngestionService:
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        workers: int = 10,
+        claim_size: Optional[int] = None,
+        lease_seconds: int = 300,
+        min_interval_seconds: int = 60,
+        poll_interval: float = 5.0,
+        minutes_since: int = 30,
+        shard_count: int = 1,
+        shard_index: int = 0,
+    ):
+        self.workers = workers
+        self.claim_size = claim_size or workers * 2
+        self.lease_seconds = lease_seconds
+        self.min_interval_seconds = min_interval_seconds
+        self.poll_interval = poll_interval
+        self.minutes_since = minutes_since
+        self.shard_count = shard_count
+        self.shard_index = shard_index
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.running = True
+
+        self.client = get_client(url=url) if url else get_client()
+
+        supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+        supabase_key = os.getenv("SUPABASE_SECRET_KEY")
+        if not supabase_url or not supabase_key:
+            raise ValueError("NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SECRET_KEY required")
+        self.supabase = create_client(supabase_url, supabase_key)
+
+        # Bounded so the dispatcher never holds more leases than workers can serve
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.claim_size)
+
+    def stop(self, *_):
+        """Stop claiming new users; in-flight users finish and release their leases"""
+        print(f"\n[SERVICE] Shutting down worker {self.worker_id}...")
+        self.running = False
+
+    async def _claim(self, limit: int) -> list[dict]:
+        """Claim up to ``limit`` due users (lease held for lease_seconds)"""
+        result = await asyncio.to_thread(
+            lambda: self.supabase.rpc(
+                "claim_ingestion_users",
+                {
+                    "p_worker_id": self.worker_id,
+                    "p_limit": limit,
+                    "p_lease_seconds": self.lease_seconds,
+                    "p_min_interval_seconds": self.min_interval_seconds,
+                    "p_shard_count": self.shard_count,
+                    "p_shard_index": self.shard_index,
+                },
+            ).execute()
+        )
+        return result.data or []
+
+    async def _release(self, user_id: str, ingested: bool) -> None:
+        try:
+            await asyncio.to_thread(
+                lambda: self.supabase.rpc(
+                    "release_ingestion_lease",
+                    {"p_worker_id": self.worker_id, "p_user_id": user_id, "p_ingested": ingested},
+                ).execute()
+            )
+        except Exception as e:
+            # The lease expires on its own; the user is retried after lease_seconds
+            print(f"[SERVICE] Could not release lease for {user_id}: {e}")
+
+    async def _dispatch(self, once: bool) -> None:
+        """Claim due users whenever the queue has room"""
+        while self.running:
+            free = self.queue.maxsize - self.queue.qsize()
+            claimed = []
+            if free > 0:
+                # Taken before the RPC, so it is never later than the lease start in Postgres
+                claimed_at = time.monotonic()
+                try:
+                    claimed = await self._claim(free)
+                except Exception as e:
+                    print(f"[SERVICE] Claim failed: {e}")
+            for user in claimed:
+                user["claimed_at"] = claimed_at
+                await self.queue.put(user)
+            if claimed:
+                print(f"[SERVICE] Claimed {len(claimed)} users")
+            if once and not claimed:
+                break
+            if not claimed:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _ingest_one(self, user: dict) -> None:
+        user_id, email = user["user_id"], user["email"]
+        ingested = False
+        # The lease started when the user was claimed, not when it was dequeued:
+        # only use what is left of it, so no other worker can claim the user meanwhile
+        lease_left = self.lease_seconds * LEASE_USABLE_SHARE - (time.monotonic() - user["claimed_at"])
+        if lease_left < MIN_LEASE_LEFT_SECONDS:
+            print(f"[SERVICE] {user_id}: only {lease_left:.0f}s of lease left after queueing, releasing")
+            await self._release(user_id, ingested)
+            return
+        try:
+            result = await asyncio.wait_for(
+                ingest_user_emails(
+                    self.client,
+                    user_id,
+                    email,
+                    minutes_since=self.minutes_since,
+                    config={"configurable": {"user_id": user_id, "email": email}},
+                    log_prefix=f"[SERVICE {user_id}]",
+                ),
+                timeout=lease_left,
+            )
+            ingested = True
+            print(f"[SERVICE] {user_id}: {result['processed_count']}/{result['email_count']} emails processed")
+        except Exception as e:
+            print(f"[SERVICE] Ingestion failed for {user_id} ({email}): {type(e).__name__}: {e}")
+        finally:
+            await self._release(user_id, ingested)
+
+    async def _worker(self) -> None:
+        while True:
+            user = await self.queue.get()
+            try:
+                await self._ingest_one(user)
+            finally:
+                self.queue.task_done()
+
+    async def run(self, once: bool = False) -> None:
+        print(f"[SERVICE] Worker {self.worker_id} starting: {self.workers} workers, "
+              f"shard {self.shard_index}/{self.shard_count}, lease {self.lease_seconds}s")
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        try:
+            await self._dispatch(once)
+            # Drain: every claimed user is processed and its lease released
+            await self.queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        print(f"[SERVICE] Worker {self.worker_id} stopped")
+
+
+async def main(args) -> None:
+    service = IngestionService(
+        url=args.url,
+        workers=args.workers,
+        claim_size=args.claim_size,
+        lease_seconds=args.lease_seconds,
+        min_interval_seconds=args.min_interval_seconds,
+        poll_interval=args.poll_interval,
+        minutes_since=args.minutes_since,
+        shard_count=args.shard_count,
+        shard_index=args.shard_index,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, service.stop)
+        except NotImplementedError:
+            signal.signal(sig, service.stop)
+    await service.run(once=args.once)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Central Gmail ingestion service")
+    parser.add_argument(
+        "--url",
+        type=str,
+        default=os.getenv("LANGGRAPH_DEPLOYMENT_URL"),
+        help="LangGraph deployment URL to create runs on",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=10,
+        help="Mailboxes ingested concurrently by this process",
+    )
+    parser.add_argument(
+        "--claim-size",
+        type=int,
+        default=None,
+        help="Max users leased by this process at once (default: 2x workers)",
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=int,
+        default=300,
+        help="Lease duration; a user's ingestion is cut off before it expires",
+    )
+    parser.add_argument(
+        "--min-interval-seconds",
+        type=int,
+        default=60,
+        help="Minimum time between two ingestions of the same user",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="Seconds to wait before claiming again when no user is due",
+    )
+    parser.add_argument(
+        "--minutes-since",
+        type=int,
+        default=30,
+        help="Window scanned for users without a Gmail history watermark",
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        default=1,
+        help="Number of static shards (processes) users are split across",
+    )
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        default=0,
+        help="Shard owned by this process (0-based)",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Process currently due users once and exit",
+    )
+
+    asyncio.run(main(parser.parse_args()))
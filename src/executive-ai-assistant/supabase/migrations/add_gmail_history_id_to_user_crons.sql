@@ -0,0 +1,9 @@
+-- Store the Gmail History API watermark for incremental email sync
+-- Each cron tick fetches only messages added since this historyId instead of
+-- re-listing the whole minutes_since window. NULL (or an expired id) makes the
+-- cron fall back to a full window scan, which then records a fresh watermark.
+
+ALTER TABLE user_crons
+ADD COLUMN IF NOT EXISTS gmail_history_id TEXT;
+
+COMMENT ON COLUMN user_crons.gmail_history_id IS 'Last Gmail historyId synced by executive_cron (incremental ingestion watermark)';
@@ -0,0 +1,22 @@
+-- Push-based Gmail ingestion (Gmail watch -> Pub/Sub -> /api/webhooks/gmail-push)
+-- The push webhook looks users up by mailbox address and triggers a run on the
+-- user's executive_cron assistant, so it needs the assistant_id the cron was
+-- created with. The per-user cron stays in place as a slower fallback and
+-- renews the Gmail watch before it expires (watches last at most 7 days).
+
+ALTER TABLE user_crons
+ADD COLUMN IF NOT EXISTS assistant_id TEXT;
+
+ALTER TABLE user_crons
+ADD COLUMN IF NOT EXISTS gmail_watch_expiration TIMESTAMPTZ;
+
+-- Push notifications only carry the mailbox address. The webhook matches it
+-- with a plain equality filter, so addresses are stored lowercase (the config
+-- API lowercases on write) and the index is on the column itself.
+UPDATE user_crons SET email = lower(email) WHERE email <> lower(email);
+
+DROP INDEX IF EXISTS idx_user_crons_email;
+CREATE INDEX IF NOT EXISTS idx_user_crons_email ON user_crons(email);
+
+COMMENT ON COLUMN user_crons.assistant_id IS 'LangGraph executive_cron assistant created for this user (target of push-triggered runs)';
+COMMENT ON COLUMN user_crons.gmail_watch_expiration IS 'When the Gmail users.watch registration for this mailbox expires';
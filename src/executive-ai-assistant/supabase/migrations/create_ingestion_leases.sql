@@ -0,0 +1,119 @@
+-- Central multi-tenant ingestion service (scripts/run_ingestion_service.py)
+-- Instead of one LangGraph cron per user, a pool of workers claims users in
+-- batches. Ownership of a user is a time-limited lease stored in Postgres, so
+-- any number of worker processes can run side by side: a crashed worker's
+-- leases simply expire and another worker picks the users up.
+
+-- Users managed by the service have a user_crons row but no LangGraph cron
+ALTER TABLE user_crons
+ALTER COLUMN cron_id DROP NOT NULL;
+
+CREATE TABLE IF NOT EXISTS ingestion_leases (
+    user_id TEXT PRIMARY KEY,
+    worker_id TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    last_ingested_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Only the service role touches leases
+ALTER TABLE ingestion_leases ENABLE ROW LEVEL SECURITY;
+
+-- Claim order: never-ingested users first, then the longest-waiting ones
+CREATE INDEX IF NOT EXISTS idx_ingestion_leases_due
+    ON ingestion_leases(last_ingested_at NULLS FIRST);
+
+-- Claim up to p_limit due users for p_worker_id.
+-- A user is due when its lease is free/expired and it was last ingested more
+-- than p_min_interval_seconds ago. Optional static sharding (p_shard_count >
+-- 1) splits users by hash so each process only competes for its own shard.
+CREATE OR REPLACE FUNCTION claim_ingestion_users(
+    p_worker_id TEXT,
+    p_limit INT DEFAULT 50,
+    p_lease_seconds INT DEFAULT 300,
+    p_min_interval_seconds INT DEFAULT 60,
+    p_shard_count INT DEFAULT 1,
+    p_shard_index INT DEFAULT 0
+)
+RETURNS TABLE (user_id TEXT, email TEXT)
+LANGUAGE sql
+AS $$
+    -- Every active, Gmail-connected user gets a lease row
+    INSERT INTO ingestion_leases (user_id)
+    SELECT uc.user_id
+    FROM user_crons uc
+    WHERE uc.status = 'active'
+      AND NOT EXISTS (SELECT 1 FROM ingestion_leases l WHERE l.user_id = uc.user_id)
+    ON CONFLICT DO NOTHING;
+
+    WITH due AS (
+        SELECT l.user_id, COALESCE(uc.email, us.email) AS email
+        FROM ingestion_leases l
+        JOIN user_crons uc ON uc.user_id = l.user_id
+        JOIN user_secrets us ON us.clerk_id = l.user_id
+        WHERE uc.status = 'active'
+          AND us.google_refresh_token IS NOT NULL
+          AND COALESCE(uc.email, us.email) IS NOT NULL
+          AND (l.lease_expires_at IS NULL OR l.lease_expires_at < NOW())
+          AND (l.last_ingested_at IS NULL
+               OR l.last_ingested_at < NOW() - make_interval(secs => p_min_interval_seconds))
+          AND mod(abs(hashtext(l.user_id)::BIGINT), GREATEST(p_shard_count, 1)) = p_shard_index
+        ORDER BY l.last_ingested_at NULLS FIRST
+        LIMIT p_limit
+        FOR UPDATE OF l SKIP LOCKED
+    )
+    UPDATE ingestion_leases l
+    SET worker_id = p_worker_id,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    FROM due
+    WHERE l.user_id = due.user_id
+    RETURNING l.user_id, due.email;
+$$;
+
+-- Release a lease after ingesting; only the owning worker can release it
+CREATE OR REPLACE FUNCTION release_ingestion_lease(
+    p_worker_id TEXT,
+    p_user_id TEXT,
+    p_ingested BOOLEAN DEFAULT TRUE
+)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE ingestion_leases
+    SET worker_id = NULL,
+        lease_expires_at = NULL,
+        last_ingested_at = CASE WHEN p_ingested THEN NOW() ELSE last_ingested_at END
+    WHERE user_id = p_user_id
+      AND worker_id = p_worker_id;
+$$;
+
+-- Claim one user's lease for a single executive_cron run (cron tick or
+-- push-triggered run). Returns FALSE while another run or a service worker
+-- holds it, so two runs never sync the same Gmail history range at once.
+CREATE OR REPLACE FUNCTION claim_ingestion_lease(
+    p_worker_id TEXT,
+    p_user_id TEXT,
+    p_lease_seconds INT DEFAULT 300
+)
+RETURNS BOOLEAN
+LANGUAGE sql
+AS $$
+    INSERT INTO ingestion_leases (user_id)
+    VALUES (p_user_id)
+    ON CONFLICT DO NOTHING;
+
+    WITH claimed AS (
+        UPDATE ingestion_leases
+        SET worker_id = p_worker_id,
+            lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+        WHERE user_id = p_user_id
+          AND (lease_expires_at IS NULL OR lease_expires_at < NOW())
+        RETURNING user_id
+    )
+    SELECT EXISTS (SELECT 1 FROM claimed);
+$$;
+
+COMMENT ON TABLE ingestion_leases IS 'Lease-based ownership of users by central ingestion service workers';
+COMMENT ON COLUMN ingestion_leases.worker_id IS 'Worker currently holding the lease (NULL when free)';
+COMMENT ON COLUMN ingestion_leases.lease_expires_at IS 'Lease end; expired leases can be claimed by any worker';
+COMMENT ON COLUMN ingestion_leases.last_ingested_at IS 'Last completed ingestion; NULL makes the user due immediately (e.g. after a push notification)';
@@ -33,7 +33,7 @@ except Exception as e:
 
 # Import OAuth utilities
 try:
-    from utils.google_oauth_utils import load_google_credentials
+    from utils.google_oauth_utils import load_google_token_record
     GOOGLE_OAUTH_AVAILABLE = True
 except ImportError:
     logging.warning("google_oauth_utils not available - Google Workspace executor disabled")
@@ -117,7 +117,8 @@ class ExecutorFactory:
         # Fetch refresh_token from Supabase (simple!)
         try:
             logger.info(f"Fetching Google refresh_token from Supabase for user: {user_id}")
-            refresh_token = await load_google_credentials(user_id)
+            token_record = await load_google_token_record(user_id)
+            refresh_token = token_record["refresh_token"] if token_record else None
 
             if not refresh_token:
                 logger.warning(f"No Google refresh_token for user {user_id}")
@@ -144,12 +145,14 @@ class ExecutorFactory:
             # Build credentials dict for GoogleWorkspaceExecutor
             google_creds = {
                 'google_refresh_token': refresh_token,
+                'google_access_token': token_record['access_token'],
+                'google_token_expires_at': token_record['expires_at'],
                 'google_client_id': client_id,
                 'google_client_secret': client_secret
             }
 
             logger.info("Creating GoogleWorkspaceExecutor...")
-            executor = GoogleWorkspaceExecutor(google_creds)
+            executor = GoogleWorkspaceExecutor(google_creds, user_id=user_id)
             logger.info("GoogleWorkspaceExecutor created successfully")
             return executor
 
@@ -17,16 +17,20 @@ Google API Reference:
 import logging
 from typing import Dict, Any, List, Optional
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from utils.google_async_client import get_google_async_client
+from utils.google_services import get_google_service
+from utils.google_token_cache import get_token_cache
+
 logger = logging.getLogger(__name__)
 
 
 class GoogleWorkspaceExecutor:
     """
     Generic Google Workspace API executor.
-    Builds authenticated Google API service client.
+    Builds authenticated Google API clients: an asyncio-native REST client
+    (preferred) and a googleapiclient service for APIs it does not wrap.
     """
 
     # TODO: Update these with your Google API details
@@ -38,29 +42,37 @@ class GoogleWorkspaceExecutor:
         "https://www.googleapis.com/auth/REPLACE_WITH_YOUR_SCOPE",
     ]
 
-    def __init__(self, credentials: Dict[str, str]):
+    def __init__(self, credentials: Dict[str, str], user_id: Optional[str] = None):
         """
         Initialize Google Workspace executor with OAuth credentials.
 
         Args:
             credentials: Dict containing:
                 - google_refresh_token: User's OAuth refresh token
+                - google_access_token / google_token_expires_at: Optional stored
+                  access token, reused while still valid
                 - google_client_id: OAuth app client ID
                 - google_client_secret: OAuth app client secret
+            user_id: Clerk user ID (key for the shared service cache)
         """
         logger.info(f"Initializing GoogleWorkspaceExecutor for {self.SERVICE_NAME} API")
 
+        self.user_id = user_id
         self.credentials = self._build_google_credentials(credentials)
+        # Async client over a pooled keep-alive connection - use from async tools
+        self.client = get_google_async_client(self.credentials, user_key=self.user_id)
         self.service = self._build_service()
 
         logger.info(f"GoogleWorkspaceExecutor initialized successfully")
 
     def _build_google_credentials(self, creds_dict: Dict[str, str]) -> Credentials:
         """
-        Build Google OAuth2 Credentials object.
+        Get the user's shared Google OAuth2 Credentials object.
 
         This method is GENERIC and reusable across all Google APIs.
-        Only the SCOPES need to be updated per domain.
+        Only the SCOPES need to be updated per domain. Credentials come from
+        the process-wide token cache, so access tokens are reused across
+        executors instead of being refreshed on every instantiation.
 
         Args:
             creds_dict: Dict with refresh_token, client_id, client_secret
@@ -70,13 +82,14 @@ class GoogleWorkspaceExecutor:
         """
         logger.info("Building Google OAuth2 credentials")
 
-        credentials = Credentials(
-            token=None,  # Will be auto-refreshed using refresh_token
-            refresh_token=creds_dict['google_refresh_token'],
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=creds_dict['google_client_id'],
-            client_secret=creds_dict['google_client_secret'],
-            scopes=self.SCOPES
+        credentials = get_token_cache().get_or_create(
+            self.user_id,
+            creds_dict['google_refresh_token'],
+            creds_dict['google_client_id'],
+            creds_dict['google_client_secret'],
+            scopes=self.SCOPES,
+            token=creds_dict.get('google_access_token'),
+            expiry=creds_dict.get('google_token_expires_at')
         )
 
         logger.info("Google credentials built successfully")
@@ -84,7 +97,10 @@ class GoogleWorkspaceExecutor:
 
     def _build_service(self):
         """
-        Build Google API service client.
+        Get Google API service client from the process-wide service cache.
+
+        Built once per (user, API, version) from the discovery documents
+        bundled with google-api-python-client - no per-call discovery parsing.
 
         Returns:
             Google API service object (e.g., calendar service, gmail service, etc.)
@@ -92,10 +108,11 @@ class GoogleWorkspaceExecutor:
         logger.info(f"Building Google {self.SERVICE_NAME} API service (version {self.API_VERSION})")
 
         try:
-            service = build(
+            service = get_google_service(
                 self.SERVICE_NAME,
                 self.API_VERSION,
-                credentials=self.credentials
+                self.credentials,
+                user_key=self.user_id
             )
             logger.info(f"Google {self.SERVICE_NAME} service built successfully")
             return service
@@ -110,38 +127,34 @@ class GoogleWorkspaceExecutor:
     #
     # EXAMPLES FOR DIFFERENT GOOGLE APIS:
     #
-    # --- Google Calendar API ---
-    # def list_events(self, calendar_id='primary', max_results=10):
+    # --- Google Calendar API (async client) ---
+    # async def list_events(self, calendar_id='primary', max_results=10):
     #     """List calendar events"""
-    #     events = self.service.events().list(
-    #         calendarId=calendar_id,
+    #     events = await self.client.calendar_events_list(
+    #         calendar_id,
     #         maxResults=max_results,
     #         singleEvents=True,
     #         orderBy='startTime'
-    #     ).execute()
+    #     )
     #     return events.get('items', [])
     #
-    # --- Google Contacts API (People API) ---
-    # def list_contacts(self, page_size=50):
+    # --- Google Contacts API (People API, async client via raw REST) ---
+    # async def list_contacts(self, page_size=50):
     #     """List contacts"""
-    #     results = self.service.people().connections().list(
-    #         resourceName='people/me',
-    #         pageSize=page_size,
-    #         personFields='names,emailAddresses,phoneNumbers'
-    #     ).execute()
+    #     results = await self.client.request(
+    #         'GET',
+    #         'https://people.googleapis.com/v1/people/me/connections',
+    #         params={'pageSize': page_size, 'personFields': 'names,emailAddresses,phoneNumbers'}
+    #     )
     #     return results.get('connections', [])
     #
-    # --- Gmail API ---
-    # def list_messages(self, query='', max_results=10):
+    # --- Gmail API (async client) ---
+    # async def list_messages(self, query=''):
     #     """List email messages"""
-    #     results = self.service.users().messages().list(
-    #         userId='me',
-    #         q=query,
-    #         maxResults=max_results
-    #     ).execute()
+    #     results = await self.client.gmail_messages_list(q=query)
     #     return results.get('messages', [])
     #
-    # --- Google Drive API ---
+    # --- Google Drive API (sync googleapiclient service) ---
     # def list_files(self, page_size=10):
     #     """List Drive files"""
     #     results = self.service.files().list(
@@ -63,7 +63,7 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
-from langchain_core.messages import BaseMessage, AIMessage, ToolMessage
+from langchain_core.messages import BaseMessage, AIMessage, SystemMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel
 from langchain_core.messages import HumanMessage
@@ -77,6 +77,8 @@ from state import WorkflowState
 
 # Import centralized configuration constants
 from shared_utils import DEFAULT_LLM_MODEL
+from utils.llm_utils import cached_prompt_content
+from utils.tool_output_budget import budget_tools
 
 # Load environment variables for LangSmith integration
 load_dotenv()
@@ -180,10 +182,10 @@ async def calendar_agent_node(
     logger.info(f"[calendar_agent_node] Loading for user: {user_id}")
 
     # Load full agent config from Supabase at runtime
-    from utils.config_utils import get_agent_config_from_supabase
+    from utils.config_utils import aget_agent_config_from_supabase
     from utils.llm_utils import get_llm
 
-    agent_config = get_agent_config_from_supabase(user_id, "calendar_agent")
+    agent_config = await aget_agent_config_from_supabase(user_id, "calendar_agent")
 
     # Extract LLM configuration from user's saved settings
     llm_config = agent_config.get("llm", {})
@@ -206,7 +208,7 @@ async def calendar_agent_node(
 
     # Delegate to new simplified calendar agent implementation
     # Uses create_react_agent with Google Workspace tools
-    from calendar_agent.calendar_orchestrator import create_calendar_agent
+    from calendar_agent.calendar_orchestrator import get_cached_calendar_agent
 
     # Determine correct API key based on model provider
     # CRITICAL: Only pass the API key that matches the model provider
@@ -219,21 +221,28 @@ async def calendar_agent_node(
         logger.info(f"[CONFIG] Using OpenAI model: {model_name}")
 
     # Create calendar model with user-specific settings using cross-provider utility
-    logger.info(f"[CONFIG] Creating calendar model with: model={model_name}, temp={temperature}, streaming=False")
-    calendar_model = get_llm(
-        model_name,
-        temperature=temperature,
-        **model_kwargs,
-        streaming=False,
-    )
-    logger.info(f"[CONFIG] Successfully created calendar model: {type(calendar_model).__name__}")
+    def create_calendar_model():
+        logger.info(f"[CONFIG] Creating calendar model with: model={model_name}, temp={temperature}, streaming=False")
+        calendar_model = get_llm(
+            model_name,
+            temperature=temperature,
+            prompt_cache_key=f"calendar_agent:{user_id}",
+            **model_kwargs,
+            streaming=False,
+        )
+        logger.info(f"[CONFIG] Successfully created calendar model: {type(calendar_model).__name__}")
+        return calendar_model
 
-    # Create calendar agent using simplified factory function
+    # Reuse the user's compiled calendar agent across turns (rebuilt when the
+    # model, temperature, config or API key changes)
     # This handles Google Workspace executor initialization and tool loading
-    agent = await create_calendar_agent(
-        model=calendar_model,
+    agent = await get_cached_calendar_agent(
+        create_calendar_model,
         user_id=user_id,
-        agent_config=agent_config
+        agent_config=agent_config,
+        model_name=model_name,
+        temperature=temperature,
+        api_key=next(iter(model_kwargs.values())),
     )
 
     # Invoke agent with current state
@@ -266,10 +275,10 @@ async def multi_tool_rube_agent_node(
     logger.info(f"[multi_tool_rube_agent_node] Input state keys: {list(state.keys())}")
 
     # Load full agent config from Supabase at runtime
-    from utils.config_utils import get_agent_config_from_supabase
+    from utils.config_utils import aget_agent_config_from_supabase
     from utils.llm_utils import get_llm
 
-    agent_config = get_agent_config_from_supabase(user_id, "multi_tool_rube_agent")
+    agent_config = await aget_agent_config_from_supabase(user_id, "multi_tool_rube_agent")
 
     # Extract LLM configuration from user's saved settings
     llm_config = agent_config.get("llm", {})
@@ -305,6 +314,7 @@ async def multi_tool_rube_agent_node(
     rube_model = get_llm(
         model_name,
         temperature=temperature,
+        prompt_cache_key=f"multi_tool_rube_agent:{user_id}",
         **model_kwargs,
         streaming=False,
     )
@@ -314,9 +324,9 @@ async def multi_tool_rube_agent_node(
     try:
         logger.info(f"[multi_tool_rube_agent_node] Loading OAuth-enabled tools for user: {user_id}")
 
-        from multi_tool_rube_agent.tools import get_agent_simple_tools
+        from multi_tool_rube_agent.tools import aget_agent_simple_tools
 
-        useful_tools = get_agent_simple_tools(user_id=user_id)
+        useful_tools = await aget_agent_simple_tools(user_id=user_id)
 
         logger.info(f"[multi_tool_rube_agent_node] Successfully loaded {len(useful_tools)} tools")
         if useful_tools:
@@ -350,9 +360,10 @@ async def multi_tool_rube_agent_node(
     logger.info(f"[multi_tool_rube_agent_node] Creating react agent with {len(useful_tools)} tools")
     rube_agent = create_react_agent(
         model=rube_model,
-        tools=useful_tools,
+        tools=budget_tools(useful_tools),
         name="multi_tool_rube_agent",
-        prompt=rube_prompt,
+        # Static prompt: cached by the provider together with the tool definitions
+        prompt=SystemMessage(content=cached_prompt_content(model_name, [rube_prompt])),
     )
     logger.info(f"[multi_tool_rube_agent_node] Agent created successfully")
 
@@ -654,9 +665,9 @@ You have verified access to these 89 tools and can perform real operations acros
     # Create the agent
     rube_agent = create_react_agent(
         model=rube_model,
-        tools=useful_tools,
+        tools=budget_tools(useful_tools),
         name="multi_tool_rube_agent",
-        prompt=rube_prompt,
+        prompt=SystemMessage(content=cached_prompt_content(DEFAULT_LLM_MODEL, [rube_prompt])),
     )
 
     logger.info(
@@ -783,11 +794,9 @@ async def create_supervisor_graph(config: Optional[RunnableConfig] = None):
     context = get_current_context()
 
     # Enhanced supervisor prompt with intelligent intermediary pattern
-    supervisor_prompt = f"""You are an intelligent team supervisor acting as an intermediary between users and specialized agents.
-
-CURRENT CONTEXT:
-- Today: {datetime.fromisoformat(context["current_time"]).strftime("%Y-%m-%d")} at {datetime.fromisoformat(context["current_time"]).strftime("%I:%M %p")}
-- Timezone: {context["timezone_name"]}
+    # Static instructions first and the current context last, so the instructions
+    # form a stable prefix the provider can cache across turns
+    supervisor_instructions = """You are an intelligent team supervisor acting as an intermediary between users and specialized agents.
 
 AGENT CAPABILITIES:
 - calendar_agent: All calendar operations (create/view/modify events, check availability, scheduling)
@@ -916,6 +925,15 @@ CRITICAL PRINCIPLES
 
 Remember: You are the intelligent bridge that ensures quality, context, and trust in every interaction."""
 
+    current_time = datetime.fromisoformat(context["current_time"])
+    supervisor_context = f"""CURRENT CONTEXT:
+- Today: {current_time.strftime("%Y-%m-%d")} at {current_time.strftime("%I:%M %p")}
+- Timezone: {context["timezone_name"]}"""
+
+    supervisor_prompt = SystemMessage(
+        content=cached_prompt_content(DEFAULT_LLM_MODEL, [supervisor_instructions], supervisor_context)
+    )
+
     # Create supervisor workflow
     workflow = create_supervisor(
         agents=[calendar_agent, multi_tool_rube_agent],
@@ -0,0 +1,233 @@
+"""
+RUBE_SEARCH_TOOLS Result Index
+Answers repeated or near-identical Rube tool searches from memory.
+
+Almost every Rube workflow starts with RUBE_SEARCH_TOOLS ("send an email with
+Gmail", "append a row in Google Sheets"), and the answer rarely changes. This
+module indexes past search results per user and serves a new search from
+the index when a previous one is similar enough and still fresh.
+
+- Results are kept per user: they include the user's app connection status
+- Lookup is an exact match on the canonical search text, else token Jaccard -
+  but only between searches naming the same apps ("outlook" never matches a
+  cached "gmail" search)
+- Entries expire after RUBE_SEARCH_CACHE_TTL_SECONDS; results that report
+  connection status expire after RUBE_SEARCH_CONNECTION_TTL_SECONDS, since a
+  connection made outside the agent is not seen by the index
+- A user's entries are dropped whenever RUBE_MANAGE_CONNECTIONS is called
+- Error results are never cached
+
+Usage (as a call interceptor of the MCP session pool):
+    tools = await get_mcp_session_pool().get_tools(
+        user_id, connection, call_interceptor=get_rube_search_index().intercept
+    )
+"""
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TOOL_NAME = "RUBE_SEARCH_TOOLS"
+CONNECTIONS_TOOL_NAME = "RUBE_MANAGE_CONNECTIONS"
+
+RUBE_SEARCH_CACHE_TTL_SECONDS = float(os.getenv("RUBE_SEARCH_CACHE_TTL_SECONDS", "1800"))
+RUBE_SEARCH_CONNECTION_TTL_SECONDS = float(os.getenv("RUBE_SEARCH_CONNECTION_TTL_SECONDS", "120"))
+RUBE_SEARCH_SIMILARITY = float(os.getenv("RUBE_SEARCH_SIMILARITY", "0.8"))
+RUBE_SEARCH_CACHE_PER_USER = int(os.getenv("RUBE_SEARCH_CACHE_PER_USER", "128"))
+
+# Argument keys that identify a Rube session rather than what is searched for
+_IGNORED_KEYS = {"session", "session_id"}
+
+_STOPWORDS = {
+    "a", "an", "and", "the", "to", "of", "in", "on", "for", "with", "from", "by",
+    "my", "me", "i", "is", "it", "this", "that", "be", "all", "using", "via", "into",
+}
+
+# App / toolkit names; fuzzy matches require the same set on both sides
+_APP_TOKENS = {
+    "gmail", "outlook", "email", "mail", "calendar", "googlecalendar", "google", "sheets",
+    "googlesheets", "drive", "googledrive", "docs", "googledocs", "slack", "teams",
+    "microsoft", "notion", "github", "gitlab", "jira", "linear", "asana", "trello",
+    "clickup", "hubspot", "salesforce", "airtable", "dropbox", "onedrive", "zoom",
+    "discord", "telegram", "whatsapp", "twitter", "linkedin", "shopify", "stripe",
+    "calendly", "todoist", "confluence", "figma",
+}
+# Argument keys whose values name toolkits explicitly
+_APP_KEY_RE = re.compile(r"toolkit|app", re.IGNORECASE)
+# Results mentioning connection state (is_connected, connection_status, ...)
+_CONNECTION_RE = re.compile(r"connect(ed|ion)", re.IGNORECASE)
+
+
+def search_text(arguments: Any) -> str:
+    """Canonical text of a search call: every string value except session fields."""
+    if isinstance(arguments, dict):
+        return " ".join(search_text(v) for k, v in sorted(arguments.items()) if k not in _IGNORED_KEYS)
+    if isinstance(arguments, (list, tuple)):
+        return " ".join(search_text(v) for v in arguments)
+    if isinstance(arguments, str):
+        return arguments
+    return "" if arguments is None else json.dumps(arguments)
+
+
+def _tokens(text: str) -> FrozenSet[str]:
+    return frozenset(t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in _STOPWORDS)
+
+
+def _app_tokens(arguments: Any, tokens: FrozenSet[str]) -> FrozenSet[str]:
+    """Apps a search is about: known app names plus values of toolkit/app keys."""
+    apps = set(tokens & _APP_TOKENS)
+
+    def _walk(value: Any, explicit: bool) -> None:
+        if isinstance(value, dict):
+            for k, v in value.items():
+                if k not in _IGNORED_KEYS:
+                    _walk(v, explicit or bool(_APP_KEY_RE.search(str(k))))
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                _walk(v, explicit)
+        elif explicit and isinstance(value, str):
+            apps.update(_tokens(value))
+
+    _walk(arguments, False)
+    return frozenset(apps)
+
+
+def _result_text(result: Any) -> str:
+    content = getattr(result, "content", None)
+    if isinstance(content, list):
+        return " ".join(getattr(block, "text", "") or "" for block in content)
+    return str(result)
+
+
+@dataclass
+class _Entry:
+    tokens: FrozenSet[str]
+    apps: FrozenSet[str]
+    result: Any
+    stored_at: float
+    ttl: float
+
+
+class RubeSearchIndex:
+    """Per-user index of fresh RUBE_SEARCH_TOOLS results."""
+
+    def __init__(
+        self,
+        ttl: float = RUBE_SEARCH_CACHE_TTL_SECONDS,
+        threshold: float = RUBE_SEARCH_SIMILARITY,
+        max_per_user: int = RUBE_SEARCH_CACHE_PER_USER,
+        connection_ttl: float = RUBE_SEARCH_CONNECTION_TTL_SECONDS,
+    ):
+        self.ttl = ttl
+        self.connection_ttl = connection_ttl
+        self.threshold = threshold
+        self.max_per_user = max_per_user
+        self.hits = 0
+        self.misses = 0
+        # user_id -> canonical text -> entry (oldest first)
+        self._entries: Dict[str, "OrderedDict[str, _Entry]"] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, user_id: str, arguments: Any) -> Optional[Any]:
+        """Cached result of the most similar fresh search for the same apps, or None."""
+        text = search_text(arguments)
+        tokens = _tokens(text)
+        if not tokens:
+            return None
+        apps = _app_tokens(arguments, tokens)
+        now = time.monotonic()
+
+        with self._lock:
+            entries = self._entries.get(user_id)
+            if not entries:
+                return None
+            for key in [k for k, e in entries.items() if now - e.stored_at > e.ttl]:
+                del entries[key]
+            exact = entries.get(text)
+            candidates = list(entries.items())
+        if exact is not None:
+            return exact.result
+
+        best_score, best = 0.0, None
+        for _, entry in candidates:
+            if entry.apps != apps:
+                continue
+            score = len(tokens & entry.tokens) / len(tokens | entry.tokens)
+            if score > best_score:
+                best_score, best = score, entry
+        if best is not None and best_score >= self.threshold:
+            logger.info(f"[RUBE_SEARCH] Similar search ({best_score:.2f}) served from index")
+            return best.result
+        return None
+
+    def store(self, user_id: str, arguments: Any, result: Any) -> None:
+        text = search_text(arguments)
+        tokens = _tokens(text)
+        if not tokens:
+            return
+        ttl = self.connection_ttl if _CONNECTION_RE.search(_result_text(result)) else self.ttl
+        entry = _Entry(tokens, _app_tokens(arguments, tokens), result, time.monotonic(), min(ttl, self.ttl))
+        with self._lock:
+            entries = self._entries.setdefault(user_id, OrderedDict())
+            entries[text] = entry
+            entries.move_to_end(text)
+            while len(entries) > self.max_per_user:
+                entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop a user's indexed searches (or everyone's)."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    async def intercept(
+        self,
+        user_id: str,
+        name: str,
+        arguments: Any,
+        call_next: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """MCP call interceptor: serve RUBE_SEARCH_TOOLS from the index when possible."""
+        if name == CONNECTIONS_TOOL_NAME:
+            # Connection status is part of every search result
+            self.invalidate(user_id)
+            return await call_next()
+        if name != SEARCH_TOOL_NAME:
+            return await call_next()
+
+        cached = self.lookup(user_id, arguments)
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"[RUBE_SEARCH] Served {SEARCH_TOOL_NAME} locally for {user_id} ({self.stats()})")
+            return cached
+
+        self.misses += 1
+        result = await call_next()
+        if not getattr(result, "isError", False):
+            self.store(user_id, arguments, result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = sum(len(e) for e in self._entries.values())
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+
+_search_index: Optional[RubeSearchIndex] = None
+
+
+def get_rube_search_index() -> RubeSearchIndex:
+    """Process-wide RUBE_SEARCH_TOOLS index."""
+    global _search_index
+    if _search_index is None:
+        _search_index = RubeSearchIndex()
+    return _search_index
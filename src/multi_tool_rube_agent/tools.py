@@ -36,7 +36,7 @@ except ImportError:
 
 # Import OAuth token utilities
 try:
-    from utils.mcp_auth import get_mcp_oauth_tokens
+    from utils.mcp_auth import get_mcp_oauth_tokens, aget_mcp_oauth_tokens
     MCP_OAUTH_AVAILABLE = True
 except ImportError:
     print("[Warning] utils.mcp_auth not available - OAuth tokens will not be loaded")
@@ -75,10 +75,14 @@ USEFUL_TOOL_NAMES = {
 # MCP CONNECTION CLASS
 # =============================================================================
 
+# Sentinel: AgentMCPConnection loads the OAuth tokens itself
+_LOAD_TOKENS = object()
+
+
 class AgentMCPConnection:
     """MCP connection for Rube universal MCP server with caching"""
 
-    def __init__(self, user_id: str = None, agent_id: str = None):
+    def __init__(self, user_id: str = None, agent_id: str = None, oauth_data=_LOAD_TOKENS):
         self.logger = logging.getLogger(__name__)
         self._mcp_client: Optional[MultiServerMCPClient] = None
         self._mcp_tools: List[BaseTool] = []
@@ -93,8 +97,9 @@ class AgentMCPConnection:
         # Try loading OAuth tokens first (new method)
         if MCP_OAUTH_AVAILABLE and user_id:
             try:
-                self.logger.info(f"[OAUTH] Attempting to load OAuth tokens for user_id={user_id}, agent_id={self.agent_id}")
-                oauth_data = get_mcp_oauth_tokens(user_id, self.agent_id)
+                if oauth_data is _LOAD_TOKENS:
+                    self.logger.info(f"[OAUTH] Attempting to load OAuth tokens for user_id={user_id}, agent_id={self.agent_id}")
+                    oauth_data = get_mcp_oauth_tokens(user_id, self.agent_id)
                 if oauth_data:
                     self.auth_token = oauth_data.get("access_token")
                     self.mcp_url = oauth_data.get("mcp_url") or self.mcp_url
@@ -144,12 +149,24 @@ class AgentMCPConnection:
         else:
             self.mcp_servers = {}
 
+    @classmethod
+    async def acreate(cls, user_id: str = None, agent_id: str = None) -> "AgentMCPConnection":
+        """Create a connection from async code (awaits the token lookup instead of blocking the loop)"""
+        agent_id = agent_id or f"{AGENT_NAME}_agent"
+        oauth_data = None
+        if MCP_OAUTH_AVAILABLE and user_id:
+            try:
+                oauth_data = await aget_mcp_oauth_tokens(user_id, agent_id)
+            except Exception as e:
+                logging.getLogger(__name__).error(f"[OAUTH] Failed to load OAuth tokens: {e}")
+        return cls(user_id=user_id, agent_id=agent_id, oauth_data=oauth_data)
+
     async def get_mcp_tools(self) -> List[BaseTool]:
-        """Get MCP tools with 5-minute cache"""
+        """Get MCP tools with 5-minute cache (schemas from the shared MCP tool catalog)"""
 
         # Use cached tools if fresh
         if (self._mcp_tools and self._tools_cache_time and
-            (datetime.now() - self._tools_cache_time).seconds < 300):
+            (datetime.now() - self._tools_cache_time).total_seconds() < 300):
             return self._mcp_tools
 
         # No MCP server configured
@@ -170,7 +187,7 @@ class AgentMCPConnection:
             # 30-second timeout
             self.logger.info(f"[MCP] Fetching tools from MCP server (30s timeout)...")
             tools = await asyncio.wait_for(
-                self._mcp_client.get_tools(),
+                self._get_catalog_tools(f"rube_{AGENT_NAME}"),
                 timeout=30.0
             )
 
@@ -211,6 +228,52 @@ class AgentMCPConnection:
             self.logger.error(f"[MCP] Traceback:\n{traceback.format_exc()}")
             return []
 
+    async def get_pooled_mcp_tools(self) -> List[BaseTool]:
+        """
+        Get MCP tools bound to a long-lived pooled session.
+
+        Unlike get_mcp_tools(), the session and tool list are shared across
+        connections for the same user, URL and token (utils/mcp_session_pool),
+        so warm calls reuse an open session. Must run on the caller's event loop.
+        """
+        if not self.mcp_url:
+            self.logger.warning(f"No Rube {AGENT_NAME} MCP server configured")
+            return []
+
+        from utils.mcp_session_pool import get_mcp_session_pool
+        try:
+            from .search_cache import get_rube_search_index
+        except ImportError:
+            from search_cache import get_rube_search_index
+
+        pool = get_mcp_session_pool()
+        try:
+            tools = await pool.get_tools(
+                self.user_id,
+                self.mcp_servers[f"rube_{AGENT_NAME}"],
+                tool_filter=lambda t: t.name in USEFUL_TOOL_NAMES,
+                # Repeated RUBE_SEARCH_TOOLS calls are answered from a local index
+                call_interceptor=get_rube_search_index().intercept,
+            )
+            self.logger.info(f"[MCP] {len(tools)} pooled Rube {AGENT_NAME} MCP tools: {[t.name for t in tools]} ({pool.stats()})")
+            return tools
+        except Exception as e:
+            self.logger.error(f"[MCP] Failed to load pooled Rube {AGENT_NAME} MCP tools: {type(e).__name__}: {e}")
+            return []
+
+    async def _get_catalog_tools(self, server_name: str) -> List[BaseTool]:
+        """Build tools from the process-wide schema catalog (list_tools only on a miss)"""
+        from utils.mcp_tool_catalog import build_tools, get_mcp_tool_catalog, list_all_tools
+
+        async def fetch():
+            self.logger.info(f"[MCP] Listing tools from {self.mcp_url}")
+            async with self._mcp_client.session(server_name) as session:
+                return await list_all_tools(session)
+
+        _, schemas = await get_mcp_tool_catalog().get(self.mcp_url, fetch)
+        # Bound to the connection: each call opens its own session, as with get_tools()
+        return build_tools(schemas, connection=self.mcp_servers[server_name])
+
     async def discover_all_tools(self) -> List[Dict[str, str]]:
         """
         Discover ALL available tools from MCP server for development/debugging
@@ -408,9 +471,32 @@ async def get_agent_tools_with_mcp(user_id: str = None) -> List[BaseTool]:
     return tools
 
 
+async def aget_agent_simple_tools(user_id: str = None) -> List[BaseTool]:
+    """
+    Async tool loader for the supervisor's multi_tool_rube_agent_node.
+
+    Runs on the caller's event loop and reuses pooled MCP sessions, instead of
+    opening a new session in a new event loop on a worker thread every turn.
+
+    Args:
+        user_id: Clerk user ID for loading OAuth tokens. If provided, will use
+                 per-user OAuth tokens from Supabase. Otherwise uses global config.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    # Token lookup is served from the in-memory MCP token manager when warm
+    # (and awaited, not blocking the loop, when cold)
+    agent_mcp = await AgentMCPConnection.acreate(user_id=user_id) if user_id else _agent_mcp
+    tools = await agent_mcp.get_pooled_mcp_tools()
+    logger.info(f"[TOOLS_ASYNC] Returning {len(tools)} total tools for user_id={user_id}")
+    return tools
+
+
 def get_agent_simple_tools(user_id: str = None) -> List[BaseTool]:
     """
     Synchronous wrapper for getting agent tools
+    (async callers should use aget_agent_simple_tools)
 
     Args:
         user_id: Clerk user ID for loading OAuth tokens. If provided, will use
@@ -0,0 +1,174 @@
+"""
+Compiled Agent Cache - Reuse Per-User Agent Graphs Across Turns
+LRU of compiled LangGraph agents with an idle TTL and single-flight builds.
+
+Building a sub-agent per supervisor handoff (LLM client, Google executor,
+tools, create_react_agent, StateGraph.compile) costs far more than running
+it. Compiled graphs are stateless between invocations, so they are cached
+per user and rebuilt only when something in the key changes.
+
+- Keys should include everything the build depends on (user, model,
+  temperature, config version, API key fingerprint)
+- Entries unused for AGENT_CACHE_IDLE_TTL_SECONDS are dropped
+- At most AGENT_CACHE_MAX_ENTRIES graphs are kept (least recently used out)
+- Concurrent misses for the same key share one build
+
+Usage:
+    cache = get_agent_cache("calendar")
+    agent = await cache.get_or_build(key, build_calendar_agent)
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+AGENT_CACHE_MAX_ENTRIES = int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "256"))
+AGENT_CACHE_IDLE_TTL_SECONDS = float(os.getenv("AGENT_CACHE_IDLE_TTL_SECONDS", "1800"))
+
+
+def config_version(config: Optional[Dict[str, Any]]) -> str:
+    """Stable short hash of an agent config dict, for use in cache keys."""
+    payload = json.dumps(config or {}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def secret_fingerprint(secret: Optional[str]) -> str:
+    """Short hash of an API key, so keys can be part of a cache key without being stored."""
+    return hashlib.sha256((secret or "").encode("utf-8")).hexdigest()[:16]
+
+
+class CompiledAgentCache:
+    """LRU + idle-TTL cache of compiled agents with build-time statistics."""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = AGENT_CACHE_MAX_ENTRIES,
+        idle_ttl: float = AGENT_CACHE_IDLE_TTL_SECONDS,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.build_seconds = 0.0
+        # key -> (last_used monotonic, agent)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._building: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            # Drop idle entries from the cold end
+            while self._entries:
+                oldest_key, (last_used, _) = next(iter(self._entries.items()))
+                if now - last_used <= self.idle_ttl:
+                    break
+                del self._entries[oldest_key]
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries[key] = (now, entry[1])
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _store(self, key: Hashable, agent: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), agent)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_build(
+        self,
+        key: Hashable,
+        build: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda agent: True,
+    ) -> Any:
+        """
+        Return the cached agent for ``key`` or build (and cache) it.
+
+        Args:
+            key: Everything the build depends on
+            build: Zero-argument coroutine function creating the agent
+            cacheable: Return False to use a built agent for this turn only
+                (e.g. a degraded agent built while credentials are missing)
+        """
+        agent = self._lookup(key)
+        if agent is not None:
+            with self._lock:
+                self.hits += 1
+            logger.info(f"[AGENT_CACHE] {self.name}: hit ({self._hit_rate():.0%} hit rate)")
+            return agent
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.misses += 1
+            task = self._building.get(key)
+            if task is None or task.get_loop() is not loop:
+                task = loop.create_task(self._build(key, build, cacheable))
+                self._building[key] = task
+        return await asyncio.shield(task)
+
+    async def _build(self, key: Hashable, build: Callable, cacheable: Callable[[Any], bool]) -> Any:
+        start = time.perf_counter()
+        try:
+            agent = await build()
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.builds += 1
+            self.build_seconds += elapsed
+        if cacheable(agent):
+            self._store(key, agent)
+        logger.info(
+            f"[AGENT_CACHE] {self.name}: built in {elapsed * 1000:.0f}ms "
+            f"({self._hit_rate():.0%} hit rate, {len(self._entries)} cached)"
+        )
+        return agent
+
+    def _hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop every cached agent whose key starts with ``user_id``."""
+        with self._lock:
+            for key in [k for k in self._entries if isinstance(k, tuple) and k and k[0] == user_id]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self._hit_rate(), 3),
+                "builds": self.builds,
+                "avg_build_ms": round(self.build_seconds / self.builds * 1000, 1) if self.builds else 0.0,
+            }
+
+
+_caches: Dict[str, CompiledAgentCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_agent_cache(name: str) -> CompiledAgentCache:
+    """Process-wide compiled agent cache for one kind of agent."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = CompiledAgentCache(name)
+            _caches[name] = cache
+        return cache
@@ -6,13 +6,40 @@ This module provides runtime config loading for agents. It's separate from confi
 - config_utils.py: Agents <-> Supabase (loading config at runtime)
 
 Both query Supabase but serve different purposes - not duplication!
+
+Reads go through an in-process read-through cache (TTL + LRU, keyed by
+(user_id, agent_id); user secrets use agent_id "global" like the config API).
+A miss loads the user's whole runtime bundle (secrets + every agent config)
+in one Supabase call and warms the cache for all of the user's agents.
+Expired entries are served while a refresh runs, and during Supabase outages.
+
+The config API runs in its own process, so it cannot clear this cache.
+Instead it bumps user_secrets.config_version on every write (migration 015).
+Entries remember the version they were loaded at; at most every
+CONFIG_VERSION_CHECK_SECONDS per user a cached read compares it with the
+database, and entries loaded before a newer version are dropped (never
+served stale).
 """
 import os
 import sys
 import io
+import copy
+import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-from supabase import create_client, Client
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from utils.supabase_db import (
+    UserRuntimeBundle,
+    bundle_config_version,
+    get_supabase_client,  # noqa: F401 - re-exported for existing callers
+    get_user_config_version,
+    get_user_config_version_sync,
+    get_user_runtime_bundle,
+    get_user_runtime_bundle_sync,
+)
 
 # Ensure UTF-8 encoding for stdout/stderr before any logging
 # This prevents UnicodeEncodeError when Supabase returns URLs with Unicode characters
@@ -29,6 +56,195 @@ _ensure_utf8_encoding()
 
 logger = logging.getLogger(__name__)
 
+# Fresh for CONFIG_CACHE_TTL_SECONDS; after that served stale (while refreshing,
+# or when Supabase is down) for up to CONFIG_CACHE_MAX_STALE_SECONDS
+CONFIG_CACHE_TTL_SECONDS = float(os.getenv("CONFIG_CACHE_TTL_SECONDS", "60"))
+CONFIG_CACHE_MAX_STALE_SECONDS = float(os.getenv("CONFIG_CACHE_MAX_STALE_SECONDS", "3600"))
+CONFIG_CACHE_SIZE = int(os.getenv("CONFIG_CACHE_SIZE", "1024"))
+# How often a cached user's config_version is compared with the database
+CONFIG_VERSION_CHECK_SECONDS = float(os.getenv("CONFIG_VERSION_CHECK_SECONDS", "5"))
+
+USER_SECRETS_CACHE_ID = "global"
+
+
+class _ConfigCache:
+    """Thread-safe TTL + LRU cache of config dicts keyed by (user_id, agent_id)."""
+
+    def __init__(self, ttl: float, max_stale: float, max_entries: int, version_check: float = CONFIG_VERSION_CHECK_SECONDS):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.version_check = version_check
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        # key -> (stored_at, value, config_version it was loaded at)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any], Optional[int]]]" = OrderedDict()
+        # user_id -> newest config_version seen, and when it was last checked
+        self._versions: Dict[str, int] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._refreshing: set = set()
+        self._tasks: set = set()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Tuple[str, str]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Return (value, is_fresh); value is None when missing or too stale to serve."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            age = time.monotonic() - entry[0]
+            known = self._versions.get(key[0])
+            outdated = known is not None and (entry[2] is None or entry[2] < known)
+            if outdated or age > self.ttl + self.max_stale:
+                del self._entries[key]
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if age <= self.ttl:
+                self.hits += 1
+                return copy.deepcopy(entry[1]), True
+            self.stale_hits += 1
+            return copy.deepcopy(entry[1]), False
+
+    def store(self, key: Tuple[str, str], value: Dict[str, Any], version: Optional[int] = None) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(value), version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def note_version(self, user_id: str, version: Optional[int]) -> None:
+        """Record the user's current config_version (entries loaded before it become misses)."""
+        if version is None:
+            return
+        with self._lock:
+            self._versions[user_id] = max(version, self._versions.get(user_id, version))
+            self._checked_at[user_id] = time.monotonic()
+
+    def version_check_due(self, user_id: str) -> bool:
+        """True when the user has cached entries and their version was not checked recently."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at.get(user_id, float("-inf")) <= self.version_check:
+                return False
+            if not any(k[0] == user_id for k in self._entries):
+                return False
+            # Claim the check, so concurrent readers don't all query
+            self._checked_at[user_id] = now
+            return True
+
+    def invalidate(self, user_id: str, agent_id: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id and agent_id in (None, k[1])]:
+                del self._entries[key]
+
+    def revalidate(self, key: Tuple[str, str], fetch: Callable) -> None:
+        """Refresh ``key`` in the background (one refresh per key at a time)."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def _refresh():
+            try:
+                value, version = await fetch()
+                self.store(key, value, version)
+            except Exception as e:
+                logger.warning(f"  Config refresh failed for {key}, serving cached value: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(_refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+            }
+
+
+_config_cache = _ConfigCache(CONFIG_CACHE_TTL_SECONDS, CONFIG_CACHE_MAX_STALE_SECONDS, CONFIG_CACHE_SIZE)
+
+
+def invalidate_config_cache(user_id: str, agent_id: Optional[str] = None) -> None:
+    """
+    Drop this process's cached config for a user after it was changed here.
+
+    Other processes are not reached by this; writes from the config API bump
+    user_secrets.config_version instead (see module docstring).
+
+    Args:
+        user_id: Clerk user ID
+        agent_id: Agent whose config changed ("global" for user_secrets),
+            or None to drop everything cached for the user
+    """
+    _config_cache.invalidate(user_id, agent_id)
+
+
+def get_config_cache_stats() -> Dict[str, int]:
+    return _config_cache.stats()
+
+
+def _check_version_sync(user_id: str) -> None:
+    if not _config_cache.version_check_due(user_id):
+        return
+    try:
+        _config_cache.note_version(user_id, get_user_config_version_sync(user_id))
+    except Exception as e:
+        logger.warning(f"  Config version check failed for {user_id}: {e}")
+
+
+async def _check_version_async(user_id: str) -> None:
+    if not _config_cache.version_check_due(user_id):
+        return
+    try:
+        _config_cache.note_version(user_id, await get_user_config_version(user_id))
+    except Exception as e:
+        logger.warning(f"  Config version check failed for {user_id}: {e}")
+
+
+def _cached_sync(key: Tuple[str, str], fetch: Callable[[], Tuple[Dict[str, Any], Optional[int]]]) -> Dict[str, Any]:
+    """Read-through for sync callers: refetch expired entries inline, stale on failure.
+
+    ``fetch`` returns (value, config_version it was loaded at).
+    """
+    _check_version_sync(key[0])
+    value, fresh = _config_cache.lookup(key)
+    if fresh:
+        return value
+    try:
+        result, version = fetch()
+    except ValueError:
+        raise
+    except Exception as e:
+        if value is None:
+            raise
+        logger.warning(f"  Supabase unavailable ({e}) - serving cached config for {key}")
+        return value
+    _config_cache.store(key, result, version)
+    return result
+
+
+async def _cached_async(key: Tuple[str, str], fetch: Callable) -> Dict[str, Any]:
+    """Read-through for async callers: serve expired entries while refreshing in the background."""
+    await _check_version_async(key[0])
+    value, fresh = _config_cache.lookup(key)
+    if value is not None:
+        if not fresh:
+            _config_cache.revalidate(key, fetch)
+        return value
+    result, version = await fetch()
+    _config_cache.store(key, result, version)
+    return result
+
 
 def _sanitize_dict_encoding(d: Dict[str, Any]) -> None:
     """Recursively ensure all strings in dict are properly UTF-8 encoded.
@@ -52,26 +268,61 @@ def _sanitize_dict_encoding(d: Dict[str, Any]) -> None:
                 pass
 
 
-def get_supabase_client() -> Client:
-    """
-    Get Supabase client with service role key.
+def _agent_config_data(row: Optional[Dict[str, Any]], user_id: str, agent_id: str) -> Dict[str, Any]:
+    """Extract config_data from an agent_configs row ({} when missing)."""
+    if row and row.get("config_data"):
+        config_data = row["config_data"]
 
-    Returns:
-        Supabase client instance
+        # Ensure all string values are properly decoded as UTF-8
+        # This prevents issues if Supabase returns MCP URLs with Unicode characters
+        if isinstance(config_data, dict):
+            _sanitize_dict_encoding(config_data)
 
-    Raises:
-        ValueError: If Supabase credentials are missing
-    """
-    supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SECRET_KEY")
+        logger.info(f" Loaded config for {agent_id}, user {user_id}")
+        return config_data
+    else:
+        logger.info(f"  No config found for {agent_id}, user {user_id} - will use defaults")
+        return {}
 
-    if not supabase_url or not supabase_key:
-        raise ValueError(
-            "Missing Supabase credentials. Set NEXT_PUBLIC_SUPABASE_URL and "
-            "SUPABASE_SECRET_KEY in .env"
-        )
 
-    return create_client(supabase_url, supabase_key)
+def _warm_from_bundle(user_id: str, bundle: UserRuntimeBundle, skip: Tuple[str, str]) -> Optional[int]:
+    """Cache everything in the bundle except ``skip`` (the caller stores that one).
+
+    Returns the config_version the bundle was read at.
+    """
+    version = bundle_config_version(bundle)
+    _config_cache.note_version(user_id, version)
+    if skip != (user_id, USER_SECRETS_CACHE_ID):
+        _config_cache.store((user_id, USER_SECRETS_CACHE_ID), dict(bundle["user_secrets"] or {}), version)
+    for agent_id, row in bundle["agent_configs"].items():
+        if skip == (user_id, agent_id):
+            continue
+        config_data = row.get("config_data") or {}
+        if isinstance(config_data, dict):
+            _sanitize_dict_encoding(config_data)
+        _config_cache.store((user_id, agent_id), config_data, version)
+    return version
+
+
+def _agent_config_from_bundle(
+    bundle: UserRuntimeBundle, user_id: str, agent_id: str
+) -> Tuple[Dict[str, Any], Optional[int]]:
+    version = _warm_from_bundle(user_id, bundle, skip=(user_id, agent_id))
+    return _agent_config_data(bundle["agent_configs"].get(agent_id), user_id, agent_id), version
+
+
+def _user_secrets_from_bundle(bundle: UserRuntimeBundle, user_id: str) -> Tuple[Dict[str, Any], Optional[int]]:
+    version = _warm_from_bundle(user_id, bundle, skip=(user_id, USER_SECRETS_CACHE_ID))
+    return _user_secrets_data(bundle["user_secrets"], user_id), version
+
+
+def _user_secrets_data(secrets: Optional[Dict[str, Any]], user_id: str) -> Dict[str, Any]:
+    if secrets:
+        logger.info(f" Loaded user secrets for user {user_id}")
+        return dict(secrets)
+    else:
+        logger.info(f"  No user secrets found for {user_id} - will use defaults")
+        return {}
 
 
 def get_agent_config_from_supabase(
@@ -82,7 +333,8 @@ def get_agent_config_from_supabase(
     Load agent-specific configuration from Supabase agent_configs table.
 
     This is used by agents at runtime to load user-specific configuration.
-    Returns the raw config_data for the agent to use directly.
+    Returns the raw config_data for the agent to use directly. Served from the
+    in-process config cache when possible.
 
     Args:
         user_id: Clerk user ID
@@ -100,28 +352,10 @@ def get_agent_config_from_supabase(
         ...     # Fallback to .env for local dev
     """
     try:
-        supabase = get_supabase_client()
-
-        result = supabase.table("agent_configs")\
-            .select("config_data")\
-            .eq("clerk_id", user_id)\
-            .eq("agent_id", agent_id)\
-            .maybe_single()\
-            .execute()
-
-        if result.data and result.data.get("config_data"):
-            config_data = result.data["config_data"]
-
-            # Ensure all string values are properly decoded as UTF-8
-            # This prevents issues if Supabase returns MCP URLs with Unicode characters
-            if isinstance(config_data, dict):
-                _sanitize_dict_encoding(config_data)
-
-            logger.info(f" Loaded config for {agent_id}, user {user_id}")
-            return config_data
-        else:
-            logger.info(f"  No config found for {agent_id}, user {user_id} - will use defaults")
-            return {}
+        return _cached_sync(
+            (user_id, agent_id),
+            lambda: _agent_config_from_bundle(get_user_runtime_bundle_sync(user_id), user_id, agent_id),
+        )
 
     except ValueError as e:
         # Missing Supabase credentials - expected in local dev without Supabase
@@ -153,23 +387,50 @@ def get_user_secrets_from_supabase(user_id: str) -> Dict[str, Any]:
         >>> preferred_model = secrets.get("preferred_model", "claude-3-5-sonnet-20241022")
     """
     try:
-        supabase = get_supabase_client()
+        return _cached_sync(
+            (user_id, USER_SECRETS_CACHE_ID),
+            lambda: _user_secrets_from_bundle(get_user_runtime_bundle_sync(user_id), user_id),
+        )
 
-        result = supabase.table("user_secrets")\
-            .select("*")\
-            .eq("clerk_id", user_id)\
-            .maybe_single()\
-            .execute()
+    except ValueError as e:
+        # Missing Supabase credentials - expected in local dev without Supabase
+        logger.warning(f"  Supabase not configured: {e}")
+        return {}
+    except Exception as e:
+        logger.error(f" Error loading user secrets: {e}")
+        return {}
 
-        if result.data:
-            logger.info(f" Loaded user secrets for user {user_id}")
-            return result.data
-        else:
-            logger.info(f"  No user secrets found for {user_id} - will use defaults")
-            return {}
+
+async def aget_agent_config_from_supabase(user_id: str, agent_id: str) -> Dict[str, Any]:
+    """
+    Async version of get_agent_config_from_supabase for async graph nodes.
+
+    Uses the pooled async Supabase client, so the event loop is not blocked.
+    """
+    async def fetch():
+        return _agent_config_from_bundle(await get_user_runtime_bundle(user_id), user_id, agent_id)
+
+    try:
+        return await _cached_async((user_id, agent_id), fetch)
+
+    except ValueError as e:
+        logger.warning(f"  Supabase not configured: {e}")
+        logger.info(f"  Falling back to .env defaults for {agent_id}")
+        return {}
+    except Exception as e:
+        logger.error(f" Error loading config for {agent_id}: {e}")
+        return {}
+
+
+async def aget_user_secrets_from_supabase(user_id: str) -> Dict[str, Any]:
+    """Async version of get_user_secrets_from_supabase."""
+    async def fetch():
+        return _user_secrets_from_bundle(await get_user_runtime_bundle(user_id), user_id)
+
+    try:
+        return await _cached_async((user_id, USER_SECRETS_CACHE_ID), fetch)
 
     except ValueError as e:
-        # Missing Supabase credentials - expected in local dev without Supabase
         logger.warning(f"  Supabase not configured: {e}")
         return {}
     except Exception as e:
@@ -0,0 +1,247 @@
+"""
+Google API Request Scheduler - Quota-Aware Concurrency
+Shared async scheduler for Gmail and Google Calendar API calls.
+
+Every call goes through three gates:
+- A concurrency limit (per event loop) so we never flood the HTTP pool
+- A per-user token bucket charged in Google quota units
+  (https://developers.google.com/gmail/api/reference/quota)
+- Automatic exponential backoff with jitter on 429 / 5xx / rate-limit 403s
+
+Usage:
+    scheduler = get_gmail_scheduler()
+    msg = await scheduler.run_async(
+        email, GMAIL_QUOTA_UNITS["messages.get"],
+        lambda: client.gmail_messages_get(mid),
+    )
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Gmail API per-method quota unit costs
+GMAIL_QUOTA_UNITS = {
+    "messages.get": 5,
+    "messages.list": 5,
+    "messages.send": 100,
+    "messages.modify": 5,
+    "threads.get": 10,
+    "threads.list": 10,
+    "history.list": 2,
+    "getProfile": 1,
+    "watch": 100,
+}
+
+# Calendar quota is request-based - every call costs one unit
+CALENDAR_QUOTA_UNITS = {
+    "events.list": 1,
+    "events.get": 1,
+    "events.insert": 1,
+    "events.update": 1,
+    "events.delete": 1,
+    "events.quickAdd": 1,
+    "calendarList.list": 1,
+}
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+
+
+def _error_status(error: Exception) -> Optional[int]:
+    """HTTP status of a googleapiclient HttpError or httpx HTTPStatusError."""
+    resp = getattr(error, "resp", None) or getattr(error, "response", None)
+    status = getattr(resp, "status", None) or getattr(resp, "status_code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable_error(error: Exception, retry_server_errors: bool = True) -> bool:
+    """True for rate limiting (429, rate-limit 403) and, optionally, transient 5xx."""
+    status = _error_status(error)
+    if status == 429:
+        return True
+    if status == 403:
+        return any(reason in str(error) for reason in RATE_LIMIT_REASONS)
+    return retry_server_errors and status in RETRYABLE_STATUSES
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a Retry-After header, if Google sent one."""
+    resp = getattr(error, "resp", None) or getattr(error, "response", None)
+    headers = getattr(resp, "headers", None) or (resp if isinstance(resp, dict) else {})
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return float(value) if value else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class _TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate`` units/second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, cost: float) -> float:
+        """Take ``cost`` units and return how long to wait before they are available."""
+        cost = min(cost, self.capacity)
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= cost
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class GoogleApiScheduler:
+    """Quota-aware scheduler for blocking Google API client calls."""
+
+    def __init__(
+        self,
+        name: str,
+        units_per_second: float,
+        burst: Optional[float] = None,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 32.0,
+    ):
+        self.name = name
+        self.units_per_second = units_per_second
+        self.burst = burst or units_per_second
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        # asyncio primitives are bound to one loop; graphs may run tools on several
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _bucket(self, user_key: str) -> _TokenBucket:
+        with self._buckets_lock:
+            bucket = self._buckets.get(user_key)
+            if bucket is None:
+                bucket = _TokenBucket(self.units_per_second, self.burst)
+                self._buckets[user_key] = bucket
+            return bucket
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def backoff_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """Exponential backoff with full jitter, honouring Retry-After when present."""
+        if error is not None and (retry_after := _retry_after(error)):
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def acquire(self, user_key: str, cost: float) -> None:
+        """Wait until ``user_key`` has ``cost`` quota units available."""
+        wait = self._bucket(user_key).reserve(cost)
+        if wait > 0:
+            logger.debug(f"[{self.name}] Throttling {user_key} for {wait:.2f}s ({cost} units)")
+            await asyncio.sleep(wait)
+
+    async def run(
+        self,
+        user_key: str,
+        cost: float,
+        fn: Callable[[], Any],
+        retry_server_errors: bool = True,
+    ) -> Any:
+        """Run blocking ``fn`` in a worker thread under the quota and concurrency limits.
+
+        Args:
+            user_key: Quota bucket key (the mailbox / user the call is made for)
+            cost: Quota units charged for this call
+            fn: Zero-argument callable performing the request (e.g. ``req.execute``)
+            retry_server_errors: Retry 5xx as well as rate limits. Disable for
+                non-idempotent calls such as sending an email.
+        """
+        return await self.run_async(
+            user_key, cost, lambda: asyncio.to_thread(fn), retry_server_errors
+        )
+
+    async def run_async(
+        self,
+        user_key: str,
+        cost: float,
+        call: Callable[[], Awaitable[Any]],
+        retry_server_errors: bool = True,
+    ) -> Any:
+        """Await ``call()`` under the quota and concurrency limits.
+
+        Same as ``run`` for asyncio-native clients: ``call`` must return a new
+        awaitable each time it is invoked, since retries call it again.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(user_key, cost)
+            async with self._semaphore():
+                try:
+                    return await call()
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_retryable_error(e, retry_server_errors):
+                        raise
+                    status = _error_status(e)
+                    delay = self.backoff_delay(attempt, e)
+            attempt += 1
+            logger.warning(
+                f"[{self.name}] Retryable error for {user_key} "
+                f"(status {status}), retry {attempt}/{self.max_retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+
+_gmail_scheduler: Optional[GoogleApiScheduler] = None
+_calendar_scheduler: Optional[GoogleApiScheduler] = None
+_init_lock = threading.Lock()
+
+
+def get_gmail_scheduler() -> GoogleApiScheduler:
+    """Process-wide Gmail scheduler (250 quota units/user/second by default)."""
+    global _gmail_scheduler
+    with _init_lock:
+        if _gmail_scheduler is None:
+            _gmail_scheduler = GoogleApiScheduler(
+                "GMAIL",
+                units_per_second=float(os.getenv("GMAIL_QUOTA_UNITS_PER_SECOND", "250")),
+                max_concurrency=int(os.getenv("GMAIL_MAX_CONCURRENCY", "8")),
+            )
+        return _gmail_scheduler
+
+
+def get_calendar_scheduler() -> GoogleApiScheduler:
+    """Process-wide Calendar scheduler (10 requests/user/second by default)."""
+    global _calendar_scheduler
+    with _init_lock:
+        if _calendar_scheduler is None:
+            _calendar_scheduler = GoogleApiScheduler(
+                "CALENDAR",
+                units_per_second=float(os.getenv("CALENDAR_REQUESTS_PER_SECOND", "10")),
+                max_concurrency=int(os.getenv("CALENDAR_MAX_CONCURRENCY", "8")),
+            )
+        return _calendar_scheduler
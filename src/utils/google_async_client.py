@@ -0,0 +1,237 @@
+"""
+Async Google REST Client - Gmail & Calendar over pooled httpx
+asyncio-native replacement for googleapiclient + httplib2 + asyncio.to_thread.
+
+- One keep-alive httpx.AsyncClient per event loop, shared by every user
+- google.oauth2 Credentials for auth; access tokens come from the shared
+  token cache (utils.google_token_cache), refreshed with an async POST
+- Errors are raised as googleapiclient HttpError, so existing
+  `except HttpError` handling and the request scheduler keep working
+
+Only the Gmail and Calendar endpoints the agents use are wrapped; `request()`
+reaches any other Google REST endpoint.
+
+Usage:
+    client = get_google_async_client(credentials, user_key=email)
+    message = await client.gmail_messages_get(message_id, format="metadata")
+"""
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import httpx
+import httplib2
+from googleapiclient.errors import HttpError
+
+from utils.google_token_cache import get_token_cache
+
+logger = logging.getLogger(__name__)
+
+GMAIL_BASE_URL = "https://gmail.googleapis.com/gmail/v1/users/me"
+CALENDAR_BASE_URL = "https://www.googleapis.com/calendar/v3"
+
+HTTP_TIMEOUT = httpx.Timeout(float(os.getenv("GOOGLE_HTTP_TIMEOUT_SECONDS", "30")), connect=10.0)
+HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("GOOGLE_HTTP_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("GOOGLE_HTTP_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=60.0,
+)
+
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled keep-alive client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS, http2=False)
+        _http_clients[loop] = client
+    return client
+
+
+def _http_error(response: httpx.Response) -> HttpError:
+    """Translate an httpx error response into googleapiclient's HttpError."""
+    resp = httplib2.Response({"status": str(response.status_code), **dict(response.headers)})
+    resp.reason = response.reason_phrase
+    return HttpError(resp, response.content, uri=str(response.request.url))
+
+
+class GoogleAsyncClient:
+    """Async Gmail/Calendar REST client bound to one user's credentials."""
+
+    def __init__(self, credentials, user_key: Optional[str] = None):
+        self.credentials = credentials
+        self.user_key = user_key
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """Authenticated request; returns the decoded JSON body (None for 204)."""
+        token = await get_token_cache().ensure_fresh(self.credentials, self.user_key)
+        # Drop unset params; lists are sent as repeated query params like googleapiclient does
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        response = await get_http_client().request(
+            method,
+            url,
+            params=params,
+            json=json,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        if response.status_code == 401:
+            # Token revoked/expired early - refresh once and retry
+            token = await get_token_cache().ensure_fresh(self.credentials, self.user_key, force=True)
+            response = await get_http_client().request(
+                method,
+                url,
+                params=params,
+                json=json,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        if response.status_code >= 400:
+            raise _http_error(response)
+        if response.status_code == 204 or not response.content:
+            return None
+        return response.json()
+
+    # ------------------------------------------------------------------
+    # Gmail
+    # ------------------------------------------------------------------
+
+    async def gmail_messages_get(
+        self, message_id: str, format: Optional[str] = None, metadata_headers: Optional[List[str]] = None
+    ) -> dict:
+        return await self.request(
+            "GET",
+            f"{GMAIL_BASE_URL}/messages/{message_id}",
+            params={"format": format, "metadataHeaders": metadata_headers},
+        )
+
+    async def gmail_messages_list(self, q: Optional[str] = None, page_token: Optional[str] = None) -> dict:
+        return await self.request(
+            "GET", f"{GMAIL_BASE_URL}/messages", params={"q": q, "pageToken": page_token}
+        )
+
+    async def gmail_messages_send(self, body: dict) -> dict:
+        return await self.request("POST", f"{GMAIL_BASE_URL}/messages/send", json=body)
+
+    async def gmail_messages_modify(self, message_id: str, body: dict) -> dict:
+        return await self.request("POST", f"{GMAIL_BASE_URL}/messages/{message_id}/modify", json=body)
+
+    async def gmail_threads_get(
+        self, thread_id: str, format: Optional[str] = None, metadata_headers: Optional[List[str]] = None
+    ) -> dict:
+        return await self.request(
+            "GET",
+            f"{GMAIL_BASE_URL}/threads/{thread_id}",
+            params={"format": format, "metadataHeaders": metadata_headers},
+        )
+
+    async def gmail_threads_list(self, q: Optional[str] = None, page_token: Optional[str] = None) -> dict:
+        return await self.request(
+            "GET", f"{GMAIL_BASE_URL}/threads", params={"q": q, "pageToken": page_token}
+        )
+
+    async def gmail_history_list(
+        self,
+        start_history_id: str,
+        history_types: Optional[List[str]] = None,
+        page_token: Optional[str] = None,
+    ) -> dict:
+        return await self.request(
+            "GET",
+            f"{GMAIL_BASE_URL}/history",
+            params={
+                "startHistoryId": start_history_id,
+                "historyTypes": history_types,
+                "pageToken": page_token,
+            },
+        )
+
+    async def gmail_get_profile(self) -> dict:
+        return await self.request("GET", f"{GMAIL_BASE_URL}/profile")
+
+    async def gmail_watch(self, body: dict) -> dict:
+        return await self.request("POST", f"{GMAIL_BASE_URL}/watch", json=body)
+
+    # ------------------------------------------------------------------
+    # Calendar
+    # ------------------------------------------------------------------
+
+    async def calendar_events_list(self, calendar_id: str = "primary", **params) -> dict:
+        return await self.request("GET", f"{CALENDAR_BASE_URL}/calendars/{calendar_id}/events", params=params)
+
+    async def calendar_events_get(self, event_id: str, calendar_id: str = "primary") -> dict:
+        return await self.request("GET", f"{CALENDAR_BASE_URL}/calendars/{calendar_id}/events/{event_id}")
+
+    async def calendar_events_insert(self, body: dict, calendar_id: str = "primary", **params) -> dict:
+        return await self.request(
+            "POST", f"{CALENDAR_BASE_URL}/calendars/{calendar_id}/events", params=params, json=body
+        )
+
+    async def calendar_events_update(self, event_id: str, body: dict, calendar_id: str = "primary", **params) -> dict:
+        return await self.request(
+            "PUT", f"{CALENDAR_BASE_URL}/calendars/{calendar_id}/events/{event_id}", params=params, json=body
+        )
+
+    async def calendar_events_patch(self, event_id: str, body: dict, calendar_id: str = "primary", **params) -> dict:
+        return await self.request(
+            "PATCH", f"{CALENDAR_BASE_URL}/calendars/{calendar_id}/events/{event_id}", params=params, json=body
+        )
+
+    async def calendar_events_delete(self, event_id: str, calendar_id: str = "primary", **params) -> None:
+        return await self.request(
+            "DELETE", f"{CALENDAR_BASE_URL}/calendars/{calendar_id}/events/{event_id}", params=params
+        )
+
+    async def calendar_events_quick_add(self, text: str, calendar_id: str = "primary") -> dict:
+        return await self.request(
+            "POST", f"{CALENDAR_BASE_URL}/calendars/{calendar_id}/events/quickAdd", params={"text": text}
+        )
+
+    async def calendar_list_list(self) -> dict:
+        return await self.request("GET", f"{CALENDAR_BASE_URL}/users/me/calendarList")
+
+
+_clients: "OrderedDict[tuple, GoogleAsyncClient]" = OrderedDict()
+_clients_lock = threading.Lock()
+CLIENT_CACHE_SIZE = int(os.getenv("GOOGLE_CLIENT_CACHE_SIZE", "1024"))
+
+
+def get_google_async_client(credentials, user_key: Optional[str] = None) -> GoogleAsyncClient:
+    """
+    Get the shared async client for a user.
+
+    Clients are cached per (user_key, refresh token, scopes), matching the
+    entries of the shared token cache.
+    """
+    secret = getattr(credentials, "refresh_token", None) or getattr(credentials, "token", None) or ""
+    key = (
+        user_key or "",
+        hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16],
+        tuple(sorted(getattr(credentials, "scopes", None) or ())),
+    )
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = GoogleAsyncClient(credentials, user_key=user_key)
+            _clients[key] = client
+            while len(_clients) > CLIENT_CACHE_SIZE:
+                _clients.popitem(last=False)
+        _clients.move_to_end(key)
+        return client
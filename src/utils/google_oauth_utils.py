@@ -6,28 +6,68 @@ This module uses the same pattern as MCP OAuth (utils/mcp_auth.py) but simpler:
 - No encryption needed (Supabase RLS protects tokens)
 - Only refresh_token required (OAuth 2.0 best practice)
 - Google client credentials from .env (shared across users)
+- The last access token and its expiry are stored too, so other processes
+  (cron workers, supervisor graph, config API) reuse it instead of refreshing
 """
 import os
+import asyncio
 import logging
+from datetime import datetime, timezone
 from typing import Optional
 from dotenv import load_dotenv
 
+from utils.supabase_db import (
+    get_supabase_client,  # noqa: F401 - re-exported for existing callers
+    get_user_secrets,
+    update_user_secrets,
+)
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 
-def get_supabase_client():
-    """Get Supabase client"""
-    from supabase import create_client
+def _parse_expiry(value) -> Optional[datetime]:
+    """Supabase timestamptz -> naive UTC datetime (what google-auth expects)."""
+    if not value:
+        return None
+    try:
+        expiry = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if expiry.tzinfo is not None:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    return expiry
+
+
+async def _save_google_access_token(user_id: str, access_token: str, expiry: Optional[datetime]) -> None:
+    await update_user_secrets(user_id, {
+        "google_access_token": access_token,
+        "google_token_expires_at": expiry.replace(tzinfo=timezone.utc).isoformat() if expiry else None,
+    })
+
 
-    url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-    key = os.getenv("SUPABASE_SECRET_KEY")
+_pending_writes: set = set()
 
-    if not url or not key:
-        raise ValueError("NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SECRET_KEY required")
 
-    return create_client(url, key)
+def persist_google_access_token(user_id: str, credentials) -> None:
+    """
+    Write a refreshed access token back to user_secrets without blocking.
+
+    Registered as the token cache's refresh callback, so it runs inside the
+    event loop that performed the refresh. Failures are only logged - the
+    next process simply refreshes again.
+    """
+    async def _write():
+        try:
+            await _save_google_access_token(user_id, credentials.token, credentials.expiry)
+            logger.debug(f"[Google OAuth] Stored refreshed access token for {user_id}")
+        except Exception as e:
+            logger.warning(f"[Google OAuth] Failed to store refreshed access token for {user_id}: {e}")
+
+    task = asyncio.get_running_loop().create_task(_write())
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
 
 
 async def load_google_credentials(user_id: str) -> Optional[str]:
@@ -39,49 +79,59 @@ async def load_google_credentials(user_id: str) -> Optional[str]:
     - Access tokens auto-refresh via google-auth library
     - Client ID/secret from .env (shared OAuth app)
 
+    Use load_google_token_record() to also get the stored access token.
+
     Args:
         user_id: Clerk user ID
 
     Returns:
         Google refresh_token string, or None if not found
     """
+    record = await load_google_token_record(user_id)
+    return record["refresh_token"] if record else None
+
+
+async def load_google_token_record(user_id: str) -> Optional[dict]:
+    """
+    Load the user's Google tokens from Supabase.
+
+    Also registers a token-cache refresh callback for the user, so any access
+    token refreshed in this process is written back to user_secrets.
+
+    Args:
+        user_id: Clerk user ID
+
+    Returns:
+        Dict with refresh_token, access_token (may be None) and expires_at
+        (naive UTC datetime, may be None), or None if no refresh_token is stored
+    """
     try:
         logger.info(f"[Google OAuth] ===== GOOGLE OAUTH TOKEN FETCH DEBUG =====")
         logger.info(f"[Google OAuth] user_id being queried: '{user_id}'")
         logger.info(f"[Google OAuth] user_id type: {type(user_id)}")
         logger.info(f"[Google OAuth] user_id length: {len(user_id) if user_id else 0}")
 
-        supabase = get_supabase_client()
-
-        logger.info(f"[Google OAuth] Supabase client initialized")
         logger.info(f"[Google OAuth] Querying table: user_secrets")
         logger.info(f"[Google OAuth] Query: SELECT google_refresh_token WHERE clerk_id = '{user_id}'")
 
-        # Fetch refresh_token from Supabase (same pattern as MCP auth)
-        result = supabase.table("user_secrets") \
-            .select("google_refresh_token, clerk_id, email") \
-            .eq("clerk_id", user_id) \
-            .maybe_single() \
-            .execute()
+        # Fetch tokens through the shared pooled Supabase client
+        data = await get_user_secrets(
+            user_id, "google_refresh_token, google_access_token, google_token_expires_at, clerk_id, email"
+        )
 
         logger.info(f"[Google OAuth] Query executed")
 
-        # Check if result is None (Supabase client error)
-        if result is None:
-            logger.error(f"[Google OAuth] ❌ Supabase query returned None - connection failed")
-            return None
-
-        logger.info(f"[Google OAuth] result.data type: {type(result.data)}")
-        logger.info(f"[Google OAuth] result.data is None: {result.data is None}")
-
         # Sanitize sensitive data for logging (only show structure, not full token)
-        if result.data:
-            safe_data = {k: (v[:20] + "..." if k == "google_refresh_token" and v else v) for k, v in result.data.items()}
-            logger.info(f"[Google OAuth] result.data (sanitized): {safe_data}")
+        if data:
+            safe_data = {
+                k: (v[:20] + "..." if k in ("google_refresh_token", "google_access_token") and v else v)
+                for k, v in data.items()
+            }
+            logger.info(f"[Google OAuth] user_secrets row (sanitized): {safe_data}")
         else:
-            logger.info(f"[Google OAuth] result.data: None")
+            logger.info(f"[Google OAuth] user_secrets row: None")
 
-        if not result.data:
+        if not data:
             logger.warning(f"[Google OAuth] ❌ No user_secrets row found for clerk_id='{user_id}'")
             logger.warning(f"[Google OAuth] This means either:")
             logger.warning(f"[Google OAuth]   1. User has not connected Google Calendar yet")
@@ -91,10 +141,10 @@ async def load_google_credentials(user_id: str) -> Optional[str]:
             return None
 
         logger.info(f"[Google OAuth] ✅ Found user_secrets row")
-        logger.info(f"[Google OAuth] clerk_id in DB: '{result.data.get('clerk_id')}'")
-        logger.info(f"[Google OAuth] email in DB: '{result.data.get('email')}'")
+        logger.info(f"[Google OAuth] clerk_id in DB: '{data.get('clerk_id')}'")
+        logger.info(f"[Google OAuth] email in DB: '{data.get('email')}'")
 
-        refresh_token = result.data.get("google_refresh_token")
+        refresh_token = data.get("google_refresh_token")
 
         if not refresh_token:
             logger.warning(f"[Google OAuth] ❌ google_refresh_token column is NULL/empty")
@@ -108,7 +158,16 @@ async def load_google_credentials(user_id: str) -> Optional[str]:
         logger.info(f"[Google OAuth] Token preview: {token_preview}")
         logger.info(f"[Google OAuth] ===== END DEBUG =====")
 
-        return refresh_token
+        from utils.google_token_cache import get_token_cache
+        get_token_cache().set_refresh_callback(
+            user_id, lambda credentials: persist_google_access_token(user_id, credentials)
+        )
+
+        return {
+            "refresh_token": refresh_token,
+            "access_token": data.get("google_access_token"),
+            "expires_at": _parse_expiry(data.get("google_token_expires_at")),
+        }
 
     except ValueError as ve:
         logger.error(f"[Google OAuth] ❌ Supabase configuration error: {ve}")
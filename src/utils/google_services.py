@@ -0,0 +1,123 @@
+"""
+Google API Service Factory - Shared Discovery/Service Cache
+Process-wide cache of built googleapiclient service objects.
+
+googleapiclient.discovery.build() parses a discovery document every time it
+runs. This module builds each service once per (user, API, version) from the
+discovery documents bundled with google-api-python-client (no network fetch)
+and reuses it across callers. Gmail and Calendar calls use the asyncio-native
+client in utils.google_async_client instead; this cache serves the remaining
+googleapiclient users (e.g. the Google agent template for other APIs).
+
+Cached services are safe to share between worker threads (asyncio.to_thread):
+every request gets an AuthorizedHttp bound to the calling thread, because
+httplib2.Http objects are not thread-safe.
+"""
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+import httplib2
+import google_auth_httplib2
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+SERVICE_CACHE_SIZE = int(os.getenv("GOOGLE_SERVICE_CACHE_SIZE", "256"))
+SERVICE_CACHE_TTL_SECONDS = int(os.getenv("GOOGLE_SERVICE_CACHE_TTL_SECONDS", "3600"))
+# AuthorizedHttp objects kept per worker thread (LRU, one per recently used credentials)
+THREAD_HTTP_POOL_SIZE = int(os.getenv("GOOGLE_THREAD_HTTP_POOL_SIZE", "16"))
+
+_services: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+_services_lock = threading.Lock()
+_thread_http = threading.local()
+
+
+def _credentials_fingerprint(credentials) -> str:
+    """Distinguish credential sets for the same user (e.g. after re-connecting Google)."""
+    secret = getattr(credentials, "refresh_token", None) or getattr(credentials, "token", None) or ""
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16]
+
+
+def _authorized_http(credentials) -> google_auth_httplib2.AuthorizedHttp:
+    """AuthorizedHttp for ``credentials`` owned by the current thread (keeps connections alive).
+
+    Each thread keeps at most THREAD_HTTP_POOL_SIZE entries; the least recently
+    used one is evicted and its connections closed.
+    """
+    pool = getattr(_thread_http, "pool", None)
+    if pool is None:
+        pool = _thread_http.pool = OrderedDict()
+    key = id(credentials)
+    entry = pool.get(key)
+    if entry is None or entry[0] is not credentials:
+        entry = (credentials, google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http()))
+        pool[key] = entry
+    pool.move_to_end(key)
+    while len(pool) > THREAD_HTTP_POOL_SIZE:
+        _, (_, evicted) = pool.popitem(last=False)
+        try:
+            evicted.http.close()
+        except Exception as e:
+            logger.debug(f"Could not close evicted Google HTTP connection: {e}")
+    return entry[1]
+
+
+def _build_service(api: str, version: str, credentials):
+    def request_builder(http, *args, **kwargs):
+        # Ignore the shared http - each thread uses its own connection
+        return HttpRequest(_authorized_http(credentials), *args, **kwargs)
+
+    return build(
+        api,
+        version,
+        http=_authorized_http(credentials),
+        requestBuilder=request_builder,
+        static_discovery=True,
+        cache_discovery=False,
+    )
+
+
+def get_google_service(api: str, version: str, credentials, user_key: Optional[str] = None):
+    """
+    Get a (cached) Google API service client.
+
+    Args:
+        api: API name, e.g. "gmail", "calendar"
+        version: API version, e.g. "v1", "v3"
+        credentials: google.oauth2 Credentials for the user
+        user_key: Cache key for the user (email or Clerk user ID)
+
+    Returns:
+        googleapiclient Resource, shared by all callers for the same user/API
+        while it stays in the LRU (max GOOGLE_SERVICE_CACHE_SIZE entries,
+        GOOGLE_SERVICE_CACHE_TTL_SECONDS lifetime)
+    """
+    key = (user_key or "", api, version, _credentials_fingerprint(credentials))
+    now = time.monotonic()
+    with _services_lock:
+        entry = _services.get(key)
+        if entry and now - entry[0] < SERVICE_CACHE_TTL_SECONDS:
+            _services.move_to_end(key)
+            return entry[1]
+
+    logger.debug(f"Building Google {api} {version} service for {user_key}")
+    service = _build_service(api, version, credentials)
+
+    with _services_lock:
+        _services[key] = (now, service)
+        _services.move_to_end(key)
+        while len(_services) > SERVICE_CACHE_SIZE:
+            _services.popitem(last=False)
+    return service
+
+
+def clear_google_service_cache() -> None:
+    """Drop all cached services (e.g. after credentials were revoked)."""
+    with _services_lock:
+        _services.clear()
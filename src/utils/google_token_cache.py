@@ -0,0 +1,211 @@
+"""
+Google Access Token Cache - Process-Wide, Single-Flight Refresh
+Shares one google.oauth2 Credentials object (and its access token) per user.
+
+Without this, every Gmail send/fetch and every calendar lookup built a fresh
+Credentials(token=None) and paid an OAuth refresh round trip first.
+
+- Entries are keyed by (user_key, refresh token fingerprint), so Gmail and
+  Calendar callers share one entry; its scopes are the union of every
+  caller's scopes (refreshes don't send scopes, Google returns all granted ones)
+- Tokens are refreshed before they expire: in the background once inside
+  TOKEN_REFRESH_MARGIN, inline once inside TOKEN_EXPIRY_MARGIN
+- Concurrent callers for the same user await one in-flight refresh
+- Refresh callbacks (set_refresh_callback) let other processes reuse the
+  new token, e.g. by writing it back to Supabase
+
+Usage:
+    creds = await get_token_cache().get_credentials(
+        user_id, refresh_token, client_id, client_secret, scopes=SCOPES
+    )
+"""
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+# Start a background refresh this long before expiry...
+TOKEN_REFRESH_MARGIN = timedelta(seconds=int(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS", "300")))
+# ...and block on the refresh when the token is closer to expiry than this
+TOKEN_EXPIRY_MARGIN = timedelta(seconds=30)
+TOKEN_CACHE_SIZE = int(os.getenv("GOOGLE_TOKEN_CACHE_SIZE", "1024"))
+
+
+def _fingerprint(secret: Optional[str]) -> str:
+    return hashlib.sha256((secret or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _expires_within(credentials, margin: timedelta) -> bool:
+    """True when there is no token, its expiry is unknown (e.g. a token seeded
+    from storage without one) or it expires within ``margin`` (expiry is naive UTC)."""
+    if not credentials.token or credentials.expiry is None:
+        return True
+    return credentials.expiry - margin <= datetime.utcnow()
+
+
+class GoogleTokenCache:
+    """Per-user Credentials cache with proactive, single-flight token refresh."""
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.refreshes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, Credentials]" = OrderedDict()
+        self._user_keys: Dict[int, str] = {}
+        self._callbacks: Dict[str, Callable[[Credentials], None]] = {}
+        self._lock = threading.Lock()
+        # In-flight refresh tasks, per event loop (tasks are loop-bound)
+        self._inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[int, asyncio.Task]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get_or_create(
+        self,
+        user_key: str,
+        refresh_token: str,
+        client_id: str,
+        client_secret: str,
+        scopes: Optional[Iterable[str]] = None,
+        token: Optional[str] = None,
+        expiry: Optional[datetime] = None,
+        token_uri: str = DEFAULT_TOKEN_URI,
+    ) -> Credentials:
+        """Return the shared Credentials for a user without refreshing them."""
+        scopes = sorted(set(scopes)) if scopes else None
+        key = (user_key or "", _fingerprint(refresh_token))
+        with self._lock:
+            credentials = self._entries.get(key)
+            if credentials is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                if scopes and not set(scopes) <= set(credentials.scopes or ()):
+                    credentials._scopes = sorted(set(scopes) | set(credentials.scopes or ()))
+                return credentials
+            self.misses += 1
+            credentials = Credentials(
+                token=token,
+                refresh_token=refresh_token,
+                token_uri=token_uri,
+                client_id=client_id,
+                client_secret=client_secret,
+                scopes=scopes,
+            )
+            credentials.expiry = expiry
+            self._entries[key] = credentials
+            self._user_keys[id(credentials)] = key[0]
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._user_keys.pop(id(evicted), None)
+            return credentials
+
+    def set_refresh_callback(self, user_key: str, callback: Callable[[Credentials], None]) -> None:
+        """Call ``callback(credentials)`` after every token refresh for ``user_key``."""
+        with self._lock:
+            self._callbacks[user_key] = callback
+
+    async def get_credentials(self, user_key: str, refresh_token: str, client_id: str, client_secret: str, **kwargs) -> Credentials:
+        """Return the shared Credentials for a user with a usable access token."""
+        credentials = self.get_or_create(user_key, refresh_token, client_id, client_secret, **kwargs)
+        await self.ensure_fresh(credentials, user_key)
+        return credentials
+
+    async def ensure_fresh(self, credentials, user_key: Optional[str] = None, force: bool = False) -> str:
+        """Return a valid access token for ``credentials``, refreshing if needed.
+
+        Args:
+            credentials: Credentials from this cache (or any google.oauth2 Credentials)
+            user_key: Only used for logging
+            force: Refresh even if the token looks valid (e.g. after a 401)
+        """
+        if force or _expires_within(credentials, TOKEN_EXPIRY_MARGIN):
+            await self._refresh_once(credentials, user_key)
+        elif _expires_within(credentials, TOKEN_REFRESH_MARGIN):
+            # Still usable - refresh in the background and serve the current token
+            self._refresh_task(credentials, user_key)
+        return credentials.token
+
+    def _refresh_task(self, credentials, user_key: Optional[str]) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.setdefault(loop, {})
+        task = inflight.get(id(credentials))
+        if task is None:
+            task = loop.create_task(self._refresh(credentials, user_key))
+            inflight[id(credentials)] = task
+            task.add_done_callback(lambda t: inflight.pop(id(credentials), None))
+            # Background refreshes are awaited by no one - don't warn about lost exceptions
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _refresh_once(self, credentials, user_key: Optional[str]) -> None:
+        await asyncio.shield(self._refresh_task(credentials, user_key))
+
+    async def _refresh(self, credentials, user_key: Optional[str]) -> None:
+        from utils.google_async_client import get_http_client
+
+        response = await get_http_client().post(
+            getattr(credentials, "token_uri", None) or DEFAULT_TOKEN_URI,
+            data={
+                "grant_type": "refresh_token",
+                "refresh_token": credentials.refresh_token,
+                "client_id": credentials.client_id,
+                "client_secret": credentials.client_secret,
+            },
+        )
+        if response.status_code != 200:
+            logger.warning(f"Google token refresh failed for {user_key}: {response.status_code}")
+            raise RefreshError(f"Token refresh failed ({response.status_code}): {response.text}")
+        data = response.json()
+        credentials.token = data["access_token"]
+        credentials.expiry = datetime.utcnow() + timedelta(seconds=int(data.get("expires_in", 3600)))
+        self.refreshes += 1
+        logger.debug(f"Refreshed Google access token for {user_key}")
+
+        with self._lock:
+            callback = self._callbacks.get(self._user_keys.get(id(credentials)))
+        if callback:
+            try:
+                callback(credentials)
+            except Exception as e:
+                logger.warning(f"Token refresh callback failed for {user_key}: {e}")
+
+    def invalidate(self, user_key: str) -> None:
+        """Drop every cached entry for ``user_key`` (e.g. after disconnecting Google)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_key]:
+                self._user_keys.pop(id(self._entries.pop(key)), None)
+            self._callbacks.pop(user_key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+            }
+
+
+_token_cache: Optional[GoogleTokenCache] = None
+_init_lock = threading.Lock()
+
+
+def get_token_cache() -> GoogleTokenCache:
+    """Process-wide token cache shared by Gmail and Calendar callers."""
+    global _token_cache
+    with _init_lock:
+        if _token_cache is None:
+            _token_cache = GoogleTokenCache()
+        return _token_cache
@@ -5,6 +5,7 @@ This module provides standardized functions for:
 - Creating LLM instances (Anthropic or OpenAI)
 - Formatting tool_choice parameters correctly per provider
 - Binding tools with proper provider-specific parameters
+- Laying out prompts for provider prompt caching
 """
 
 from typing import List, Optional, Union, Any
@@ -13,13 +14,16 @@ from langchain_anthropic import ChatAnthropic
 from langchain_core.language_models import BaseChatModel
 
 
-def get_llm(model_name: str, temperature: float = 0, **kwargs) -> BaseChatModel:
+def get_llm(model_name: str, temperature: float = 0, prompt_cache_key: Optional[str] = None, **kwargs) -> BaseChatModel:
     """
     Get the appropriate LLM instance based on model name.
 
     Args:
         model_name: Name of the model (e.g., 'claude-3-5-sonnet', 'gpt-4o')
         temperature: Model temperature (0-1)
+        prompt_cache_key: Optional OpenAI prompt cache routing key (e.g. per user and
+            agent), so calls sharing a prompt prefix hit the same cache.
+            Anthropic caching is set per prompt - see cached_prompt_content()
         **kwargs: Additional provider-specific parameters
 
     Returns:
@@ -41,6 +45,9 @@ def get_llm(model_name: str, temperature: float = 0, **kwargs) -> BaseChatModel:
     if model_name.startswith('claude') or model_name.startswith('opus'):
         return ChatAnthropic(model=model_name, temperature=temperature, **kwargs)
     else:  # OpenAI models (gpt-*, o3)
+        if prompt_cache_key:
+            # extra_body works with OpenAI SDKs that predate the parameter
+            kwargs["extra_body"] = {**kwargs.get("extra_body", {}), "prompt_cache_key": prompt_cache_key}
         # Don't pass temperature for reasoning models
         if is_reasoning_model:
             print(f" Model {model_name} is a reasoning model - excluding temperature parameter")
@@ -128,3 +135,34 @@ def is_anthropic_model(model_name: str) -> bool:
 def is_openai_model(model_name: str) -> bool:
     """Check if model name is for OpenAI provider."""
     return not is_anthropic_model(model_name)
+
+
+def cached_prompt_content(model_name: str, stable: List[str], volatile: str = "") -> Union[str, List[dict]]:
+    """
+    Build prompt content with the stable part first, so the provider can cache it.
+
+    Args:
+        model_name: Name of the model (needed to determine provider)
+        stable: Segments that rarely change, most stable first (instructions, then
+            e.g. per-user preferences). Use at most 3 - Anthropic allows 4 breakpoints
+        volatile: Content that changes per call (current time, the email, ...)
+
+    Returns:
+        - Anthropic: text blocks, each stable segment ending in a cache_control
+          breakpoint; the volatile text is a final uncached block
+        - OpenAI: one string (OpenAI caches repeated prefixes automatically)
+
+    Example:
+        >>> SystemMessage(content=cached_prompt_content(model_name, [INSTRUCTIONS], f"Now: {now}"))
+    """
+    stable = [segment for segment in stable if segment]
+    if not is_anthropic_model(model_name):
+        return "\n\n".join(stable + ([volatile] if volatile else []))
+
+    blocks = [
+        {"type": "text", "text": segment, "cache_control": {"type": "ephemeral"}}
+        for segment in stable
+    ]
+    if volatile:
+        blocks.append({"type": "text", "text": volatile})
+    return blocks
@@ -1,16 +1,43 @@
 """
 MCP OAuth Token Management Utilities
 Loads and decrypts OAuth tokens from Supabase for MCP servers
+
+Decrypted tokens are held in memory by MCPTokenManager until shortly before
+they expire. Tokens close to expiry are refreshed by a background worker
+(one refresh per token at a time) while callers keep getting the current,
+still-valid token - only a cold start or an expired token blocks a caller.
+Async callers use the ``aget_*`` variants, which await that load instead of
+blocking the event loop.
+
+Tokens also change outside this process (MCP OAuth reconnects in the config
+app, config API edits). Those bump user_secrets.config_version (migration 015);
+cached tokens remember the version they were loaded at, and a cached read
+compares it with the database at most every MCP_TOKEN_VERSION_CHECK_SECONDS
+per user, reloading tokens that predate a newer version.
 """
 
 import os
+import time
+import asyncio
 import hashlib
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Optional, Dict, Any, Tuple
+from datetime import datetime, timedelta, timezone
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from supabase import create_client, Client
 import httpx
 
+from utils.supabase_db import (
+    get_agent_config_sync,
+    get_supabase_client,  # noqa: F401 - re-exported for existing callers
+    get_user_config_version_sync,
+    get_user_runtime_bundle_sync,
+    get_user_secrets_sync,
+    update_agent_config_sync,
+    update_user_secrets_sync,
+)
+
 
 def get_encryption_key() -> bytes:
     """
@@ -28,13 +55,21 @@ def get_encryption_key() -> bytes:
     return bytes.fromhex(key_hex)
 
 
+@lru_cache(maxsize=4)
+def _aesgcm_for(key: bytes) -> AESGCM:
+    return AESGCM(key)
+
+
+def _get_aesgcm() -> AESGCM:
+    # Keyed by the key itself, so a rotated ENCRYPTION_KEY is picked up
+    return _aesgcm_for(get_encryption_key())
+
+
 def decrypt_token(encrypted_text: str) -> str:
     """
     Decrypt an encrypted token
     Format: iv:authTag:encrypted (all hex)
     """
-    key = get_encryption_key()
-
     parts = encrypted_text.split(':')
     if len(parts) != 3:
         raise ValueError('Invalid encrypted text format. Expected: iv:authTag:encrypted')
@@ -49,8 +84,7 @@ def decrypt_token(encrypted_text: str) -> str:
     ciphertext_with_tag = encrypted + auth_tag
 
     # Decrypt using AES-256-GCM
-    aesgcm = AESGCM(key)
-    decrypted = aesgcm.decrypt(iv, ciphertext_with_tag, None)
+    decrypted = _get_aesgcm().decrypt(iv, ciphertext_with_tag, None)
 
     return decrypted.decode('utf-8')
 
@@ -62,11 +96,9 @@ def encrypt_token(text: str) -> str:
     """
     import secrets
 
-    key = get_encryption_key()
     iv = secrets.token_bytes(16)  # 16 bytes for GCM
 
-    aesgcm = AESGCM(key)
-    ciphertext_with_tag = aesgcm.encrypt(iv, text.encode('utf-8'), None)
+    ciphertext_with_tag = _get_aesgcm().encrypt(iv, text.encode('utf-8'), None)
 
     # Split ciphertext and auth tag
     encrypted = ciphertext_with_tag[:-16]
@@ -75,41 +107,241 @@ def encrypt_token(text: str) -> str:
     return f"{iv.hex()}:{auth_tag.hex()}:{encrypted.hex()}"
 
 
-def get_supabase_client() -> Client:
-    """Get Supabase client"""
-    url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-    key = os.getenv("SUPABASE_SECRET_KEY")
+# ============================================================================
+# IN-MEMORY TOKEN MANAGER
+# ============================================================================
 
-    if not url or not key:
-        raise ValueError("NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SECRET_KEY required")
+# Refresh in the background once a token is this close to expiry...
+MCP_TOKEN_REFRESH_MARGIN = timedelta(seconds=int(os.getenv("MCP_TOKEN_REFRESH_MARGIN_SECONDS", "300")))
+# ...and stop serving it (callers wait for the refresh) this close to expiry
+MCP_TOKEN_EXPIRY_MARGIN = timedelta(seconds=30)
+# Tokens without expires_at are re-read from Supabase after this long
+MCP_TOKEN_MAX_AGE_SECONDS = float(os.getenv("MCP_TOKEN_MAX_AGE_SECONDS", "900"))
+# How often a cached user's config_version is compared with the database
+MCP_TOKEN_VERSION_CHECK_SECONDS = float(os.getenv("MCP_TOKEN_VERSION_CHECK_SECONDS", "5"))
 
-    return create_client(url, key)
+
+def _parse_expires_at(value: Optional[str]) -> Optional[datetime]:
+    """expires_at string -> aware UTC datetime (naive values are local time)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone(timezone.utc)
+    except ValueError:
+        return None
 
 
+def _expires_within(expires_at: Optional[datetime], margin: timedelta) -> bool:
+    return expires_at is not None and datetime.now(timezone.utc) >= expires_at - margin
+
+
+def _read_config_version(user_id: str) -> Optional[int]:
+    """user_secrets.config_version, or None when unknown (no migration 015, Supabase down)."""
+    try:
+        return get_user_config_version_sync(user_id)
+    except Exception as e:
+        print(f"[MCP Auth] Config version check failed for {user_id}: {e}")
+        return None
+
+
+class MCPTokenManager:
+    """Holds decrypted MCP OAuth tokens and refreshes them before they expire."""
+
+    def __init__(self, max_workers: int = 4):
+        self.hits = 0
+        self.loads = 0
+        # key -> (loaded_at monotonic, expires_at, token dict, config_version at load)
+        self._entries: Dict[tuple, Tuple[float, Optional[datetime], Dict[str, Any], Optional[int]]] = {}
+        # user_id -> newest config_version seen, and when it was last checked
+        self._versions: Dict[str, int] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._inflight: Dict[tuple, Future] = {}
+        # user_id -> count of invalidate() calls; loads started before one don't write their result
+        self._epochs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-token-refresh")
+
+    def get(self, key: tuple, loader: Callable[[timedelta], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Return the tokens for ``key``, loading them with ``loader`` when needed.
+
+        ``loader(refresh_margin)`` must return the decrypted token dict (or None),
+        refreshing the OAuth token itself if it expires within ``refresh_margin``.
+        """
+        if self._version_check_due(key[1]):
+            self._note_version(key[1], _read_config_version(key[1]))
+        tokens = self._get_cached(key, loader)
+        if tokens is not None:
+            return tokens
+
+        # Cold or expired - wait for the (shared) load
+        tokens = self._submit(key, loader).result()
+        return dict(tokens) if tokens else None
+
+    async def aget(self, key: tuple, loader: Callable[[timedelta], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Like get(), but awaits a cold load instead of blocking the event loop."""
+        if self._version_check_due(key[1]):
+            self._note_version(key[1], await asyncio.to_thread(_read_config_version, key[1]))
+        tokens = self._get_cached(key, loader)
+        if tokens is not None:
+            return tokens
+
+        tokens = await asyncio.wrap_future(self._submit(key, loader))
+        return dict(tokens) if tokens else None
+
+    def _get_cached(self, key: tuple, loader: Callable) -> Optional[Dict[str, Any]]:
+        """Cached tokens still safe to use (starting a background refresh if due), else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            known = self._versions.get(key[1])
+        if entry is not None:
+            loaded_at, expires_at, tokens, version = entry
+            if known is not None and (version is None or version < known):
+                # Changed in the database since it was loaded (e.g. reconnected)
+                return None
+            if not _expires_within(expires_at, MCP_TOKEN_EXPIRY_MARGIN):
+                stale = (
+                    _expires_within(expires_at, MCP_TOKEN_REFRESH_MARGIN)
+                    or (expires_at is None and time.monotonic() - loaded_at > MCP_TOKEN_MAX_AGE_SECONDS)
+                )
+                if stale:
+                    self._submit(key, loader)
+                with self._lock:
+                    self.hits += 1
+                return dict(tokens)
+        return None
+
+    def _version_check_due(self, user_id: str) -> bool:
+        """True when the user has cached tokens whose version was not checked recently."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at.get(user_id, float("-inf")) <= MCP_TOKEN_VERSION_CHECK_SECONDS:
+                return False
+            if not any(k[1] == user_id for k in self._entries):
+                return False
+            # Claim the check, so concurrent callers don't all query
+            self._checked_at[user_id] = now
+            return True
+
+    def _note_version(self, user_id: str, version: Optional[int]) -> None:
+        if version is None:
+            return
+        with self._lock:
+            self._versions[user_id] = max(version, self._versions.get(user_id, version))
+            self._checked_at[user_id] = time.monotonic()
+
+    def _submit(self, key: tuple, loader: Callable) -> Future:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._load, key, loader, self._epochs.get(key[1], 0))
+                self._inflight[key] = future
+                future.add_done_callback(lambda f: self._forget_inflight(key, f))
+            return future
+
+    def _forget_inflight(self, key: tuple, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _load(self, key: tuple, loader: Callable, epoch: int) -> Optional[Dict[str, Any]]:
+        # Read before the tokens, so a change landing in between is caught by the next check
+        version = _read_config_version(key[1])
+        self._note_version(key[1], version)
+        tokens = loader(MCP_TOKEN_REFRESH_MARGIN)
+        with self._lock:
+            self.loads += 1
+            if epoch != self._epochs.get(key[1], 0):
+                # Invalidated while loading - the result may predate the change
+                return tokens
+            if tokens:
+                expires_at = _parse_expires_at(tokens.get("expires_at"))
+                self._entries[key] = (time.monotonic(), expires_at, tokens, version)
+            else:
+                # Disconnected, revoked or failed to refresh - stop serving the old token
+                self._entries.pop(key, None)
+        return tokens
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget every cached token of a user in this process (other processes
+        notice changes through config_version)."""
+        with self._lock:
+            self._epochs[user_id] = self._epochs.get(user_id, 0) + 1
+            for key in [k for k in self._entries if k[1] == user_id]:
+                del self._entries[key]
+            for key in [k for k in self._inflight if k[1] == user_id]:
+                del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "loads": self.loads}
+
+
+_token_manager: Optional[MCPTokenManager] = None
+_token_manager_lock = threading.Lock()
+
+
+def get_mcp_token_manager() -> MCPTokenManager:
+    """Process-wide MCP token manager."""
+    global _token_manager
+    with _token_manager_lock:
+        if _token_manager is None:
+            _token_manager = MCPTokenManager()
+        return _token_manager
+
+
+def invalidate_mcp_tokens(user_id: str) -> None:
+    """Forget a user's cached MCP tokens (call after the MCP config or OAuth connection changed)."""
+    get_mcp_token_manager().invalidate(user_id)
+
+
+# ============================================================================
+# TOKEN LOADING
+# ============================================================================
+
 def get_mcp_oauth_tokens(user_id: str, agent_id: str) -> Optional[Dict[str, Any]]:
     """
     Load OAuth tokens for MCP from agent_configs (per-agent tokens)
-    Returns decrypted access token ready for use
+    Returns decrypted access token ready for use (served from memory when cached)
 
     NOTE: This function loads AGENT-SPECIFIC tokens from agent_configs
     For GLOBAL tokens, use get_mcp_oauth_tokens_global()
     """
-    try:
-        supabase = get_supabase_client()
+    return get_mcp_token_manager().get(
+        ("agent", user_id, agent_id),
+        lambda refresh_margin: _load_mcp_oauth_tokens(user_id, agent_id, refresh_margin),
+    )
+
 
+async def aget_mcp_oauth_tokens(user_id: str, agent_id: str) -> Optional[Dict[str, Any]]:
+    """Async variant of get_mcp_oauth_tokens (does not block the event loop on a cold load)."""
+    return await get_mcp_token_manager().aget(
+        ("agent", user_id, agent_id),
+        lambda refresh_margin: _load_mcp_oauth_tokens(user_id, agent_id, refresh_margin),
+    )
+
+
+def _load_mcp_oauth_tokens(user_id: str, agent_id: str, refresh_margin: timedelta = timedelta(0)) -> Optional[Dict[str, Any]]:
+    try:
         # Get agent config from Supabase
-        result = supabase.table("agent_configs") \
-            .select("config_data") \
-            .eq("clerk_id", user_id) \
-            .eq("agent_id", agent_id) \
-            .maybe_single() \
-            .execute()
-
-        if not result.data:
+        row = get_agent_config_sync(user_id, agent_id, "config_data")
+        return _agent_tokens_from_row(user_id, agent_id, row, refresh_margin)
+
+    except Exception as e:
+        print(f"[MCP Auth] Error loading tokens: {e}")
+        return None
+
+
+def _agent_tokens_from_row(
+    user_id: str, agent_id: str, row: Optional[Dict[str, Any]], refresh_margin: timedelta = timedelta(0)
+) -> Optional[Dict[str, Any]]:
+    """Decrypted per-agent MCP tokens from an already loaded agent_configs row."""
+    try:
+        if not row:
             print(f"[MCP Auth] No agent config found for {agent_id}")
             return None
 
-        config_data = result.data.get("config_data", {})
+        config_data = row.get("config_data", {})
         mcp_integration = config_data.get("mcp_integration", {})
         oauth_tokens = mcp_integration.get("oauth_tokens")
 
@@ -117,13 +349,11 @@ def get_mcp_oauth_tokens(user_id: str, agent_id: str) -> Optional[Dict[str, Any]
             print(f"[MCP Auth] No OAuth tokens found for {agent_id}")
             return None
 
-        # Check if token is expired
+        # Check if token is expired (or about to)
         expires_at_str = oauth_tokens.get("expires_at")
-        if expires_at_str:
-            expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-            if datetime.now(expires_at.tzinfo) >= expires_at:
-                print(f"[MCP Auth] Token expired, refreshing...")
-                return refresh_oauth_token(user_id, agent_id, mcp_integration)
+        if _expires_within(_parse_expires_at(expires_at_str), refresh_margin):
+            print(f"[MCP Auth] Token expired, refreshing...")
+            return refresh_oauth_token(user_id, agent_id, mcp_integration)
 
         # Decrypt access token
         encrypted_access_token = oauth_tokens.get("access_token")
@@ -136,7 +366,8 @@ def get_mcp_oauth_tokens(user_id: str, agent_id: str) -> Optional[Dict[str, Any]
         return {
             "access_token": access_token,
             "token_type": oauth_tokens.get("token_type", "Bearer"),
-            "mcp_url": mcp_integration.get("mcp_server_url")
+            "mcp_url": mcp_integration.get("mcp_server_url"),
+            "expires_at": expires_at_str
         }
 
     except Exception as e:
@@ -152,21 +383,33 @@ def get_mcp_oauth_tokens_global(user_id: str) -> Optional[Dict[str, Any]]:
     This loads GLOBAL MCP tokens that are shared across all agents.
     Use this for agents that don't have agent-specific MCP tokens.
     """
-    try:
-        supabase = get_supabase_client()
+    return get_mcp_token_manager().get(
+        ("global", user_id, None),
+        lambda refresh_margin: _load_mcp_oauth_tokens_global(user_id, refresh_margin),
+    )
+
 
+def _load_mcp_oauth_tokens_global(user_id: str, refresh_margin: timedelta = timedelta(0)) -> Optional[Dict[str, Any]]:
+    try:
         # Get user_secrets from Supabase
-        result = supabase.table("user_secrets") \
-            .select("mcp_universal") \
-            .eq("clerk_id", user_id) \
-            .maybe_single() \
-            .execute()
+        secrets = get_user_secrets_sync(user_id, "mcp_universal")
+        return _global_tokens_from_secrets(user_id, secrets, refresh_margin)
+
+    except Exception as e:
+        print(f"[MCP Auth Global] Error loading tokens from user_secrets: {e}")
+        return None
+
 
-        if not result.data:
+def _global_tokens_from_secrets(
+    user_id: str, secrets: Optional[Dict[str, Any]], refresh_margin: timedelta = timedelta(0)
+) -> Optional[Dict[str, Any]]:
+    """Decrypted global MCP tokens from an already loaded user_secrets row."""
+    try:
+        if not secrets:
             print(f"[MCP Auth Global] No user_secrets found for user {user_id}")
             return None
 
-        mcp_universal = result.data.get("mcp_universal")
+        mcp_universal = secrets.get("mcp_universal")
         if not mcp_universal:
             print(f"[MCP Auth Global] No mcp_universal found in user_secrets")
             return None
@@ -176,13 +419,11 @@ def get_mcp_oauth_tokens_global(user_id: str) -> Optional[Dict[str, Any]]:
             print(f"[MCP Auth Global] No oauth_tokens in mcp_universal")
             return None
 
-        # Check if token is expired
+        # Check if token is expired (or about to)
         expires_at_str = oauth_tokens.get("expires_at")
-        if expires_at_str:
-            expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-            if datetime.now(expires_at.tzinfo) >= expires_at:
-                print(f"[MCP Auth Global] Token expired, refreshing...")
-                return refresh_mcp_universal_token(user_id, mcp_universal)
+        if _expires_within(_parse_expires_at(expires_at_str), refresh_margin):
+            print(f"[MCP Auth Global] Token expired, refreshing...")
+            return refresh_mcp_universal_token(user_id, mcp_universal)
 
         # Decrypt access token
         encrypted_access_token = oauth_tokens.get("access_token")
@@ -196,7 +437,8 @@ def get_mcp_oauth_tokens_global(user_id: str) -> Optional[Dict[str, Any]]:
             "access_token": access_token,
             "token_type": oauth_tokens.get("token_type", "Bearer"),
             "mcp_url": mcp_universal.get("mcp_server_url"),
-            "provider": mcp_universal.get("provider", "generic")
+            "provider": mcp_universal.get("provider", "generic"),
+            "expires_at": expires_at_str
         }
 
     except Exception as e:
@@ -220,15 +462,33 @@ def get_mcp_oauth_tokens_dual(user_id: str, agent_id: str = None) -> Optional[Di
     Returns:
         OAuth token dict or None
     """
+    return get_mcp_token_manager().get(
+        ("dual", user_id, agent_id),
+        lambda refresh_margin: _load_mcp_oauth_tokens_dual(user_id, agent_id, refresh_margin),
+    )
+
+
+def _load_mcp_oauth_tokens_dual(
+    user_id: str, agent_id: Optional[str], refresh_margin: timedelta = timedelta(0)
+) -> Optional[Dict[str, Any]]:
+    # Both sources come from one round trip (get_user_runtime_bundle RPC)
+    try:
+        bundle = get_user_runtime_bundle_sync(user_id)
+    except Exception as e:
+        print(f"[MCP Auth Dual] Error loading runtime bundle: {e}")
+        return None
+
     # Try global tokens first
-    global_tokens = get_mcp_oauth_tokens_global(user_id)
+    global_tokens = _global_tokens_from_secrets(user_id, bundle["user_secrets"], refresh_margin)
     if global_tokens:
         print(f"[MCP Auth Dual] Using global MCP tokens for user {user_id}")
         return global_tokens
 
     # Fallback to per-agent tokens if agent_id provided
     if agent_id:
-        agent_tokens = get_mcp_oauth_tokens(user_id, agent_id)
+        agent_tokens = _agent_tokens_from_row(
+            user_id, agent_id, bundle["agent_configs"].get(agent_id), refresh_margin
+        )
         if agent_tokens:
             print(f"[MCP Auth Dual] Using agent-specific MCP tokens for {agent_id}")
             return agent_tokens
@@ -288,18 +548,14 @@ def refresh_mcp_universal_token(user_id: str, mcp_universal: dict) -> Optional[D
         encrypted_access = encrypt_token(new_tokens["access_token"])
         encrypted_refresh = encrypt_token(new_tokens.get("refresh_token", refresh_token))
 
-        expires_at = datetime.now() + timedelta(seconds=new_tokens.get("expires_in", 3600))
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=new_tokens.get("expires_in", 3600))
 
         # Update user_secrets in Supabase
-        supabase = get_supabase_client()
-
         mcp_universal["oauth_tokens"]["access_token"] = encrypted_access
         mcp_universal["oauth_tokens"]["refresh_token"] = encrypted_refresh
         mcp_universal["oauth_tokens"]["expires_at"] = expires_at.isoformat()
 
-        supabase.table("user_secrets").update({
-            "mcp_universal": mcp_universal
-        }).eq("clerk_id", user_id).execute()
+        update_user_secrets_sync(user_id, {"mcp_universal": mcp_universal})
 
         print(f"[MCP Auth Global] Token refreshed successfully for user {user_id}")
 
@@ -307,7 +563,8 @@ def refresh_mcp_universal_token(user_id: str, mcp_universal: dict) -> Optional[D
             "access_token": new_tokens["access_token"],
             "token_type": new_tokens.get("token_type", "Bearer"),
             "mcp_url": mcp_url,
-            "provider": mcp_universal.get("provider", "generic")
+            "provider": mcp_universal.get("provider", "generic"),
+            "expires_at": expires_at.isoformat()
         }
 
     except Exception as e:
@@ -366,25 +623,24 @@ def refresh_oauth_token(user_id: str, agent_id: str, mcp_integration: dict) -> O
         encrypted_access = encrypt_token(new_tokens["access_token"])
         encrypted_refresh = encrypt_token(new_tokens.get("refresh_token", refresh_token))
 
-        expires_at = datetime.now() + timedelta(seconds=new_tokens.get("expires_in", 3600))
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=new_tokens.get("expires_in", 3600))
 
         # Update agent_configs in Supabase
-        supabase = get_supabase_client()
-
         mcp_integration["oauth_tokens"]["access_token"] = encrypted_access
         mcp_integration["oauth_tokens"]["refresh_token"] = encrypted_refresh
         mcp_integration["oauth_tokens"]["expires_at"] = expires_at.isoformat()
 
-        supabase.table("agent_configs").update({
+        update_agent_config_sync(user_id, agent_id, {
             "config_data": {"mcp_integration": mcp_integration}
-        }).eq("clerk_id", user_id).eq("agent_id", agent_id).execute()
+        })
 
         print(f"[MCP Auth] Token refreshed successfully for {agent_id}")
 
         return {
             "access_token": new_tokens["access_token"],
             "token_type": new_tokens.get("token_type", "Bearer"),
-            "mcp_url": mcp_url
+            "mcp_url": mcp_url,
+            "expires_at": expires_at.isoformat()
         }
 
     except Exception as e:
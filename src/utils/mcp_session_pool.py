@@ -0,0 +1,260 @@
+"""
+MCP Session Pool - Long-Lived MCP Sessions Shared Across Turns
+Keeps one open MCP client session (and its tool list) per user and server.
+
+Without this, every supervisor turn opened a new streamable-HTTP session,
+listed the server's tools and threw both away, from a throwaway event loop.
+
+- Sessions are keyed by (user, MCP URL, token fingerprint); a refreshed
+  OAuth token gets a new session and the old one idles out
+- Each session is owned by a background task (MCP transports use anyio
+  task groups, which must be entered and exited in the same task)
+- Tools call through a proxy, so a session that fails is reconnected on
+  the next call instead of breaking the cached tools
+- Sessions idle for MCP_SESSION_IDLE_SECONDS are closed; at most
+  MCP_SESSION_POOL_SIZE are kept open per event loop
+- Tool schemas come from the process-wide MCP tool catalog, so a new
+  session only connects when a tool is first called
+
+Usage:
+    tools = await get_mcp_session_pool().get_tools(
+        user_id, {"url": url, "transport": "streamable_http", "headers": headers}
+    )
+"""
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from utils.mcp_tool_catalog import build_tools, get_mcp_tool_catalog, list_all_tools
+
+logger = logging.getLogger(__name__)
+
+MCP_SESSION_IDLE_SECONDS = float(os.getenv("MCP_SESSION_IDLE_SECONDS", "600"))
+MCP_SESSION_POOL_SIZE = int(os.getenv("MCP_SESSION_POOL_SIZE", "64"))
+MCP_CONNECT_TIMEOUT_SECONDS = 30.0
+
+_SERVER_NAME = "pooled"
+
+# (user_id, tool name, arguments, call_next) -> tool result
+CallInterceptor = Callable[[str, str, Any, Callable[[], Awaitable[Any]]], Awaitable[Any]]
+
+
+class _PooledSession:
+    """One MCP server connection kept open by its own owner task."""
+
+    def __init__(self, key: tuple, connection: Dict[str, Any]):
+        self.key = key
+        self.connection = connection
+        self.session = None
+        self.tools: Optional[List[BaseTool]] = None
+        self.schema_hash: Optional[str] = None
+        self.call_interceptor: Optional[CallInterceptor] = None
+        self.last_used = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._connecting: Optional[asyncio.Future] = None
+
+    @property
+    def connected(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def ensure_connected(self):
+        """Return a live session, (re)connecting if needed (one connect at a time)."""
+        if self.connected:
+            return self.session
+        if self._connecting is None or self._connecting.done():
+            loop = asyncio.get_running_loop()
+            self._connecting = loop.create_future()
+            self._stop = asyncio.Event()
+            self._task = loop.create_task(self._run(self._connecting, self._stop))
+        await asyncio.wait_for(asyncio.shield(self._connecting), MCP_CONNECT_TIMEOUT_SECONDS)
+        return self.session
+
+    async def _run(self, connected: asyncio.Future, stop: asyncio.Event) -> None:
+        # stop and opened belong to this task; a reconnect starts a new task with its own
+        client = MultiServerMCPClient({_SERVER_NAME: self.connection})
+        opened = None
+        try:
+            async with client.session(_SERVER_NAME) as session:
+                opened = session
+                self.session = session
+                connected.set_result(session)
+                logger.info(f"[MCP_POOL] Opened session for {self.key[0]} ({self.connection.get('url')})")
+                await stop.wait()
+        except Exception as e:
+            if not connected.done():
+                connected.set_exception(e)
+            else:
+                logger.warning(f"[MCP_POOL] Session for {self.key[0]} failed: {type(e).__name__}: {e}")
+        finally:
+            # A newer task may already have opened the current session
+            if opened is not None and self.session is opened:
+                self.session = None
+            if not connected.done():
+                connected.set_exception(ConnectionError("MCP session closed"))
+
+    def mark_broken(self, session=None) -> None:
+        """Drop the session so the next call reconnects.
+
+        With ``session``, only if it is still the current one (a call that
+        failed on an old session must not close its replacement).
+        """
+        if session is not None and session is not self.session:
+            return
+        self.session = None
+        if self._stop is not None:
+            self._stop.set()
+
+    async def close(self) -> None:
+        self.mark_broken()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, 5.0)
+            except Exception:
+                self._task.cancel()
+
+
+class _SessionProxy:
+    """Stands in for a ClientSession for catalog-built tools, routing to the live pooled session."""
+
+    def __init__(self, pooled: _PooledSession):
+        self._pooled = pooled
+
+    async def list_tools(self, *args, **kwargs):
+        session = await self._pooled.ensure_connected()
+        return await session.list_tools(*args, **kwargs)
+
+    async def call_tool(self, name: str, arguments: Any = None, *args, **kwargs):
+        self._pooled.last_used = time.monotonic()
+        interceptor = self._pooled.call_interceptor
+        if interceptor is not None:
+            return await interceptor(
+                self._pooled.key[0], name, arguments, lambda: self._call_tool(name, arguments, *args, **kwargs)
+            )
+        return await self._call_tool(name, arguments, *args, **kwargs)
+
+    async def _call_tool(self, *args, **kwargs):
+        session = await self._pooled.ensure_connected()
+        try:
+            return await session.call_tool(*args, **kwargs)
+        except Exception:
+            # The call may have reached the server - don't retry it (tools can
+            # have side effects), but make the next call use a fresh session
+            self._pooled.mark_broken(session)
+            raise
+
+    def __getattr__(self, name: str):
+        session = self._pooled.session
+        if session is None:
+            raise AttributeError(name)
+        return getattr(session, name)
+
+
+def _token_fingerprint(connection: Dict[str, Any]) -> str:
+    auth = (connection.get("headers") or {}).get("Authorization", "")
+    return hashlib.sha256(auth.encode("utf-8")).hexdigest()[:16]
+
+
+class MCPSessionPool:
+    """Per-event-loop pool of long-lived MCP sessions and their tools."""
+
+    def __init__(self, idle_seconds: float = MCP_SESSION_IDLE_SECONDS, max_sessions: int = MCP_SESSION_POOL_SIZE):
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self.hits = 0
+        self.misses = 0
+        self._closing: set = set()
+        # MCP sessions are bound to the loop that opened them
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, _PooledSession]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _pool(self) -> Dict[tuple, _PooledSession]:
+        return self._pools.setdefault(asyncio.get_running_loop(), {})
+
+    def _evict(self, pool: Dict[tuple, _PooledSession]) -> None:
+        now = time.monotonic()
+        idle = [key for key, pooled in pool.items() if now - pooled.last_used > self.idle_seconds]
+        by_age = sorted(pool, key=lambda key: pool[key].last_used)
+        overflow = by_age[: max(0, len(pool) - self.max_sessions)]
+        for key in set(idle) | set(overflow):
+            pooled = pool.pop(key)
+            logger.info(f"[MCP_POOL] Closing idle session for {key[0]}")
+            task = asyncio.get_running_loop().create_task(pooled.close())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def get_tools(
+        self,
+        user_id: str,
+        connection: Dict[str, Any],
+        tool_filter: Optional[Callable[[BaseTool], bool]] = None,
+        call_interceptor: Optional[CallInterceptor] = None,
+    ) -> List[BaseTool]:
+        """
+        Tools of an MCP server, bound to a pooled session.
+
+        Args:
+            user_id: Owner of the session (part of the pool key)
+            connection: langchain-mcp-adapters connection dict (url, transport, headers)
+            tool_filter: Optional predicate selecting which tools to return
+            call_interceptor: Optional coroutine wrapping every tool call, e.g. to
+                answer some calls locally (see multi_tool_rube_agent/search_cache)
+        """
+        pool = self._pool()
+        key = (user_id or "", connection.get("url"), _token_fingerprint(connection))
+        pooled = pool.get(key)
+        if pooled is None:
+            self.misses += 1
+            pooled = _PooledSession(key, connection)
+            pool[key] = pooled
+        else:
+            self.hits += 1
+        pooled.last_used = time.monotonic()
+        pooled.call_interceptor = call_interceptor
+
+        proxy = _SessionProxy(pooled)
+        try:
+            digest, schemas = await get_mcp_tool_catalog().get(key[1], lambda: list_all_tools(proxy))
+        except Exception:
+            pool.pop(key, None)
+            await pooled.close()
+            raise
+        # Rebuild the LangChain tools only when the server's schemas changed
+        if pooled.tools is None or pooled.schema_hash != digest:
+            pooled.tools = build_tools(schemas, session=proxy)
+            pooled.schema_hash = digest
+        tools = pooled.tools
+        self._evict(pool)
+        return [tool for tool in tools if tool_filter(tool)] if tool_filter else list(tools)
+
+    async def close_all(self) -> None:
+        pool = self._pool()
+        while pool:
+            _, pooled = pool.popitem()
+            await pooled.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": sum(len(pool) for pool in self._pools.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_session_pool: Optional[MCPSessionPool] = None
+
+
+def get_mcp_session_pool() -> MCPSessionPool:
+    """Process-wide MCP session pool."""
+    global _session_pool
+    if _session_pool is None:
+        _session_pool = MCPSessionPool()
+    return _session_pool
@@ -0,0 +1,237 @@
+"""
+MCP Tool Catalog - Process-Wide Tool Schemas, Persisted to Disk
+Keeps the tool list (name, description, input schema) of each MCP server.
+
+Without this, every tool binding waited on a list_tools round trip: the
+per-connection 5-minute cache never hit because connections are created per
+request (and its age check used timedelta.seconds, which ignores days).
+
+- Entries are keyed by MCP server URL and carry a hash of the schemas;
+  LangChain tools are rebuilt only when the hash changes
+- The catalog is written to MCP_TOOL_CATALOG_PATH, so a cold process binds
+  tools from disk without contacting the server
+- Entries older than MCP_TOOL_CATALOG_REFRESH_SECONDS are served as-is and
+  refreshed in the background (one refresh per server at a time)
+- Only schemas are stored - never headers or tokens
+
+Usage:
+    schema_hash, schemas = await get_mcp_tool_catalog().get(url, lambda: list_all_tools(session))
+    tools = build_tools(schemas, session=session)
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp.types import Tool as MCPTool
+
+logger = logging.getLogger(__name__)
+
+MCP_TOOL_CATALOG_PATH = os.getenv(
+    "MCP_TOOL_CATALOG_PATH",
+    os.path.join(tempfile.gettempdir(), "agent_inbox_mcp_tool_catalog.json"),
+)
+MCP_TOOL_CATALOG_REFRESH_SECONDS = float(os.getenv("MCP_TOOL_CATALOG_REFRESH_SECONDS", "900"))
+
+# Same cap as langchain_mcp_adapters' own pagination loop
+_MAX_PAGES = 1000
+
+
+async def list_all_tools(session) -> List[MCPTool]:
+    """All tools of an MCP session, following pagination cursors."""
+    tools: List[MCPTool] = []
+    cursor = None
+    for _ in range(_MAX_PAGES):
+        result = await session.list_tools(cursor=cursor)
+        tools.extend(result.tools or [])
+        if not result.nextCursor:
+            return tools
+        cursor = result.nextCursor
+    raise RuntimeError("Reached max of 1000 pages while listing MCP tools")
+
+
+def build_tools(
+    schemas: List[MCPTool],
+    session=None,
+    connection: Optional[Dict[str, Any]] = None,
+) -> List[BaseTool]:
+    """
+    LangChain tools for catalog schemas.
+
+    Args:
+        schemas: MCP tool schemas from the catalog
+        session: Session (or pooled session proxy) the tools call through
+        connection: Connection dict; used instead of a session to open a
+            session per call (what MultiServerMCPClient.get_tools does)
+    """
+    return [convert_mcp_tool_to_langchain_tool(session, schema, connection=connection) for schema in schemas]
+
+
+def schema_hash(schemas: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(schemas, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class MCPToolCatalog:
+    """URL -> tool schemas, shared by every connection in the process."""
+
+    def __init__(self, path: str = MCP_TOOL_CATALOG_PATH, refresh_seconds: float = MCP_TOOL_CATALOG_REFRESH_SECONDS):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        # url -> {"schema_hash", "fetched_at" (epoch seconds), "tools" (list of dicts)}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._parsed: Dict[str, Tuple[str, List[MCPTool]]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._fetching: Dict[str, asyncio.Task] = {}
+
+    # --- persistence -------------------------------------------------------
+
+    def _read_disk(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except FileNotFoundError:
+                return
+            except Exception as e:
+                logger.warning(f"[MCP_CATALOG] Ignoring unreadable catalog {self.path}: {e}")
+                return
+            for url, entry in entries.items():
+                self._entries.setdefault(url, entry)
+        logger.info(f"[MCP_CATALOG] Loaded {len(entries)} server(s) from {self.path}")
+
+    def _write_disk(self) -> None:
+        with self._lock:
+            payload = json.dumps(self._entries, sort_keys=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # The in-memory catalog still works; only the next cold start pays
+            logger.warning(f"[MCP_CATALOG] Could not persist catalog to {self.path}: {e}")
+
+    # --- lookups -----------------------------------------------------------
+
+    def _cached(self, url: str) -> Optional[Tuple[float, str, List[MCPTool]]]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            parsed = self._parsed.get(url)
+            if parsed is None or parsed[0] != entry["schema_hash"]:
+                parsed = (entry["schema_hash"], [MCPTool.model_validate(t) for t in entry["tools"]])
+                self._parsed[url] = parsed
+            return entry["fetched_at"], parsed[0], parsed[1]
+
+    async def get(
+        self,
+        url: str,
+        fetch: Callable[[], Awaitable[List[MCPTool]]],
+    ) -> Tuple[str, List[MCPTool]]:
+        """
+        Return (schema hash, tool schemas) for an MCP server.
+
+        Args:
+            url: MCP server URL (catalog key)
+            fetch: Coroutine function listing the server's tools; awaited on a
+                miss, run in the background once the entry is due a refresh
+        """
+        if not self._loaded:
+            await asyncio.to_thread(self._read_disk)
+
+        cached = self._cached(url)
+        if cached is not None:
+            fetched_at, digest, schemas = cached
+            self.hits += 1
+            if time.time() - fetched_at > self.refresh_seconds:
+                self._start_fetch(url, fetch)
+            return digest, schemas
+
+        self.misses += 1
+        return await asyncio.shield(self._start_fetch(url, fetch))
+
+    def _start_fetch(self, url: str, fetch: Callable[[], Awaitable[List[MCPTool]]]) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._fetching.get(url)
+            if task is None or task.done() or task.get_loop() is not loop:
+                task = loop.create_task(self._fetch(url, fetch))
+                self._fetching[url] = task
+        return task
+
+    async def _fetch(self, url: str, fetch: Callable[[], Awaitable[List[MCPTool]]]) -> Tuple[str, List[MCPTool]]:
+        start = time.perf_counter()
+        try:
+            schemas = await fetch()
+        except Exception as e:
+            cached = self._cached(url)
+            if cached is None:
+                raise
+            logger.warning(f"[MCP_CATALOG] Refresh of {url} failed, keeping cached schemas: {type(e).__name__}: {e}")
+            return cached[1], cached[2]
+        finally:
+            with self._lock:
+                self._fetching.pop(url, None)
+
+        tools = [schema.model_dump(mode="json", exclude_none=True) for schema in schemas]
+        digest = schema_hash(tools)
+        with self._lock:
+            previous = self._entries.get(url, {}).get("schema_hash")
+            self._entries[url] = {"schema_hash": digest, "fetched_at": time.time(), "tools": tools}
+            self._parsed[url] = (digest, list(schemas))
+            self.refreshes += 1
+        await asyncio.to_thread(self._write_disk)
+
+        changed = "unchanged" if previous == digest else f"schema {digest}"
+        logger.info(
+            f"[MCP_CATALOG] Listed {len(tools)} tools from {url} in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms ({changed})"
+        )
+        return digest, list(schemas)
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """Forget one server's schemas (or all); the next get() lists tools again."""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+                self._parsed.clear()
+            else:
+                self._entries.pop(url, None)
+                self._parsed.pop(url, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "servers": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+        }
+
+
+_catalog: Optional[MCPToolCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_mcp_tool_catalog() -> MCPToolCatalog:
+    """Process-wide MCP tool catalog."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = MCPToolCatalog()
+        return _catalog
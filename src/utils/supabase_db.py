@@ -0,0 +1,446 @@
+"""
+Shared Supabase Data Access - Pooled Async + Sync Clients
+One place for every agent-side Supabase query.
+
+Before this module each caller ran create_client() per call (a fresh TLS
+handshake every time) and issued blocking queries from async code. Now:
+
+- One async client per event loop and one process-wide sync client, each
+  keeping its HTTP connections alive
+- A request timeout (SUPABASE_TIMEOUT_SECONDS) and retries with backoff on
+  transient network / 5xx errors (SUPABASE_MAX_RETRIES)
+- Typed helpers for the user_secrets, agent_configs and user_crons tables
+- get_user_runtime_bundle(): secrets + every agent config in one round trip
+- get_user_config_version(): the counter config writes bump (migration 015),
+  so caches in other processes can tell their copy is outdated
+
+Async code should use the async helpers (get_user_secrets, get_agent_config,
+...); the *_sync variants exist for the remaining synchronous call sites.
+
+Usage:
+    secrets = await get_user_secrets(user_id, "anthropic_api_key, timezone")
+    row = await get_agent_config(user_id, "executive_ai_assistant")
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, TypedDict
+
+import httpx
+from supabase import AsyncClient, Client, acreate_client, create_client
+from supabase.lib.client_options import AsyncClientOptions, ClientOptions
+
+logger = logging.getLogger(__name__)
+
+SUPABASE_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "10"))
+SUPABASE_MAX_RETRIES = int(os.getenv("SUPABASE_MAX_RETRIES", "3"))
+_RETRYABLE_CODES = {"500", "502", "503", "504"}
+
+
+class SupabaseNotConfiguredError(ValueError):
+    """NEXT_PUBLIC_SUPABASE_URL / SUPABASE_SECRET_KEY are not set (e.g. local dev)."""
+
+
+# ============================================================================
+# ROW TYPES
+# ============================================================================
+
+class UserSecretsRow(TypedDict, total=False):
+    clerk_id: str
+    email: Optional[str]
+    anthropic_api_key: Optional[str]
+    openai_api_key: Optional[str]
+    langsmith_api_key: Optional[str]
+    timezone: Optional[str]
+    google_client_id: Optional[str]
+    google_client_secret: Optional[str]
+    google_refresh_token: Optional[str]
+    google_access_token: Optional[str]
+    google_token_expires_at: Optional[str]
+    mcp_universal: Optional[Dict[str, Any]]
+    config_version: int
+
+
+class AgentConfigRow(TypedDict, total=False):
+    clerk_id: str
+    agent_id: str
+    config_data: Dict[str, Any]
+    prompts: Dict[str, Any]
+
+
+class UserRuntimeBundle(TypedDict):
+    user_secrets: Optional[UserSecretsRow]
+    agent_configs: Dict[str, AgentConfigRow]  # keyed by agent_id
+
+
+class UserCronRow(TypedDict, total=False):
+    user_id: str
+    cron_id: Optional[str]
+    assistant_id: Optional[str]
+    email: str
+    status: str
+    schedule: str
+    gmail_history_id: Optional[str]
+    gmail_watch_expiration: Optional[str]
+
+
+# ============================================================================
+# CLIENTS
+# ============================================================================
+
+def _credentials() -> tuple[str, str]:
+    url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+    key = os.getenv("SUPABASE_SECRET_KEY")
+    if not url or not key:
+        raise SupabaseNotConfiguredError(
+            "Missing Supabase credentials. Set NEXT_PUBLIC_SUPABASE_URL and "
+            "SUPABASE_SECRET_KEY in .env"
+        )
+    return url, key
+
+
+def is_supabase_configured() -> bool:
+    return bool(os.getenv("NEXT_PUBLIC_SUPABASE_URL") and os.getenv("SUPABASE_SECRET_KEY"))
+
+
+_sync_client: Optional[Client] = None
+_sync_client_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_supabase_client() -> Client:
+    """
+    Process-wide sync Supabase client (service role key).
+
+    Raises:
+        SupabaseNotConfiguredError: If Supabase credentials are missing
+    """
+    global _sync_client
+    with _sync_client_lock:
+        if _sync_client is None:
+            url, key = _credentials()
+            _sync_client = create_client(
+                url, key, options=ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT_SECONDS)
+            )
+        return _sync_client
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    """
+    Async Supabase client for the running event loop (service role key).
+
+    Raises:
+        SupabaseNotConfiguredError: If Supabase credentials are missing
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        url, key = _credentials()
+        client = await acreate_client(
+            url, key, options=AsyncClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT_SECONDS)
+        )
+        # Another coroutine may have raced us - keep the first client
+        client = _async_clients.setdefault(loop, client)
+    return client
+
+
+# ============================================================================
+# EXECUTION WITH RETRIES
+# ============================================================================
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, httpx.TransportError):
+        return True
+    return str(getattr(error, "code", "")) in _RETRYABLE_CODES
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(4.0, 0.25 * (2 ** attempt)))
+
+
+def execute_sync(query) -> Any:
+    """Execute a sync postgrest query, retrying transient failures."""
+    attempt = 0
+    while True:
+        try:
+            return query.execute()
+        except Exception as e:
+            if attempt >= SUPABASE_MAX_RETRIES or not _is_transient(e):
+                raise
+            delay = _backoff(attempt)
+        attempt += 1
+        logger.warning(f"[SUPABASE] Transient error, retry {attempt}/{SUPABASE_MAX_RETRIES} in {delay:.2f}s")
+        time.sleep(delay)
+
+
+async def execute(query) -> Any:
+    """Execute an async postgrest query, retrying transient failures."""
+    attempt = 0
+    while True:
+        try:
+            return await query.execute()
+        except Exception as e:
+            if attempt >= SUPABASE_MAX_RETRIES or not _is_transient(e):
+                raise
+            delay = _backoff(attempt)
+        attempt += 1
+        logger.warning(f"[SUPABASE] Transient error, retry {attempt}/{SUPABASE_MAX_RETRIES} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+
+def _data(result) -> Optional[dict]:
+    # maybe_single() returns None (not an empty response) when no row matches
+    return result.data if result is not None and result.data else None
+
+
+# ============================================================================
+# user_secrets
+# ============================================================================
+
+async def get_user_secrets(user_id: str, columns: str = "*") -> Optional[UserSecretsRow]:
+    """Load the user's user_secrets row (None if missing)."""
+    client = await get_async_supabase_client()
+    return _data(await execute(
+        client.table("user_secrets").select(columns).eq("clerk_id", user_id).maybe_single()
+    ))
+
+
+def get_user_secrets_sync(user_id: str, columns: str = "*") -> Optional[UserSecretsRow]:
+    client = get_supabase_client()
+    return _data(execute_sync(
+        client.table("user_secrets").select(columns).eq("clerk_id", user_id).maybe_single()
+    ))
+
+
+async def update_user_secrets(user_id: str, values: Dict[str, Any]) -> None:
+    client = await get_async_supabase_client()
+    await execute(client.table("user_secrets").update(values).eq("clerk_id", user_id))
+
+
+def update_user_secrets_sync(user_id: str, values: Dict[str, Any]) -> None:
+    client = get_supabase_client()
+    execute_sync(client.table("user_secrets").update(values).eq("clerk_id", user_id))
+
+
+async def list_user_secrets(columns: str, not_null: Optional[str] = None) -> List[UserSecretsRow]:
+    """All user_secrets rows, optionally only those where ``not_null`` is set."""
+    client = await get_async_supabase_client()
+    query = client.table("user_secrets").select(columns)
+    if not_null:
+        query = query.not_.is_(not_null, "null")
+    result = await execute(query)
+    return result.data if result is not None and result.data else []
+
+
+# Set once user_secrets.config_version turns out not to exist (migration 015 not applied)
+_config_version_missing = False
+
+
+def _is_missing_column(error: Exception) -> bool:
+    # 42703: undefined_column, PGRST204: column not in PostgREST's schema cache
+    return str(getattr(error, "code", "")) in ("42703", "PGRST204")
+
+
+def _config_version(row: Optional[dict]) -> Optional[int]:
+    return int(row.get("config_version") or 0) if row else 0
+
+
+async def get_user_config_version(user_id: str) -> Optional[int]:
+    """The user's config_version (0 without a user_secrets row, None before migration 015)."""
+    global _config_version_missing
+    if _config_version_missing:
+        return None
+    client = await get_async_supabase_client()
+    try:
+        return _config_version(_data(await execute(
+            client.table("user_secrets").select("config_version").eq("clerk_id", user_id).maybe_single()
+        )))
+    except Exception as e:
+        if not _is_missing_column(e):
+            raise
+        _config_version_missing = True
+        logger.warning("[SUPABASE] user_secrets.config_version missing - apply migration 015")
+        return None
+
+
+def get_user_config_version_sync(user_id: str) -> Optional[int]:
+    global _config_version_missing
+    if _config_version_missing:
+        return None
+    client = get_supabase_client()
+    try:
+        return _config_version(_data(execute_sync(
+            client.table("user_secrets").select("config_version").eq("clerk_id", user_id).maybe_single()
+        )))
+    except Exception as e:
+        if not _is_missing_column(e):
+            raise
+        _config_version_missing = True
+        logger.warning("[SUPABASE] user_secrets.config_version missing - apply migration 015")
+        return None
+
+
+def bundle_config_version(bundle: "UserRuntimeBundle") -> Optional[int]:
+    """config_version a runtime bundle was read at (None before migration 015)."""
+    secrets = bundle["user_secrets"]
+    if secrets is None:
+        return None if _config_version_missing else 0
+    version = secrets.get("config_version")
+    return int(version) if version is not None else None
+
+
+# ============================================================================
+# agent_configs
+# ============================================================================
+
+async def get_agent_config(
+    user_id: str, agent_id: str, columns: str = "config_data, prompts"
+) -> Optional[AgentConfigRow]:
+    """Load the user's agent_configs row for ``agent_id`` (None if missing)."""
+    client = await get_async_supabase_client()
+    return _data(await execute(
+        client.table("agent_configs")
+        .select(columns)
+        .eq("clerk_id", user_id)
+        .eq("agent_id", agent_id)
+        .maybe_single()
+    ))
+
+
+def get_agent_config_sync(
+    user_id: str, agent_id: str, columns: str = "config_data, prompts"
+) -> Optional[AgentConfigRow]:
+    client = get_supabase_client()
+    return _data(execute_sync(
+        client.table("agent_configs")
+        .select(columns)
+        .eq("clerk_id", user_id)
+        .eq("agent_id", agent_id)
+        .maybe_single()
+    ))
+
+
+def update_agent_config_sync(user_id: str, agent_id: str, values: Dict[str, Any]) -> None:
+    client = get_supabase_client()
+    execute_sync(
+        client.table("agent_configs").update(values).eq("clerk_id", user_id).eq("agent_id", agent_id)
+    )
+
+
+# ============================================================================
+# runtime bundle (user_secrets + agent_configs)
+# ============================================================================
+
+# Set once the RPC turns out not to exist (migration 014 not applied yet)
+_bundle_rpc_missing = False
+
+
+def _is_missing_function(error: Exception) -> bool:
+    # PGRST202: function not in PostgREST's schema cache, 42883: undefined_function
+    return str(getattr(error, "code", "")) in ("PGRST202", "42883")
+
+
+def _bundle(data: Optional[dict]) -> UserRuntimeBundle:
+    data = data or {}
+    return {
+        "user_secrets": data.get("user_secrets") or None,
+        "agent_configs": data.get("agent_configs") or {},
+    }
+
+
+async def get_user_runtime_bundle(user_id: str) -> UserRuntimeBundle:
+    """
+    Load the user's user_secrets row and all agent_configs rows in one call.
+
+    Uses the get_user_runtime_bundle RPC (migration 014). Falls back to two
+    concurrent table queries while that migration is not applied.
+    """
+    global _bundle_rpc_missing
+    client = await get_async_supabase_client()
+    if not _bundle_rpc_missing:
+        try:
+            result = await execute(client.rpc("get_user_runtime_bundle", {"p_clerk_id": user_id}))
+            return _bundle(result.data if result is not None else None)
+        except Exception as e:
+            if not _is_missing_function(e):
+                raise
+            _bundle_rpc_missing = True
+            logger.warning("[SUPABASE] get_user_runtime_bundle RPC missing - apply migration 014")
+
+    secrets_result, configs_result = await asyncio.gather(
+        execute(client.table("user_secrets").select("*").eq("clerk_id", user_id).maybe_single()),
+        execute(client.table("agent_configs").select("agent_id, config_data, prompts").eq("clerk_id", user_id)),
+    )
+    return _bundle({
+        "user_secrets": _data(secrets_result),
+        "agent_configs": {row["agent_id"]: row for row in (configs_result.data or [])},
+    })
+
+
+def get_user_runtime_bundle_sync(user_id: str) -> UserRuntimeBundle:
+    global _bundle_rpc_missing
+    client = get_supabase_client()
+    if not _bundle_rpc_missing:
+        try:
+            result = execute_sync(client.rpc("get_user_runtime_bundle", {"p_clerk_id": user_id}))
+            return _bundle(result.data if result is not None else None)
+        except Exception as e:
+            if not _is_missing_function(e):
+                raise
+            _bundle_rpc_missing = True
+            logger.warning("[SUPABASE] get_user_runtime_bundle RPC missing - apply migration 014")
+
+    configs_result = execute_sync(
+        client.table("agent_configs").select("agent_id, config_data, prompts").eq("clerk_id", user_id)
+    )
+    return _bundle({
+        "user_secrets": get_user_secrets_sync(user_id),
+        "agent_configs": {row["agent_id"]: row for row in (configs_result.data or [])},
+    })
+
+
+# ============================================================================
+# user_crons
+# ============================================================================
+
+async def get_user_cron(user_id: str, columns: str = "*") -> Optional[UserCronRow]:
+    """Load the user's user_crons row (None if missing)."""
+    client = await get_async_supabase_client()
+    return _data(await execute(
+        client.table("user_crons").select(columns).eq("user_id", user_id).maybe_single()
+    ))
+
+
+async def update_user_cron(user_id: str, values: Dict[str, Any]) -> None:
+    client = await get_async_supabase_client()
+    await execute(client.table("user_crons").update(values).eq("user_id", user_id))
+
+
+# ============================================================================
+# ingestion_leases
+# ============================================================================
+
+async def claim_ingestion_lease(user_id: str, worker_id: str, lease_seconds: int = 300) -> bool:
+    """Claim the user's ingestion lease for one run (False while someone else holds it)."""
+    client = await get_async_supabase_client()
+    result = await execute(client.rpc("claim_ingestion_lease", {
+        "p_worker_id": worker_id,
+        "p_user_id": user_id,
+        "p_lease_seconds": lease_seconds,
+    }))
+    return bool(result.data)
+
+
+async def release_ingestion_lease(user_id: str, worker_id: str, ingested: bool = True) -> None:
+    client = await get_async_supabase_client()
+    await execute(client.rpc("release_ingestion_lease", {
+        "p_worker_id": worker_id,
+        "p_user_id": user_id,
+        "p_ingested": ingested,
+    }))
@@ -0,0 +1,205 @@
+"""
+Tool Output Budget - Keep Large Tool Results Out of the Message History
+Wraps agent tools so oversized results are truncated before they reach the LLM.
+
+Without this, one RUBE_MULTI_EXECUTE_TOOL / RUBE_REMOTE_WORKBENCH result or a
+250-event google_calendar-list-events listing stayed in the messages and was
+re-sent on every later LLM call of the supervisor loop.
+
+- Each tool gets a character budget (TOOL_OUTPUT_BUDGETS, ~4 chars per token);
+  others use TOOL_OUTPUT_BUDGET_CHARS
+- Oversized results keep their beginning and end, plus a notice with a
+  reference to the full payload
+- Full payloads live in a process-wide store (TTL + total size bound) and are
+  read back page by page with the read_tool_output tool
+- Stored payloads are scoped to the (user_id, thread_id) of the run that
+  produced them; a ref from another user or thread reads as not found
+
+Usage:
+    agent = create_react_agent(model=model, tools=budget_tools(tools), prompt=prompt)
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, StructuredTool
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+TOOL_OUTPUT_BUDGET_CHARS = int(os.getenv("TOOL_OUTPUT_BUDGET_CHARS", "12000"))
+TOOL_OUTPUT_STORE_TTL_SECONDS = float(os.getenv("TOOL_OUTPUT_STORE_TTL_SECONDS", "3600"))
+TOOL_OUTPUT_STORE_MAX_CHARS = int(os.getenv("TOOL_OUTPUT_STORE_MAX_CHARS", "50000000"))
+
+# Per-tool budgets (characters) for tools known to return bulk data
+TOOL_OUTPUT_BUDGETS: Dict[str, int] = {
+    "RUBE_MULTI_EXECUTE_TOOL": 16000,
+    "RUBE_REMOTE_WORKBENCH": 8000,
+    "RUBE_REMOTE_BASH_TOOL": 8000,
+    "google_calendar-list-events": 12000,
+}
+
+READ_TOOL_NAME = "read_tool_output"
+
+# Share of the budget kept from the end of an oversized result
+_TAIL_SHARE = 0.2
+
+Scope = Tuple[str, str]
+
+
+def _scope(config: Optional[RunnableConfig]) -> Scope:
+    """(user_id, thread_id) of the run a tool is called from."""
+    configurable = (config or {}).get("configurable") or {}
+    return str(configurable.get("user_id") or ""), str(configurable.get("thread_id") or "")
+
+
+class ToolOutputStore:
+    """Full payloads of truncated tool results, by reference."""
+
+    def __init__(self, ttl: float = TOOL_OUTPUT_STORE_TTL_SECONDS, max_chars: int = TOOL_OUTPUT_STORE_MAX_CHARS):
+        self.ttl = ttl
+        self.max_chars = max_chars
+        # ref -> (stored_at, scope, tool name, payload), oldest first
+        self._entries: "OrderedDict[str, Tuple[float, Scope, str, str]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, tool_name: str, payload: str, scope: Scope = ("", "")) -> str:
+        ref = f"out_{uuid.uuid4().hex[:12]}"
+        now = time.monotonic()
+        with self._lock:
+            self._entries[ref] = (now, scope, tool_name, payload)
+            self._size += len(payload)
+            while self._entries:
+                oldest_ref, (stored_at, _, _, oldest) = next(iter(self._entries.items()))
+                if self._size <= self.max_chars and now - stored_at <= self.ttl:
+                    break
+                del self._entries[oldest_ref]
+                self._size -= len(oldest)
+        return ref
+
+    def get(self, ref: str, scope: Scope = ("", "")) -> Optional[str]:
+        """Payload stored under ``ref`` by the same scope, or None."""
+        with self._lock:
+            entry = self._entries.get(ref)
+        if entry is None or entry[1] != scope or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[3]
+
+
+_output_store = ToolOutputStore()
+
+
+def get_tool_output_store() -> ToolOutputStore:
+    """Process-wide store of full tool outputs."""
+    return _output_store
+
+
+def _as_text(content: Any) -> str:
+    """Text of a tool result (string, or MCP/LangChain content blocks)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for block in content:
+            if isinstance(block, str):
+                parts.append(block)
+            elif isinstance(block, dict) and block.get("type") == "text":
+                parts.append(block.get("text", ""))
+            else:
+                parts.append(json.dumps(block, default=str))
+        return "\n".join(parts)
+    return json.dumps(content, default=str)
+
+
+def apply_budget(tool_name: str, content: Any, budget: int, scope: Scope = ("", "")) -> Any:
+    """Return content unchanged if within budget, else a truncated text with a reference."""
+    text = _as_text(content)
+    if len(text) <= budget:
+        return content
+
+    ref = _output_store.put(tool_name, text, scope)
+    tail = int(budget * _TAIL_SHARE)
+    head = budget - tail
+    logger.info(f"[TOOL_BUDGET] {tool_name}: {len(text)} chars over budget {budget}, stored as {ref}")
+    return (
+        f"{text[:head]}\n\n"
+        f"[... {len(text) - head - tail} characters omitted. Full output ({len(text)} characters) "
+        f"stored as ref '{ref}'. Call {READ_TOOL_NAME} with ref='{ref}' and an offset to read more. ...]\n\n"
+        f"{text[-tail:] if tail else ''}"
+    )
+
+
+def _budgeted(tool: BaseTool, budget: int) -> BaseTool:
+    async def budgeted_tool(config: RunnableConfig, **kwargs) -> Any:
+        return apply_budget(tool.name, await tool.ainvoke(kwargs), budget, _scope(config))
+
+    return StructuredTool(
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+        coroutine=budgeted_tool,
+        metadata=tool.metadata,
+        handle_tool_error=tool.handle_tool_error,
+        handle_validation_error=tool.handle_validation_error,
+        return_direct=tool.return_direct,
+    )
+
+
+class ReadToolOutputInput(BaseModel):
+    """Input schema for read_tool_output tool"""
+    ref: str = Field(..., description="Reference from a truncated tool result (e.g. 'out_1a2b3c4d5e6f')")
+    offset: int = Field(0, description="Character offset to start reading from")
+
+
+def create_read_tool_output_tool(page_chars: int = TOOL_OUTPUT_BUDGET_CHARS) -> BaseTool:
+    """Tool that pages through a stored full tool output."""
+
+    async def read_tool_output(ref: str, config: RunnableConfig, offset: int = 0) -> str:
+        payload = _output_store.get(ref, _scope(config))
+        if payload is None:
+            return f"No stored output for ref '{ref}' (it may have expired). Re-run the original tool."
+        offset = max(0, offset)
+        page = payload[offset:offset + page_chars]
+        end = offset + len(page)
+        more = f" Next offset: {end}." if end < len(payload) else " End of output."
+        return f"[{ref}: characters {offset}-{end} of {len(payload)}.{more}]\n{page}"
+
+    return StructuredTool.from_function(
+        coroutine=read_tool_output,
+        name=READ_TOOL_NAME,
+        description=(
+            "Read the full output of an earlier tool call that was truncated. "
+            "Pass the ref from the truncation notice and an offset to page through it."
+        ),
+        args_schema=ReadToolOutputInput,
+    )
+
+
+def budget_tools(
+    tools: List[BaseTool],
+    budgets: Optional[Dict[str, int]] = None,
+    default_budget: int = TOOL_OUTPUT_BUDGET_CHARS,
+) -> List[BaseTool]:
+    """
+    Wrap tools so their results respect an output budget.
+
+    Args:
+        tools: Tools for create_react_agent
+        budgets: Per-tool character budgets (defaults to TOOL_OUTPUT_BUDGETS)
+        default_budget: Budget for tools not listed in budgets
+
+    Returns:
+        The wrapped tools plus read_tool_output (empty list stays empty)
+    """
+    if not tools:
+        return []
+    budgets = TOOL_OUTPUT_BUDGETS if budgets is None else budgets
+    wrapped = [_budgeted(t, budgets.get(t.name, default_budget)) for t in tools if t.name != READ_TOOL_NAME]
+    return wrapped + [create_read_tool_output_tool(default_budget)]
@@ -0,0 +1,37 @@
+-- ============================================
+-- ADD GOOGLE_TOKEN_EXPIRES_AT TO USER_SECRETS
+-- ============================================
+-- Migration 013: Persist the expiry of the stored Google access token
+-- Date: 2026-10-16
+-- Purpose: Let every process reuse a still-valid access token
+--
+-- CONTEXT:
+-- Migration 012 added google_access_token, but without an expiry agents could
+-- not tell whether the stored token was still usable, so every process (cron
+-- workers, supervisor graph, config API) refreshed it again on startup.
+--
+-- utils/google_oauth_utils.py now:
+-- - loads google_access_token + google_token_expires_at with the refresh token
+-- - uses the access token while it is valid
+-- - writes refreshed tokens back asynchronously
+
+-- ============================================
+-- 1. ADD GOOGLE_TOKEN_EXPIRES_AT COLUMN
+-- ============================================
+ALTER TABLE public.user_secrets
+ADD COLUMN IF NOT EXISTS google_token_expires_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN public.user_secrets.google_token_expires_at IS
+    'Expiry of google_access_token (UTC). NULL = unknown, refresh before use.';
+
+-- ============================================
+-- 2. VERIFICATION
+-- ============================================
+SELECT column_name, data_type, is_nullable
+FROM information_schema.columns
+WHERE table_name = 'user_secrets'
+  AND column_name IN ('google_access_token', 'google_token_expires_at');
+
+-- ============================================
+-- MIGRATION COMPLETE
+-- ============================================
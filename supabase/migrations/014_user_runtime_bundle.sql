@@ -0,0 +1,91 @@
+-- ============================================
+-- USER RUNTIME BUNDLE RPC
+-- ============================================
+-- Migration 014: Load everything an agent run needs in one round trip
+-- Date: 2026-10-16
+-- Purpose: Replace the per-table queries agents make on every run
+--
+-- CONTEXT:
+-- A single run used to query user_secrets and agent_configs several times:
+-- - mcp_auth.get_mcp_oauth_tokens_dual: user_secrets, then agent_configs
+-- - eaia/main/config.py: agent_configs + user_secrets
+-- - graph.py calendar / Rube nodes: agent_configs per agent
+--
+-- get_user_runtime_bundle(clerk_id) returns the user_secrets row and ALL of
+-- the user's agent_configs rows (config_data + prompts) as one JSONB document.
+-- Python wrapper: utils/supabase_db.get_user_runtime_bundle()
+--
+-- Result shape:
+-- {
+--   "user_secrets": { ...user_secrets row... } | null,
+--   "agent_configs": { "<agent_id>": {"config_data": {...}, "prompts": {...}} }
+-- }
+
+-- ============================================
+-- 1. INDEXES
+-- ============================================
+-- Both lookups are by clerk_id. The UNIQUE constraints from the table
+-- definitions already provide the indexes the function needs; recreate them
+-- under the constraint names in case a table was created without them.
+CREATE UNIQUE INDEX IF NOT EXISTS user_secrets_clerk_id_key
+    ON public.user_secrets(clerk_id);
+
+-- (clerk_id, agent_id): serves "all agents of a user" via its leading column
+-- and "one agent of a user" exactly
+CREATE UNIQUE INDEX IF NOT EXISTS agent_configs_clerk_id_agent_id_key
+    ON public.agent_configs(clerk_id, agent_id);
+
+-- These duplicate the unique indexes above and only slow down writes
+DROP INDEX IF EXISTS public.idx_user_secrets_clerk_id;
+DROP INDEX IF EXISTS public.idx_agent_configs_clerk_id;
+DROP INDEX IF EXISTS public.idx_agent_configs_clerk_agent;
+
+-- ============================================
+-- 2. GET_USER_RUNTIME_BUNDLE FUNCTION
+-- ============================================
+CREATE OR REPLACE FUNCTION public.get_user_runtime_bundle(p_clerk_id TEXT)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT jsonb_build_object(
+        'user_secrets', (
+            SELECT to_jsonb(s)
+            FROM public.user_secrets s
+            WHERE s.clerk_id = p_clerk_id
+        ),
+        'agent_configs', COALESCE((
+            SELECT jsonb_object_agg(
+                c.agent_id,
+                jsonb_build_object('config_data', c.config_data, 'prompts', c.prompts)
+            )
+            FROM public.agent_configs c
+            WHERE c.clerk_id = p_clerk_id
+        ), '{}'::jsonb)
+    );
+$$;
+
+COMMENT ON FUNCTION public.get_user_runtime_bundle(TEXT) IS
+    'user_secrets row + all agent_configs of a user in one call (agents, service role only).';
+
+-- Returns secrets - only the service role (agents / config API) may call it
+REVOKE ALL ON FUNCTION public.get_user_runtime_bundle(TEXT) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.get_user_runtime_bundle(TEXT) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_user_runtime_bundle(TEXT) TO service_role;
+
+-- ============================================
+-- 3. VERIFICATION
+-- ============================================
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename IN ('user_secrets', 'agent_configs')
+ORDER BY tablename, indexname;
+
+-- Replace with a real clerk_id to test:
+-- SELECT public.get_user_runtime_bundle('user_xxx');
+
+-- ============================================
+-- MIGRATION COMPLETE
+-- ============================================
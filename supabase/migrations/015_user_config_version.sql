@@ -0,0 +1,67 @@
+-- ============================================
+-- USER CONFIG VERSION
+-- ============================================
+-- Migration 015: Cross-process invalidation of cached agent config
+-- Date: 2026-10-16
+-- Purpose: Let agents notice config changes made through the config API
+--
+-- CONTEXT:
+-- Agents cache user_secrets + agent_configs in-process (utils/config_utils.py).
+-- The config API runs as its own service, so it cannot clear that cache.
+-- Instead every config write bumps user_secrets.config_version:
+-- - config API: /api/config/update, /bulk-update, /reset
+-- - config API: /api/webhooks/mcp-connected (called by the MCP OAuth callbacks)
+--
+-- Agents compare the version (a one-column, indexed read at most every
+-- CONFIG_VERSION_CHECK_SECONDS per user) and drop entries loaded before it.
+-- The runtime bundle (migration 014) returns the whole user_secrets row, so
+-- every bundle load carries the version it was read at.
+
+-- ============================================
+-- 1. ADD CONFIG_VERSION COLUMN
+-- ============================================
+ALTER TABLE public.user_secrets
+ADD COLUMN IF NOT EXISTS config_version BIGINT NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN public.user_secrets.config_version IS
+    'Bumped on every config/OAuth change of the user (all agents). Agents drop cached config older than this.';
+
+-- ============================================
+-- 2. BUMP_USER_CONFIG_VERSION FUNCTION
+-- ============================================
+-- Creates the user_secrets row when missing (agent-only users have none yet)
+CREATE OR REPLACE FUNCTION public.bump_user_config_version(p_clerk_id TEXT)
+RETURNS BIGINT
+LANGUAGE sql
+VOLATILE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    INSERT INTO public.user_secrets (clerk_id, config_version)
+    VALUES (p_clerk_id, 1)
+    ON CONFLICT (clerk_id)
+    DO UPDATE SET config_version = public.user_secrets.config_version + 1
+    RETURNING config_version;
+$$;
+
+COMMENT ON FUNCTION public.bump_user_config_version(TEXT) IS
+    'Increment user_secrets.config_version after a config change (config API, service role only).';
+
+REVOKE ALL ON FUNCTION public.bump_user_config_version(TEXT) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.bump_user_config_version(TEXT) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.bump_user_config_version(TEXT) TO service_role;
+
+-- ============================================
+-- 3. VERIFICATION
+-- ============================================
+SELECT column_name, data_type, is_nullable, column_default
+FROM information_schema.columns
+WHERE table_name = 'user_secrets'
+  AND column_name = 'config_version';
+
+-- Replace with a real clerk_id to test:
+-- SELECT public.bump_user_config_version('user_xxx');
+
+-- ============================================
+-- MIGRATION COMPLETE
+-- ============================================